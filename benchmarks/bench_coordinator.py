@@ -0,0 +1,183 @@
+"""Throughput benchmark for the coordinator and sensor platform against the fake cloud.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_coordinator --locations 10 --evs 5 --messages 20000
+
+Reports websocket messages handled per second, event loop lag while streaming at the configured rate, state writes
+per message and memory per system.
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from custom_components.sveasolar import DOMAIN, SveaSolarDataUpdateCoordinator
+from custom_components.sveasolar.hub import SveaSolarHub
+from custom_components.sveasolar.sensor import SENSOR_DESCRIPTIONS_BY_SYSTEM_TYPE, SveaSolarSensor
+
+from .fake_cloud import FakeSveaSolarCloud
+
+
+class BenchmarkConfigEntry:
+    """The parts of a config entry the coordinator and hub use."""
+
+    def __init__(self, options: dict | None = None):
+        self.entry_id = "benchmark"
+        self.domain = DOMAIN
+        self.title = "Benchmark"
+        self.data = {CONF_USERNAME: "benchmark", CONF_PASSWORD: "benchmark"}
+        self.options = options or {}
+        self.unload_callbacks = []
+
+    def async_on_unload(self, func) -> None:
+        self.unload_callbacks.append(func)
+
+    def async_create_background_task(self, hass: HomeAssistant, target, name: str, eager_start: bool = True):
+        """Run the statistics import and subscription updates like a loaded entry would."""
+        return hass.async_create_background_task(target, name, eager_start)
+
+
+class CountingSensor(SveaSolarSensor):
+    """Sensor that counts state writes instead of writing to the state machine."""
+
+    writes = 0
+
+    def async_write_ha_state(self) -> None:
+        CountingSensor.writes += 1
+
+
+async def async_build(hass: HomeAssistant, cloud: FakeSveaSolarCloud, options: dict | None = None):
+    """Set up the coordinator and sensors the way async_setup_entry does, talking to the fake cloud."""
+    entry = BenchmarkConfigEntry(options)
+    hub = SveaSolarHub(hass, entry)
+    hub.api = cloud.api(hub.token_manager)
+    await hub.token_manager.async_load()
+    if hub.token_manager.access_token is None:
+        await hub.async_login()
+    coordinator = SveaSolarDataUpdateCoordinator(hass, entry, hub)
+    await coordinator._async_setup()
+    await coordinator.async_refresh()
+
+    sensors = [
+        CountingSensor(coordinator, system_id, system_type, system_name, description.fetch_type, description)
+        for system_type, inner_list in coordinator.system_ids.items()
+        for inner_dict in inner_list
+        for system_id, system_name in inner_dict.items()
+        for description in SENSOR_DESCRIPTIONS_BY_SYSTEM_TYPE[system_type]
+    ]
+    for sensor in sensors:
+        sensor.hass = hass
+        await sensor.async_added_to_hass()
+
+    return coordinator, sensors
+
+
+async def async_measure_memory(hass: HomeAssistant, args) -> float:
+    systems = args.locations * 2 + args.evs
+    cloud = FakeSveaSolarCloud(args.locations, args.evs)
+    await cloud.async_start()
+    try:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        coordinator, sensors = await async_build(hass, cloud)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+    finally:
+        await cloud.async_stop()
+
+    # Only the allocations of the integration count, not those of the fake cloud serving it
+    allocated = sum(
+        stat.size_diff
+        for stat in after.compare_to(before, "filename")
+        if not stat.traceback[0].filename.endswith("fake_cloud.py")
+    )
+    del coordinator, sensors
+    return allocated / systems
+
+
+async def async_loop_lag(stop: asyncio.Event, samples: list[float], interval: float = 0.01) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def async_stream(hass: HomeAssistant, args, message_rate: float, messages: int) -> dict:
+    cloud = FakeSveaSolarCloud(args.locations, args.evs, message_rate=message_rate)
+    await cloud.async_start()
+    try:
+        return await _async_stream(hass, cloud, messages)
+    finally:
+        await cloud.async_stop()
+
+
+async def _async_stream(hass: HomeAssistant, cloud: FakeSveaSolarCloud, messages: int) -> dict:
+    coordinator, sensors = await async_build(hass, cloud)
+    CountingSensor.writes = 0
+    cloud.messages = 0
+
+    stop = asyncio.Event()
+    lag: list[float] = []
+    lag_task = asyncio.create_task(async_loop_lag(stop, lag))
+
+    start = time.perf_counter()
+    coordinator.async_websockets_connect()
+    while cloud.messages < messages:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    received = cloud.messages
+
+    await coordinator.async_websocket_disconnect()
+    stop.set()
+    await lag_task
+
+    return {
+        "messages": received,
+        "messages_per_second": received / elapsed,
+        "state_writes_per_message": CountingSensor.writes / received,
+        "loop_lag_mean_ms": statistics.fmean(lag) * 1000 if lag else 0.0,
+        "loop_lag_max_ms": max(lag, default=0.0) * 1000,
+        "entities": len(sensors),
+    }
+
+
+async def async_main(args) -> None:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            memory = await async_measure_memory(hass, args)
+            throughput = await async_stream(hass, args, 0, args.messages)
+            paced_messages = max(int(args.rate * args.duration * (1 + args.evs)), 1)
+            paced = await async_stream(hass, args, args.rate, paced_messages)
+        finally:
+            await hass.async_stop(force=True)
+
+    print(f"systems: {args.locations} locations/batteries, {args.evs} EVs, {throughput['entities']} entities")
+    print(f"memory per system: {memory / 1024:.1f} KiB")
+    print(f"messages/s handled: {throughput['messages_per_second']:.0f}")
+    print(f"state writes per message: {throughput['state_writes_per_message']:.2f}")
+    print(
+        f"event loop lag at {args.rate:g} msg/s per stream: "
+        f"mean {paced['loop_lag_mean_ms']:.2f} ms, max {paced['loop_lag_max_ms']:.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=3, help="locations, each with one battery")
+    parser.add_argument("--evs", type=int, default=2, help="electric vehicles")
+    parser.add_argument("--messages", type=int, default=10000, help="messages for the throughput run")
+    parser.add_argument("--rate", type=float, default=5.0, help="messages per second per stream for the lag run")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of the lag run")
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
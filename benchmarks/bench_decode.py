@@ -0,0 +1,81 @@
+"""Decode cost per websocket message in pysveasolar.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_decode --messages 20000 --extra-fields 20
+
+pysveasolar decodes every frame of the home and EV websockets itself: `message.json()` parses it with the standard
+library and `fromdict` builds the pysveasolar model handed to the callbacks of the hub, which project it. This
+measures each step on the frames of the fake cloud, and Home Assistant's orjson-backed `json_loads` on the same
+frames for the share of the parse a faster JSON library would save. `--extra-fields` pads every frame with fields the
+integration never reads.
+"""
+
+import argparse
+import itertools
+import json
+import time
+
+from dataclass_wizard import fromdict
+from homeassistant.util.json import json_loads
+from pysveasolar.models import BadgesUpdatedMessage, VehicleDetailsUpdatedMessage
+
+from custom_components.sveasolar.projection import SveaSolarBatteryState, SveaSolarVehicle
+
+from .fake_cloud import FakeSveaSolarCloud
+
+
+def _pad(frame: str, extra_fields: int) -> str:
+    message = json.loads(frame)
+    for index in range(extra_fields):
+        message["data"][f"unused{index}"] = {"value": index, "unit": "kWh", "updated": "2025-01-01T00:00:00"}
+    return json.dumps(message)
+
+
+def _measure(function, items: list) -> float:
+    start = time.perf_counter()
+    for item in items:
+        function(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000, help="messages decoded per stream")
+    parser.add_argument("--extra-fields", type=int, default=0, help="unused fields added to every frame")
+    args = parser.parse_args()
+
+    cloud = FakeSveaSolarCloud(locations=4, evs=1)
+    streams = {
+        "home": (
+            cloud.home_frames(),
+            BadgesUpdatedMessage,
+            lambda message: SveaSolarBatteryState.from_model(message.data.battery),
+        ),
+        "ev": (
+            cloud.ev_frames(cloud.vehicles[0]),
+            VehicleDetailsUpdatedMessage,
+            lambda message: SveaSolarVehicle.from_model(message.data),
+        ),
+    }
+
+    for name, (frames, model, project) in streams.items():
+        frames = [_pad(frame, args.extra_fields) for frame in frames]
+        frames = list(itertools.islice(itertools.cycle(frames), args.messages))
+        data = [json.loads(frame) for frame in frames]
+        models = [fromdict(model, item) for item in data]
+
+        parse = _measure(json.loads, frames)
+        build = _measure(lambda item: fromdict(model, item), data)
+        projection = _measure(project, models)
+        fast_parse = _measure(json_loads, frames)
+        total = parse + build + projection
+        print(
+            f"{name}: {len(frames[0])} bytes per frame, {total * 1e6:.2f} us per message: "
+            f"json {parse * 1e6:.2f} us ({parse / total:.0%}), fromdict {build * 1e6:.2f} us ({build / total:.0%}), "
+            f"projection {projection * 1e6:.2f} us ({projection / total:.0%}); orjson parse {fast_parse * 1e6:.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
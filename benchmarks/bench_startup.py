@@ -0,0 +1,103 @@
+"""Import and setup time of the integration.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --locations 10 --evs 5 --runs 5
+
+Reports the time to import the sensor platform in a fresh interpreter that already imported Home Assistant, and the
+time to set up the coordinator and create, register and describe the devices of every sensor against the fake cloud.
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.sveasolar import SveaSolarDataUpdateCoordinator
+from custom_components.sveasolar.hub import SveaSolarHub
+from custom_components.sveasolar.sensor import SENSOR_DESCRIPTIONS_BY_SYSTEM_TYPE
+
+from .bench_coordinator import BenchmarkConfigEntry, CountingSensor
+from .fake_cloud import FakeSveaSolarCloud
+
+IMPORT_SCRIPT = """
+import time
+import homeassistant.components.sensor, homeassistant.helpers.entity_platform, homeassistant.helpers.update_coordinator
+start = time.perf_counter()
+import custom_components.sveasolar.sensor
+print(time.perf_counter() - start)
+"""
+
+
+def measure_import() -> float:
+    result = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, check=True, text=True)
+    return float(result.stdout.strip())
+
+
+async def async_measure_setup(hass: HomeAssistant, cloud: FakeSveaSolarCloud) -> tuple[float, float, int]:
+    entry = BenchmarkConfigEntry()
+    hub = SveaSolarHub(hass, entry)
+    hub.api = cloud.api(hub.token_manager)
+    await hub.token_manager.async_load()
+    if hub.token_manager.access_token is None:
+        await hub.async_login()
+
+    start = time.perf_counter()
+    coordinator = SveaSolarDataUpdateCoordinator(hass, entry, hub)
+    await coordinator._async_setup()
+    await coordinator.async_refresh()
+    refreshed = time.perf_counter()
+
+    sensors = [
+        CountingSensor(coordinator, system_id, system_type, system_name, description.fetch_type, description)
+        for system_type, inner_list in coordinator.system_ids.items()
+        for inner_dict in inner_list
+        for system_id, system_name in inner_dict.items()
+        for description in SENSOR_DESCRIPTIONS_BY_SYSTEM_TYPE[system_type]
+    ]
+    for sensor in sensors:
+        sensor.hass = hass
+        _ = sensor.device_info
+        await sensor.async_added_to_hass()
+    added = time.perf_counter()
+
+    return refreshed - start, added - refreshed, len(sensors)
+
+
+async def async_main(args) -> None:
+    imports = [measure_import() for _ in range(args.runs)]
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        cloud = FakeSveaSolarCloud(args.locations, args.evs)
+        await cloud.async_start()
+        try:
+            setups = [await async_measure_setup(hass, cloud) for _ in range(args.runs)]
+        finally:
+            await cloud.async_stop()
+            await hass.async_stop(force=True)
+
+    entities = setups[0][2]
+    coordinator_setup = statistics.median(setup[0] for setup in setups)
+    entity_setup = statistics.median(setup[1] for setup in setups)
+    print(f"systems: {args.locations} locations/batteries, {args.evs} EVs, {entities} entities")
+    print(f"sensor platform import: median {statistics.median(imports) * 1000:.1f} ms")
+    print(f"coordinator setup and first refresh: median {coordinator_setup * 1000:.2f} ms")
+    print(f"entity setup: median {entity_setup * 1000:.2f} ms, {entity_setup / entities * 1e6:.1f} us per entity")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=3, help="locations, each with one battery")
+    parser.add_argument("--evs", type=int, default=2, help="electric vehicles")
+    parser.add_argument("--runs", type=int, default=5, help="repetitions, the median is reported")
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
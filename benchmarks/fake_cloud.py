@@ -0,0 +1,337 @@
+"""Local stand-in for the Svea Solar cloud.
+
+FakeSveaSolarCloud serves the REST and websocket endpoints the integration uses over a local aiohttp server, with
+JSON shaped like the responses of the cloud: login, token refresh, my-system, my-data, battery details and the home
+and EV websockets. The real pysveasolar client talks to it through FakeCloudSession, which sends the requests for the
+cloud to the local server instead, so the authentication, token refresh and message decoding of pysveasolar run as
+they would against the cloud.
+"""
+
+import asyncio
+import base64
+import itertools
+import json
+import random
+import secrets
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from aiohttp import ClientSession, web
+from pysveasolar.api import SveaSolarAPI
+from pysveasolar.token_manager import TokenManager
+
+CLOUD_URL = "https://prod.app.sveasolar.com"
+CLOUD_WEBSOCKET_URL = "wss://prod.app.sveasolar.com"
+ACCESS_TOKEN_LIFETIME = 3600
+KEEP_ALIVE_INTERVAL = 60.0
+# Frames are encoded ahead and cycled, so the server adds little to the time measured on the shared event loop
+FRAME_POOL = 64
+
+
+def _encode(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def _message(message_type: str, data: dict) -> str:
+    """Return a websocket frame in the envelope of the cloud."""
+    return json.dumps(
+        {
+            "id": str(uuid.uuid4()),
+            "type": message_type,
+            "data": data,
+            "time": datetime.now(UTC).isoformat(),
+            "dataContentType": "application/json",
+            "source": "fake-cloud",
+            "traceParent": None,
+        }
+    )
+
+
+def _day(start: datetime) -> dict:
+    points = [
+        {"time": (start + timedelta(hours=hour)).isoformat(), "value": random.uniform(10, 300), "rating": "Normal"}
+        for hour in range(24)
+    ]
+    lowest = min(points, key=lambda point: point["value"])
+    highest = max(points, key=lambda point: point["value"])
+    return {
+        "lowestAt": lowest["time"],
+        "highestAt": highest["time"],
+        "average": sum(point["value"] for point in points) / len(points),
+        "data": points,
+    }
+
+
+def _flow(flow_type: str, value: float) -> dict:
+    return {"type": flow_type, "value": value, "size": value, "unit": "kW"}
+
+
+class FakeCloudSession:
+    """Client session that sends the requests for the Svea Solar cloud to the fake cloud instead."""
+
+    def __init__(self, session: ClientSession, url: str):
+        self._session = session
+        self._url = url
+
+    def _rewrite(self, url: str) -> str:
+        for prefix in (CLOUD_URL, CLOUD_WEBSOCKET_URL):
+            if url.startswith(prefix):
+                return self._url + url.removeprefix(prefix)
+        return url
+
+    async def request(self, method: str, url: str, **kwargs):
+        return await self._session.request(method, self._rewrite(url), **kwargs)
+
+    async def ws_connect(self, url: str, **kwargs):
+        return await self._session.ws_connect(self._rewrite(url), **kwargs)
+
+
+class FakeSveaSolarCloud:
+    """Fake cloud with `locations` locations, one battery per location and `evs` vehicles.
+
+    `message_rate` is the number of messages per second pushed on each websocket, 0 pushes as fast as possible.
+    `latency` delays every REST response by that many seconds.
+    """
+
+    def __init__(self, locations: int = 1, evs: int = 1, message_rate: float = 1.0, latency: float = 0.0):
+        self.message_rate = message_rate
+        self.latency = latency
+        self.requests = 0
+        self.messages = 0
+        self.url: str | None = None
+        self._access_tokens: set[str] = set()
+        self._refresh_tokens: set[str] = set()
+        self._runner: web.AppRunner | None = None
+        self._session: ClientSession | None = None
+
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.locations = [
+            {
+                "id": f"location-{index}",
+                "name": f"Location {index}",
+                "city": "Stockholm",
+                "weather": {"description": "clear sky", "main": "Clear", "icon": "01d", "temperature": 12.5},
+                "spotPrice": {
+                    "rating": "Normal",
+                    "value": 120.0,
+                    "unit": "öre/kWh",
+                    "time": midnight.isoformat(),
+                    "twoDays": _day(midnight),
+                    "today": _day(midnight),
+                    "tomorrow": _day(midnight + timedelta(days=1)),
+                },
+                "solar": None,
+                "statusRightNow": {
+                    "status": "Producing",
+                    "sources": [_flow("Solar", 2.5), _flow("Grid", 0.3)],
+                    "destinations": [_flow("Usage", 1.8), _flow("Battery", 1.0)],
+                },
+            }
+            for index in range(locations)
+        ]
+        self.batteries = [
+            {"id": f"battery-{index}", "name": f"Battery {index}", "locationId": location["id"]}
+            for index, location in enumerate(self.locations)
+        ]
+        self.vehicles = [{"id": f"ev-{index}", "name": f"EV {index}"} for index in range(evs)]
+
+    async def async_start(self) -> None:
+        app = web.Application()
+        app.add_routes(
+            [
+                web.post("/api/v1/auth/login-with-email", self._handle_login),
+                web.post("/api/v1/auth/refresh-access-token", self._handle_refresh),
+                web.get("/api/v2/my-system", self._handle_my_system),
+                web.get("/api/v2/my-data", self._handle_my_data),
+                web.get("/api/v1/battery/{battery_id}/details", self._handle_battery),
+                web.get("/api/v1/ws/home", self._handle_home_websocket),
+                web.get("/api/v1/ws/electric-vehicle/{ev_id}", self._handle_ev_websocket),
+            ]
+        )
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        self._session = ClientSession()
+
+    async def async_stop(self) -> None:
+        await self._session.close()
+        await self._runner.cleanup()
+
+    def api(self, token_manager: TokenManager) -> SveaSolarAPI:
+        """Return a pysveasolar client that talks to this fake cloud."""
+        return SveaSolarAPI(session=FakeCloudSession(self._session, self.url), token_manager=token_manager)
+
+    def _issue_access_token(self) -> str:
+        header = _encode({"alg": "HS256", "typ": "JWT"})
+        access_token = f"{header}.{_encode({'exp': int(time.time()) + ACCESS_TOKEN_LIFETIME})}.{secrets.token_hex(8)}"
+        self._access_tokens.add(access_token)
+        return access_token
+
+    def _authorized(self, request: web.Request) -> bool:
+        return request.headers.get("Authorization", "").removeprefix("Bearer ") in self._access_tokens
+
+    async def _async_respond(self, request: web.Request, data) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized
+        return web.json_response(data)
+
+    async def _handle_login(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        credentials = await request.json()
+        if not credentials.get("email") or not credentials.get("password"):
+            raise web.HTTPBadRequest
+        refresh_token = secrets.token_hex(16)
+        self._refresh_tokens.add(refresh_token)
+        return web.json_response({"accessToken": self._issue_access_token(), "refreshToken": refresh_token})
+
+    async def _handle_refresh(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if (await request.json()).get("refreshToken") not in self._refresh_tokens:
+            raise web.HTTPUnauthorized
+        return web.json_response({"accessToken": self._issue_access_token()})
+
+    async def _handle_my_system(self, request: web.Request) -> web.Response:
+        return await self._async_respond(
+            request,
+            {
+                "electricVehicles": [{"id": ev["id"], "name": ev["name"]} for ev in self.vehicles],
+                "locations": [
+                    {
+                        "id": location["id"],
+                        "name": location["name"],
+                        "battery": {"id": battery["id"], "name": battery["name"]},
+                    }
+                    for location, battery in zip(self.locations, self.batteries)
+                ],
+            },
+        )
+
+    async def _handle_my_data(self, request: web.Request) -> web.Response:
+        return await self._async_respond(request, self.locations)
+
+    async def _handle_battery(self, request: web.Request) -> web.Response:
+        battery_id = request.match_info["battery_id"]
+        if (battery := next((item for item in self.batteries if item["id"] == battery_id), None)) is None:
+            raise web.HTTPNotFound
+        return await self._async_respond(
+            request,
+            {
+                "id": battery["id"],
+                "dischargePower": 1000,
+                "status": "Discharging",
+                "stateOfCharge": 50,
+                "chargedEnergy": 2.0,
+                "dischargedEnergy": 1.0,
+                "locationName": battery["locationId"],
+                "locationId": battery["locationId"],
+                "brand": "Fake",
+                "name": battery["name"],
+                "imageUrl": "https://example.com/battery.png",
+                "capacity": "10",
+                "chemistry": "LFP",
+                "typeOfBattery": "Home",
+            },
+        )
+
+    def home_frames(self) -> list[str]:
+        """Return badge frames, each changing the SoC of one battery."""
+        return [
+            _message(
+                "BadgesUpdated",
+                {
+                    "badges": [
+                        {
+                            "id": battery["id"],
+                            "type": "Battery",
+                            "status": "Charging",
+                            "subtitle": {"key": "stateOfCharge", "value": str(random.randint(0, 100))},
+                            "title": battery["name"],
+                            "progress": 0.5,
+                            "imageUrl": None,
+                        }
+                    ]
+                },
+            )
+            for battery in itertools.islice(itertools.cycle(self.batteries), FRAME_POOL)
+        ]
+
+    def ev_frames(self, ev: dict) -> list[str]:
+        """Return vehicle detail frames with a changing battery level."""
+        return [
+            _message(
+                "VehicleDetailsUpdated",
+                {
+                    "name": ev["name"],
+                    "id": ev["id"],
+                    "image": "https://example.com/ev.png",
+                    "vehicleStatus": {
+                        "maxBatteryLevel": 100,
+                        "batteryLevel": random.randint(0, 100),
+                        "range": 200,
+                        "chargeLimit": 80,
+                        "chargingStatus": "Charging",
+                    },
+                    "sessions": [
+                        {
+                            "date": datetime.now(UTC).isoformat(),
+                            "location": None,
+                            "sessionType": "Smart",
+                            "energyInKwh": 12.0,
+                            "cost": 20.0,
+                            "savings": 5.0,
+                        }
+                    ],
+                    "vehicleFeatures": {"charging": True, "smartCharging": True},
+                    "currentSession": None,
+                    "summary": {"energyInKwh": 100.0, "chargingTimeInHours": 10, "savings": 50.0},
+                    "smartChargingStatus": {
+                        "smartChargingStatus": "Active",
+                        "dailyDeadline": "07:00",
+                        "dailyDeadlineDateTime": None,
+                        "isCharging": True,
+                        "protectiveChargeLimit": 20,
+                        "warning": None,
+                    },
+                    "reliabilityLevel": "High",
+                },
+            )
+            for _ in range(FRAME_POOL)
+        ]
+
+    async def _handle_home_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        return await self._async_stream(request, self.home_frames())
+
+    async def _handle_ev_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ev_id = request.match_info["ev_id"]
+        if (ev := next((item for item in self.vehicles if item["id"] == ev_id), None)) is None:
+            raise web.HTTPNotFound
+        return await self._async_stream(request, self.ev_frames(ev))
+
+    async def _async_stream(self, request: web.Request, frames: list[str]) -> web.WebSocketResponse:
+        """Push the frames in a loop until the client goes away, with a KeepAlive every KEEP_ALIVE_INTERVAL."""
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized
+
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        keep_alive_at = 0.0
+        try:
+            for frame in itertools.cycle(frames):
+                if websocket.closed:
+                    break
+                if (now := time.monotonic()) >= keep_alive_at:
+                    keep_alive_at = now + KEEP_ALIVE_INTERVAL
+                    await websocket.send_str(_message("KeepAlive", {"keepAlive": "ping"}))
+                await websocket.send_str(frame)
+                self.messages += 1
+                await asyncio.sleep(1 / self.message_rate if self.message_rate else 0)
+        except ConnectionResetError:
+            pass
+        return websocket
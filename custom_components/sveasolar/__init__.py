@@ -1,31 +1,56 @@
 import asyncio
 import logging
-from datetime import timedelta
+import time
+from collections import Counter
+from collections.abc import Mapping
+from datetime import datetime
 from enum import Enum
+from types import MappingProxyType
+from typing import Any
 
-from aiohttp import ClientError
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform, CONF_USERNAME, CONF_PASSWORD, CONF_ACCESS_TOKEN, EVENT_HOMEASSISTANT_STOP
-from homeassistant.core import HomeAssistant, Event
-from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import Platform, CONF_USERNAME, CONF_PASSWORD
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from pysveasolar.api import SveaSolarAPI
-from pysveasolar.errors import WebsocketError, AuthenticationError
-from pysveasolar.models import (
-    BadgesUpdatedMessage,
-    VehicleDetailsUpdatedMessage,
-    VehicleDetailsData,
-    Battery,
-    Location,
-    BatteryDetailsData,
+from homeassistant.util import dt as dt_util
+from pysveasolar.errors import AuthenticationError
+from pysveasolar.models import VehicleDetailsData, Battery, Location
+
+from .cache import SveaSolarCache
+from .const import (
+    DOMAIN,
+    CONF_POLL_CONCURRENCY,
+    DEFAULT_POLL_CONCURRENCY,
+    CONF_UPDATE_WINDOW,
+    DEFAULT_UPDATE_WINDOW,
+    CONF_TELEMETRY,
+    DEFAULT_TELEMETRY,
+    CONF_TELEMETRY_INTERVAL,
+    DEFAULT_TELEMETRY_INTERVAL,
+    CONF_TELEMETRY_SYSTEMS,
+    FLOW_SOURCES,
+    FLOW_DESTINATIONS,
 )
-from pysveasolar.token_manager import TokenManager
-
-from .const import DOMAIN, CONF_REFRESH_TOKEN
+from .costs import SveaSolarCostMeter
+from .energy import SveaSolarEnergyMeter
+from .hub import SveaSolarHub, SveaSolarLoginBackoff, SveaSolarTokenManager, is_rejection
+from .metrics import SveaSolarMetrics
+from .projection import SveaSolarBatteryDetails, SveaSolarBatteryState, SveaSolarLocation, SveaSolarVehicle
+from .scheduler import POLL_INTERVAL, SveaSolarPollScheduler, power_changed
+from .routing import SveaSolarModels, SveaSolarRoute, SveaSolarSource
+from .snapshot import EMPTY_SNAPSHOT, SveaSolarSnapshot
+from .spot_price import SveaSolarCheapestHours, SveaSolarSpotPriceCache
+from .statistics import SveaSolarStatisticsImporter
+from .telemetry import SveaSolarTelemetry
 
 _LOGGER = logging.getLogger(__name__)
-PLATFORMS = [Platform.SENSOR]
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR]
+DEMAND_DELAY = 1.0
 
 type SveaSolarConfigEntry = ConfigEntry[SveaSolarDataUpdateCoordinator]
 
@@ -43,224 +68,656 @@ class SveaSolarFetchType(str, Enum):
 
 async def async_setup_entry(hass: HomeAssistant, entry: SveaSolarConfigEntry):
     """Set up this integration using UI."""
-    if hass.data.get(DOMAIN) is None:
-        hass.data.setdefault(DOMAIN, {})
-
     if CONF_PASSWORD and CONF_USERNAME not in entry.data:
         raise ConfigEntryAuthFailed
 
-    token_manager = SveaSolarTokenManager(hass, entry)
-    try:
-        api = SveaSolarAPI(session=async_get_clientsession(hass), token_manager=token_manager)
-        await api.async_login(entry.data.get(CONF_USERNAME), entry.data.get(CONF_PASSWORD))
-    except Exception as exception:
-        raise ConfigEntryAuthFailed("Failed to setup API") from exception
-
-    coordinator = SveaSolarDataUpdateCoordinator(hass, entry, api)
-    await coordinator.async_config_entry_first_refresh()
+    hub = SveaSolarHub.async_get(hass, entry)
+    await hub.token_manager.async_load()
+    coordinator = SveaSolarDataUpdateCoordinator(hass, entry, hub)
     entry.runtime_data = coordinator
+    await coordinator.energy.async_load()
+    await coordinator.costs.async_load()
+
+    if await coordinator.async_restore():
+        # Entities are created from the cache right away, the cloud is only contacted in the background
+        entry.async_create_background_task(hass, coordinator.async_warm_start(), f"{DOMAIN} warm start")
+    else:
+        if hub.token_manager.access_token is None:
+            try:
+                await hub.async_login()
+            except Exception as exception:
+                if is_rejection(exception):
+                    raise ConfigEntryAuthFailed("Failed to setup API") from exception
+                raise ConfigEntryNotReady("Failed to login") from exception
 
-    if not coordinator.last_update_success:
-        raise ConfigEntryNotReady from coordinator.last_exception 
-    
-    coordinator.async_websockets_connect()
+        await coordinator.async_config_entry_first_refresh()
+        if not coordinator.last_update_success:
+            raise ConfigEntryNotReady from coordinator.last_exception
 
-    hass.data[DOMAIN][entry.entry_id] = entry.data
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Connect only once the entities were added, so only the streams they listen to are opened
+    coordinator.async_websockets_connect()
 
     entry.add_update_listener(async_reload_entry)
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: SveaSolarConfigEntry):
-    await hass.config_entries.async_forward_entry_unload(entry, "sensor")
-    hass.data[DOMAIN].pop(entry.entry_id)
+    await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    await entry.runtime_data.async_websocket_disconnect()
+
+    hub = hass.data[DOMAIN].get(entry.data.get(CONF_USERNAME))
+    if hub is not None and not hub.has_subscribers:
+        hass.data[DOMAIN].pop(hub.username)
+        await hub.async_shutdown()
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: SveaSolarConfigEntry) -> None:
+    """Remove the stores of a deleted entry, and the tokens once no other entry uses the same account."""
+    await SveaSolarCache(hass, entry.entry_id).async_remove()
+    await SveaSolarStatisticsImporter(hass, entry.entry_id).async_remove()
+    await SveaSolarEnergyMeter(hass, entry.entry_id).async_remove()
+    await SveaSolarCostMeter(hass, entry.entry_id).async_remove()
+
+    username = entry.data.get(CONF_USERNAME)
+    if not any(
+        other.data.get(CONF_USERNAME) == username
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        await SveaSolarTokenManager.async_remove(hass, username)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: SveaSolarConfigEntry) -> None:
     """Reload the config entry when it changed."""
     await hass.config_entries.async_reload(entry.entry_id)
 
 
 class SveaSolarDataUpdateCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, api: SveaSolarAPI):
-        super().__init__(hass, _LOGGER, config_entry=entry, name=DOMAIN, update_interval=timedelta(seconds=90))
-        self._battery_websocket: dict[str, Battery] = {}
-        self._battery_poll: dict[str, BatteryDetailsData] = {}
-        self._ev_websocket: dict[str, VehicleDetailsData] = {}
-        self._location_poll: dict[str, Location] = {}
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, hub: SveaSolarHub):
+        super().__init__(hass, _LOGGER, config_entry=entry, name=DOMAIN, update_interval=POLL_INTERVAL)
+        self._battery_websocket = SveaSolarModels()
+        self._battery_poll = SveaSolarModels()
+        self._ev_websocket = SveaSolarModels()
+        self._location_poll = SveaSolarModels()
+        self._location_flows: dict[str, dict[tuple[str, str], float]] = {}
+        self._models = self._build_models()
+        self._models_view = MappingProxyType(self._models)
 
         self._hass = hass
         self._entry = entry
-        self._api = api
+        self.hub = hub
+        self._api = hub.api
         self.system_ids: dict[SveaSolarSystemType, list] = {}
-        self._home_websocket_reconnect_task: asyncio.Task | None = None
-        self._ev_websocket_reconnect_tasks: dict[str, asyncio.Task | None] = {}
+        self._system_listeners: dict[str, dict[str, tuple[SveaSolarRoute, CALLBACK_TYPE]]] = {}
+        self._demand: Counter[tuple[str, str]] = Counter()
+        self._demand_tracked = False
+        self._unsub_demand: CALLBACK_TYPE | None = None
+        self._snapshots: dict[str, SveaSolarSnapshot] = {}
+        self.snapshots: Mapping[str, SveaSolarSnapshot] = MappingProxyType(self._snapshots)
+        self.devices: dict[str, dict[str, str | None]] = {}
+        self._device_infos: dict[str, DeviceInfo] = {}
+        self._restored: dict[tuple[str, str], StateType] = {}
+        self._cache = SveaSolarCache(hass, entry.entry_id)
+        self.statistics = SveaSolarStatisticsImporter(hass, entry.entry_id)
+        self.energy = SveaSolarEnergyMeter(hass, entry.entry_id)
+        self.costs = SveaSolarCostMeter(hass, entry.entry_id)
+        self.scheduler = SveaSolarPollScheduler()
+        self.metrics = SveaSolarMetrics()
+        self.telemetry: SveaSolarTelemetry | None = None
+        if entry.options.get(CONF_TELEMETRY, DEFAULT_TELEMETRY):
+            self.telemetry = SveaSolarTelemetry(
+                hass,
+                entry.entry_id,
+                self.metrics,
+                entry.options.get(CONF_TELEMETRY_INTERVAL, DEFAULT_TELEMETRY_INTERVAL),
+                entry.options.get(CONF_TELEMETRY_SYSTEMS, []),
+            )
+        self.spot_prices = SveaSolarSpotPriceCache()
+        self._pending: dict[str, tuple[SveaSolarModels, SveaSolarBatteryState | SveaSolarVehicle, float]] = {}
+        self._unsub_flush: CALLBACK_TYPE | None = None
 
     async def _async_setup(self):
-        my_system = await self._api.async_get_my_system()
+        try:
+            my_system = await self._api.async_get_my_system()
+        except AuthenticationError as err:
+            _LOGGER.debug("Stored tokens were rejected, logging in again: %s", err)
+            await self._async_login(self.hub.token_manager.access_token)
+            my_system = await self._api.async_get_my_system()
         self.system_ids = self._extract_system_ids(my_system)
 
-    def async_websockets_connect(self) -> None:
-        self._home_websocket_reconnect_task = asyncio.create_task(self._async_start_home_websocket_loop())
-
-        for system in self.system_ids[SveaSolarSystemType.EV]:
-            system = next(iter(system))
-            self._ev_websocket_reconnect_tasks[system] = asyncio.create_task(
-                self._async_start_ev_websocket_loop(system)
-            )
-
-        async def async_websocket_disconnect_listener(_: Event) -> None:
-            await self.async_websocket_disconnect()
+    async def async_restore(self) -> bool:
+        """Load the topology and last known values from the warm-start cache, returning False without one."""
+        if (cache := await self._cache.async_load()) is None:
+            return False
+
+        self.system_ids = {SveaSolarSystemType(system_type): ids for system_type, ids in cache["system_ids"].items()}
+        self.devices = cache.get("devices", {})
+        self._restored = {
+            (system_id, key): value
+            for system_id, values in cache.get("values", {}).items()
+            for key, value in values.items()
+        }
+        self.data = self._models_view
+        return True
 
-        self._entry.async_on_unload(
-            self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_websocket_disconnect_listener)
+    async def async_warm_start(self) -> None:
+        """Log in and refresh in the background after setting up from the cache."""
+        self._entry.async_on_unload(self.async_shutdown)
+        cached_system_ids = self.system_ids
+        try:
+            if self.hub.token_manager.access_token is None:
+                await self._async_login()
+            await self._async_setup()
+        except ConfigEntryAuthFailed:
+            self._entry.async_start_reauth(self.hass)
+            return
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Failed to fetch the Svea Solar systems, using the cached ones: %s", err)
+            self.system_ids = cached_system_ids
+
+        if self.system_ids != cached_system_ids:
+            _LOGGER.info("The Svea Solar systems changed since they were cached, reloading")
+            # The reloaded entry restores from the cache, which has to describe the new systems already
+            await self._cache.async_save(self._cache_data())
+            self.hass.config_entries.async_schedule_reload(self._entry.entry_id)
+            return
+
+        await self.async_refresh()
+
+    @callback
+    def _async_import_statistics(self) -> None:
+        """Import the hours since the last import as long-term statistics in the background."""
+        names = {
+            system_id: name
+            for systems in self.system_ids.values()
+            for system in systems
+            for system_id, name in system.items()
+        }
+        spot_prices = {
+            location_id: (names.get(location_id, location_id), self.spot_prices.get(location).get("today_raw") or [])
+            for location_id, location in self._location_poll.items()
+        }
+        batteries = {
+            battery_id: (names.get(battery_id, battery_id), details)
+            for battery_id, details in self._battery_poll.items()
+        }
+        self._entry.async_create_background_task(
+            self.hass, self.statistics.async_import(spot_prices, batteries), f"{DOMAIN} statistics import"
         )
 
-        self._entry.async_on_unload(self.async_websocket_disconnect)
+    @callback
+    def _async_schedule_cache_save(self) -> None:
+        self._cache.async_schedule_save(self._cache_data)
+
+    @callback
+    def _cache_data(self) -> dict:
+        values: dict[str, dict[str, StateType]] = {}
+        current = {
+            (system_id, key): value
+            for system_id, snapshot in self._snapshots.items()
+            for key, value in snapshot.values.items()
+        }
+        for (system_id, key), value in (self._restored | current).items():
+            if value is None or isinstance(value, (str, int, float)):
+                values.setdefault(system_id, {})[key] = value
+        return {
+            "system_ids": {system_type.value: ids for system_type, ids in self.system_ids.items()},
+            "devices": self.devices,
+            "values": values,
+        }
 
-    async def async_websocket_disconnect(self):
-        """Define an event handler to disconnect from the websocket."""
-        await self._async_cancel_home_websocket_loop()
-        for disconnect_system in self.system_ids[SveaSolarSystemType.EV]:
-            disconnect_system = next(iter(disconnect_system))
-            await self._async_cancel_ev_websocket_loop(disconnect_system)
-
-    async def _async_start_home_websocket_loop(self) -> None:
-        """Start a websocket reconnection loop."""
-        try:
-            await self.ws_battery_connect()
-        except asyncio.CancelledError:
-            _LOGGER.debug("Request to cancel websocket loop received")
-            raise
-        except WebsocketError as err:
-            _LOGGER.error("Failed to connect to websocket: %s", err)
-        except Exception as err:  # noqa: BLE001
-            _LOGGER.error("Unknown exception while connecting to websocket: %s", err)
+    def _ids(self, system_type: SveaSolarSystemType) -> list[str]:
+        return [next(iter(system)) for system in self.system_ids.get(system_type, [])]
 
-        _LOGGER.debug("Reconnecting to websocket")
-        await self._async_cancel_home_websocket_loop()
-        self._home_websocket_reconnect_task = self._hass.async_create_task(self._async_start_home_websocket_loop())
+    def has_demand(self, system_id: str, fetch_type: SveaSolarFetchType) -> bool:
+        """Return True while an entity needs the data of a system from a source, or until the entities were added."""
+        return not self._demand_tracked or self._demand[(system_id, fetch_type)] > 0
 
-    async def _async_start_ev_websocket_loop(self, system: str) -> None:
-        """Start a websocket reconnection loop."""
-        try:
-            await self.ws_ev_connect(system)
-        except asyncio.CancelledError:
-            _LOGGER.debug("Request to cancel websocket loop received")
-            raise
-        except WebsocketError as err:
-            _LOGGER.error("Failed to connect to websocket: %s", err)
-        except Exception as err:  # noqa: BLE001
-            _LOGGER.error("Unknown exception while connecting to websocket: %s", err)
+    def _demanded_streams(self) -> tuple[list[str], bool]:
+        """Return the EVs and whether the batteries have entities listening to their websocket."""
+        ev_ids = [
+            ev_id for ev_id in self._ids(SveaSolarSystemType.EV) if self.has_demand(ev_id, SveaSolarFetchType.WEBSOCKET)
+        ]
+        home = any(
+            self.has_demand(battery_id, SveaSolarFetchType.WEBSOCKET)
+            for battery_id in self._ids(SveaSolarSystemType.BATTERY)
+        )
+        return ev_ids, home
 
-        _LOGGER.debug("Reconnecting to websocket")
-        await self._async_cancel_ev_websocket_loop(system)
-        self._websocket_reconnect_task = self._hass.async_create_task(self._async_start_home_websocket_loop())
+    def async_websockets_connect(self) -> None:
+        """Start tracking which systems the added entities need and connect the streams they listen to."""
+        self._demand_tracked = True
+        ev_ids, home = self._demanded_streams()
+        self.hub.async_subscribe(self, ev_ids, home)
+        self._entry.async_on_unload(self.async_websocket_disconnect)
 
-    async def _async_cancel_home_websocket_loop(self) -> None:
-        """Stop any existing websocket reconnection loop."""
-        if self._home_websocket_reconnect_task:
-            self._home_websocket_reconnect_task.cancel()
-            try:
-                await self._home_websocket_reconnect_task
-            except asyncio.CancelledError:
-                _LOGGER.debug("Websocket reconnection task successfully canceled")
-                self._home_websocket_reconnect_task = None
-
-            await self._api.async_home_websocket_disconnect()
-
-    async def _async_cancel_ev_websocket_loop(self, system: str) -> None:
-        """Stop any existing websocket reconnection loop."""
-        if system in self._ev_websocket_reconnect_tasks.keys():
-            task = self._ev_websocket_reconnect_tasks[system]
-            if not task:
-                return
+    @callback
+    def _async_demand_changed(self) -> None:
+        if self._demand_tracked and self._unsub_demand is None:
+            self._unsub_demand = async_call_later(self.hass, DEMAND_DELAY, self._async_apply_demand)
+
+    @callback
+    def _async_apply_demand(self, _now: datetime) -> None:
+        """Follow entities being enabled, disabled or removed, batching the changes of a reload or bulk edit."""
+        self._unsub_demand = None
+        ev_ids, home = self._demanded_streams()
+        _LOGGER.debug("Websockets needed for EVs %s, batteries %s", ev_ids, home)
+        self._entry.async_create_background_task(
+            self.hass, self.hub.async_update_subscription(self, ev_ids, home), f"{DOMAIN} subscription update"
+        )
 
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                _LOGGER.debug("Websocket reconnection task successfully canceled")
-                self._ev_websocket_reconnect_tasks[system] = None
+        polled = self._ids(SveaSolarSystemType.BATTERY) + self._ids(SveaSolarSystemType.LOCATION)
+        if any(
+            self.has_demand(system_id, SveaSolarFetchType.POLL) and self.scheduler.is_due(system_id)
+            for system_id in polled
+        ):
+            self.hass.async_create_task(self.async_request_refresh())
 
-            await self._api.async_ev_websocket_disconnect(system)
+    async def async_websocket_disconnect(self):
+        """Stop receiving websocket messages from the account hub."""
+        if self._unsub_demand is not None:
+            self._unsub_demand()
+            self._unsub_demand = None
+        self._demand_tracked = False
+        await self.hub.async_unsubscribe(self)
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        self._pending.clear()
 
     async def _async_update_data(self):
+        failed_access_token = self.hub.token_manager.access_token
         try:
-            if len(self.system_ids[SveaSolarSystemType.BATTERY]) > 0:
-                battery = await self._api.async_get_battery(next(iter(self.system_ids[SveaSolarSystemType.BATTERY][0])))
-                self._battery_poll[battery.id] = battery
-
-            my_data = await self._api.async_get_my_data()
-            for location in my_data:
-                self._location_poll[location.id] = location
-
-            return self._data_update()
-        except AuthenticationError as err:
-            _LOGGER.warning(f"Failed to refresh token, trying to login again: {err}")
-            await self.async_websocket_disconnect()
-            await self._async_login()
-            self.async_websockets_connect()
-            return await self._async_update_data()
+            try:
+                return await self._async_poll_due()
+            except AuthenticationError as err:
+                _LOGGER.warning("The access token was rejected, logging in again: %s", err)
+                await self._async_login(failed_access_token)
+            # Retried once, a token rejected again right after logging in fails this update
+            return await self._async_poll_due()
+        except (ConfigEntryAuthFailed, UpdateFailed):
+            raise
         except Exception as err:
             raise UpdateFailed(f"Error communicating with API: {err}")
+        finally:
+            self.update_interval = self.scheduler.next_interval()
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("Poll schedule: %s", self.scheduler.as_dict())
+
+    async def _async_poll_due(self):
+        semaphore = asyncio.Semaphore(self._entry.options.get(CONF_POLL_CONCURRENCY, DEFAULT_POLL_CONCURRENCY))
+        battery_ids = self._demanded_polls(SveaSolarSystemType.BATTERY)
+        polls = [
+            self._async_poll_battery(semaphore, battery_id)
+            for battery_id in battery_ids
+            if self.scheduler.is_due(battery_id)
+        ]
 
-    async def _async_login(self):
+        # All locations come from one request, which is skipped when no location is needed
+        location_ids = self._demanded_polls(SveaSolarSystemType.LOCATION)
+        if any(self.scheduler.is_due(location_id) for location_id in location_ids):
+            polls.append(self._async_poll_locations(semaphore, location_ids))
+
+        results = await asyncio.gather(*polls, return_exceptions=True)
+        failures = [result for result in results if isinstance(result, Exception)]
+        if auth_error := next((err for err in failures if isinstance(err, AuthenticationError)), None):
+            raise auth_error
+        if failures and len(failures) == len(results):
+            raise failures[0]
+        for failure in failures:
+            _LOGGER.warning("Failed to poll system, keeping its last known data: %s", failure)
+
+        with self.metrics.timer("values"):
+            for system_id in list(self._system_listeners):
+                self._async_refresh_values(system_id)
+        self._async_schedule_cache_save()
+        self._async_import_statistics()
+        return self._models_view
+
+    def _demanded_polls(self, system_type: SveaSolarSystemType) -> list[str]:
+        """Return the systems to poll, taking the others off the schedule."""
+        system_ids = []
+        for system_id in self._ids(system_type):
+            if self.has_demand(system_id, SveaSolarFetchType.POLL):
+                system_ids.append(system_id)
+            else:
+                self.scheduler.record_skip(system_id)
+        return system_ids
+
+    async def _async_poll_battery(self, semaphore: asyncio.Semaphore, battery_id: str) -> None:
+        async with semaphore:
+            self.scheduler.record_request()
+            try:
+                with self.metrics.timer("poll.battery"):
+                    battery = await self._api.async_get_battery(battery_id)
+            except AuthenticationError:
+                raise
+            except Exception:
+                self.metrics.increment("poll.errors")
+                self.scheduler.record_error(battery_id)
+                raise
+
+        previous = self._battery_poll.get(battery.id)
+        details = SveaSolarBatteryDetails.from_model(battery)
+        self._battery_poll.store(battery.id, details)
+        self._record_device(battery.id, details)
+        self.scheduler.record_poll(
+            battery.id,
+            active=power_changed(
+                None if previous is None else {"discharge": (previous.dischargePower or 0) / 1000},
+                {"discharge": (details.dischargePower or 0) / 1000},
+            ),
+        )
+
+    async def _async_poll_locations(self, semaphore: asyncio.Semaphore, location_ids: list[str]) -> None:
+        async with semaphore:
+            self.scheduler.record_request()
+            try:
+                with self.metrics.timer("poll.my_data"):
+                    my_data = await self._api.async_get_my_data()
+            except AuthenticationError:
+                raise
+            except Exception:
+                self.metrics.increment("poll.errors")
+                for location_id in location_ids:
+                    self.scheduler.record_error(location_id)
+                raise
+
+        for model in my_data:
+            location = SveaSolarLocation.from_model(model)
+            self._location_poll.store(location.id, location)
+            previous_flows = self._location_flows.get(location.id)
+            self._location_flows[location.id] = flows = self._index_flows(model)
+            if (interval := self.energy.async_record(location.id, flows)) is not None:
+                if (price := self._price_at(location, (interval.start + interval.end) / 2)) is not None:
+                    self.costs.async_record(location.id, interval, price)
+            self.scheduler.record_poll(location.id, active=power_changed(previous_flows, flows), spot_price=True)
+
+    def _price_at(self, location: SveaSolarLocation, timestamp: float) -> float | None:
+        """Return the spot price in SEK/kWh of the hour of a timestamp, or the current price when it is unknown."""
+        if location.spotPrice is None:
+            return None
+        search = self.spot_prices.cheapest_hours(location)
+        price = search.price_at(dt_util.utc_from_timestamp(timestamp)) if search is not None else None
+        return (location.spotPrice.value if price is None else price) / 100
+
+    @staticmethod
+    def _index_flows(location: Location) -> dict[tuple[str, str], float]:
+        """Map (direction, type) of each power flow right now to its value, keeping the first of duplicates."""
+        flows: dict[tuple[str, str], float] = {}
+        if location.statusRightNow is None:
+            return flows
+
+        for source in location.statusRightNow.sources:
+            flows.setdefault((FLOW_SOURCES, source.type), source.value)
+        for destination in location.statusRightNow.destinations:
+            flows.setdefault((FLOW_DESTINATIONS, destination.type), destination.value)
+        return flows
+
+    async def _async_login(self, failed_access_token: str | None = None):
         try:
-            await self._api.async_login(
-                username=self._entry.data.get(CONF_USERNAME), password=self._entry.data.get(CONF_PASSWORD)
-            )
-        except ClientError as err:
-            _LOGGER.warning(f"Failed to login. Raising Re-Auth: {err}")
-            raise ConfigEntryAuthFailed from err
+            await self.hub.async_login(failed_access_token)
+        except SveaSolarLoginBackoff as err:
+            raise UpdateFailed(str(err)) from err
         except Exception as err:
-            _LOGGER.warning(f"Failed to login due to exception: {err}")
+            if is_rejection(err):
+                _LOGGER.warning("The credentials were rejected. Raising Re-Auth: %s", err.__cause__ or err)
+                raise ConfigEntryAuthFailed from err
+            _LOGGER.warning("Failed to login due to exception: %s", err.__cause__ or err)
             raise UpdateFailed from err
 
-    async def ws_battery_connect(self):
-        def on_keep_alive(msg):
-            _LOGGER.debug("Keep Alive from SveaSolar Home WS")
-
-        def on_connected():
-            _LOGGER.debug("Connected to SveaSolar Home WS")
-
-        def on_data(msg: BadgesUpdatedMessage):
-            if msg.data.has_battery:
-                battery: Battery = msg.data.battery
-                _LOGGER.debug(f"Battery id: {battery.battery_id}")
-                _LOGGER.debug(f"Battery name: {battery.name}")
-                _LOGGER.debug(f"Battery status: {battery.status}")
-                _LOGGER.debug(f"Battery SoC: {battery.state_of_charge}")
-
-                self._battery_websocket[battery.battery_id] = battery
-
-                self.async_set_updated_data(self._data_update())
-                self.async_update_listeners()
-
-        await self._api.async_home_websocket(
-            data_callback=on_data, connected_callback=on_connected, keep_alive_callback=on_keep_alive
+    @callback
+    def async_handle_battery(self, battery: Battery) -> None:
+        self.metrics.increment("websocket.messages")
+        self.scheduler.record_websocket(battery.battery_id)
+        if self.telemetry is not None:
+            self.telemetry.async_publish_battery(battery)
+
+        state = SveaSolarBatteryState.from_model(battery)
+        previous = self._battery_websocket.get(state.battery_id)
+        urgent = previous is None or previous.status != state.status
+        self._async_queue_update(self._battery_websocket, state.battery_id, state, urgent)
+
+    @callback
+    def async_handle_ev(self, ev: VehicleDetailsData) -> None:
+        self.metrics.increment("websocket.messages")
+        self.scheduler.record_websocket(ev.id)
+        if self.telemetry is not None:
+            self.telemetry.async_publish_ev(ev)
+
+        vehicle = SveaSolarVehicle.from_model(ev)
+        previous = self._ev_websocket.get(vehicle.id)
+        urgent = previous is None or previous.vehicleStatus.chargingStatus != vehicle.vehicleStatus.chargingStatus
+        self._async_queue_update(self._ev_websocket, vehicle.id, vehicle, urgent)
+
+    @callback
+    def _async_queue_update(
+        self,
+        models: SveaSolarModels,
+        system_id: str,
+        model: SveaSolarBatteryState | SveaSolarVehicle,
+        urgent: bool,
+    ) -> None:
+        """Keep the latest model per system and flush at most once per update window.
+
+        Status transitions flush right away so charging and battery state changes are never delayed.
+        """
+        queued = self._pending[system_id][2] if system_id in self._pending else time.monotonic()
+        self._pending[system_id] = (models, model, queued)
+
+        window = self._entry.options.get(CONF_UPDATE_WINDOW, DEFAULT_UPDATE_WINDOW)
+        if urgent or window <= 0:
+            self._async_flush()
+        elif self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self.hass, window, self._async_flush)
+
+    @callback
+    def _async_flush(self, _now: datetime | None = None) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+        pending, self._pending = self._pending, {}
+        now = time.monotonic()
+        for system_id, (models, model, queued) in pending.items():
+            self.metrics.observe("websocket.queue_lag", now - queued)
+            self._async_update_system(models, system_id, model)
+
+    @callback
+    def async_handle_websocket_state(self, ev_id: str | None, connected: bool) -> None:
+        """Fall back to polling the batteries while the home websocket is down."""
+        if ev_id is not None:
+            self.scheduler.record_websocket_state(ev_id, connected)
+            return
+
+        battery_ids = [next(iter(battery)) for battery in self.system_ids[SveaSolarSystemType.BATTERY]]
+        for battery_id in battery_ids:
+            self.scheduler.record_websocket_state(battery_id, connected)
+
+        if not connected and battery_ids:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_add_system_listener(
+        self,
+        system_id: str,
+        system_type: SveaSolarSystemType,
+        description: EntityDescription,
+        update_callback: CALLBACK_TYPE,
+    ) -> CALLBACK_TYPE:
+        """Keep the value of a description up to date and call back when a websocket message changed it."""
+        route = self._build_route(system_type, description)
+        listeners = self._system_listeners.setdefault(system_id, {})
+        if description.key in listeners:
+            self._remove_demand(system_id, listeners[description.key][0])
+        listeners[description.key] = (route, update_callback)
+        self._demand.update((system_id, fetch_type) for fetch_type in route.fetch_types)
+        self._async_demand_changed()
+        snapshot = self._snapshots.get(system_id, EMPTY_SNAPSHOT)
+        self._snapshots[system_id] = snapshot.replace(
+            values={**snapshot.values, description.key: self._compute_value(system_id, route)},
+            attributes=self._compute_attributes(system_id, snapshot),
         )
 
-    async def ws_ev_connect(self, ev_id: str):
-        def on_connected():
-            _LOGGER.debug("Connected to SveaSolar EV WS")
+        @callback
+        def remove_listener() -> None:
+            listeners = self._system_listeners.get(system_id, {})
+            if listeners.get(description.key, (None,))[0] is not route:
+                return
 
-        def on_data(msg: VehicleDetailsUpdatedMessage):
-            ev: VehicleDetailsData = msg.data
-            _LOGGER.debug(f"EV id: {ev.id}")
-            _LOGGER.debug(f"EV name: {ev.name}")
-            _LOGGER.debug(f"EV charging status: {ev.vehicleStatus.chargingStatus}")
-            _LOGGER.debug(f"EV battery status: {ev.vehicleStatus.batteryLevel}")
+            del listeners[description.key]
+            self._remove_demand(system_id, route)
+            self._async_demand_changed()
+            if not listeners:
+                self._system_listeners.pop(system_id, None)
+                self._snapshots.pop(system_id, None)
+            elif (snapshot := self._snapshots.get(system_id)) is not None:
+                self._snapshots[system_id] = snapshot.replace(
+                    values={key: value for key, value in snapshot.values.items() if key != description.key}
+                )
+
+        return remove_listener
+
+    def _remove_demand(self, system_id: str, route: SveaSolarRoute) -> None:
+        self._demand.subtract((system_id, fetch_type) for fetch_type in route.fetch_types)
+        for fetch_type in route.fetch_types:
+            if self._demand[(system_id, fetch_type)] <= 0:
+                del self._demand[(system_id, fetch_type)]
+
+    def _build_route(self, system_type: SveaSolarSystemType, description: EntityDescription) -> SveaSolarRoute:
+        """Resolve the model dicts of the preferred source and the fallbacks of a description once."""
+        if description.flow is not None or description.cost is not None:
+            return SveaSolarRoute(
+                description.key,
+                (),
+                description.flow,
+                integrated=description.integrated,
+                cost=description.cost,
+                fetch_types=frozenset({SveaSolarFetchType.POLL}),
+            )
 
-            self._ev_websocket[ev.id] = ev
-            self.async_set_updated_data(self._data_update())
-            self.async_update_listeners()
+        sources = [
+            (fetch_type, value_fn)
+            for fetch_type, value_fn in ((description.fetch_type, description.value_fn), *description.fallbacks)
+            if system_type in self._models[fetch_type]
+        ]
+        return SveaSolarRoute(
+            description.key,
+            tuple(SveaSolarSource(self._models[fetch_type][system_type], value_fn) for fetch_type, value_fn in sources),
+            fetch_types=frozenset(fetch_type for fetch_type, _ in sources),
+        )
 
-        await self._api.async_ev_websocket(ev_id, data_callback=on_data, connected_callback=on_connected)
+    @callback
+    def _async_update_system(self, models: SveaSolarModels, system_id: str, model) -> None:
+        """Store a websocket model and notify only the entities whose value changed.
+
+        Messages that only differ in fields outside the projection compare equal and are skipped.
+        """
+        if models.get(system_id) == model:
+            models.received[system_id] = time.monotonic()
+            return
+
+        models.store(system_id, model)
+        with self.metrics.timer("values"):
+            changed = self._async_refresh_values(system_id, models)
+        with self.metrics.timer("fan_out"):
+            for update_callback in changed:
+                update_callback()
+        self.metrics.increment("state_updates", len(changed))
+        if changed:
+            self._async_schedule_cache_save()
+
+    def _record_device(self, system_id: str, details: SveaSolarBatteryDetails) -> None:
+        """Remember the manufacturer and location of a polled battery, so its device can be created from the cache.
+
+        Only the polled battery details carry them, the websocket models have neither.
+        """
+        device = {"manufacturer": details.brand, "via_device": details.locationId}
+        if any(device.values()) and self.devices.get(system_id) != device:
+            self.devices[system_id] = device
+            self._device_infos.pop(system_id, None)
+
+    def device_info(self, system_id: str, system_name: str) -> DeviceInfo:
+        """Return the device info of a system, built once per change of its manufacturer or location."""
+        if (device_info := self._device_infos.get(system_id)) is None:
+            device = self.devices.get(system_id, {})
+            location_id = device.get("via_device")
+            device_info = self._device_infos[system_id] = DeviceInfo(
+                identifiers={(DOMAIN, system_id)},
+                name=system_name,
+                manufacturer=device.get("manufacturer"),
+                via_device=None if location_id is None else (DOMAIN, location_id),
+            )
+        return device_info
+
+    @callback
+    def async_update_listeners(self) -> None:
+        with self.metrics.timer("fan_out"):
+            super().async_update_listeners()
+
+    @callback
+    def _async_refresh_values(self, system_id: str, models: SveaSolarModels | None = None) -> list[CALLBACK_TYPE]:
+        """Recompute the snapshot of a system, returning the callbacks of the values that changed.
+
+        With `models`, only the values read from that source are recomputed, which is all a websocket message can
+        change. The snapshot is only replaced when something in it changed. New spot price attributes call back every
+        entity of the location, which happens once per price update.
+        """
+        listeners = self._system_listeners.get(system_id, {})
+        snapshot = self._snapshots.get(system_id, EMPTY_SNAPSHOT)
+        if models is None:
+            attributes = self._compute_attributes(system_id, snapshot)
+        else:
+            attributes = snapshot.attributes
+            listeners = {key: listener for key, listener in listeners.items() if listener[0].reads(models)}
+        values = {key: self._compute_value(system_id, route) for key, (route, _) in listeners.items()}
 
-    def _data_update(self):
+        if attributes is not snapshot.attributes:
+            changed = [update_callback for _, update_callback in listeners.values()]
+        else:
+            changed = [
+                update_callback
+                for key, (_, update_callback) in listeners.items()
+                if key not in snapshot.values or snapshot.values[key] != values[key]
+            ]
+        if changed:
+            self._snapshots[system_id] = snapshot.replace(values={**snapshot.values, **values}, attributes=attributes)
+        return changed
+
+    def value(self, system_id: str, key: str) -> StateType:
+        """Return the value of a sensor from the snapshot of its system."""
+        return self._snapshots.get(system_id, EMPTY_SNAPSHOT).values.get(key)
+
+    def cheapest_hours(self, system_id: str) -> SveaSolarCheapestHours | None:
+        """Return the cheapest hours search over the current spot prices of a location."""
+        if (location := self._location_poll.get(system_id)) is None:
+            return None
+        return self.spot_prices.cheapest_hours(location)
+
+    def _compute_attributes(self, system_id: str, snapshot: SveaSolarSnapshot) -> Mapping[str, Any]:
+        """Return the spot price attributes of a location, shared with the spot price cache."""
+        if (location := self._location_poll.get(system_id)) is None:
+            return snapshot.attributes
+        return self.spot_prices.get(location)
+
+    def _compute_value(self, system_id: str, route: SveaSolarRoute) -> StateType:
+        """Select the value from the freshest source, keeping the cached value until any source has data."""
+        restored = self._restored.get((system_id, route.key))
+        if route.integrated:
+            total = self.energy.total(system_id, route.flow)
+            return restored if total is None else total
+        if route.cost is not None:
+            total = self.costs.total(system_id, *route.cost)
+            return restored if total is None else total
+        if route.flow is not None:
+            flows = self._location_flows.get(system_id)
+            return restored if flows is None else flows.get(route.flow, 0)
+
+        return route.select(system_id, restored)
+
+    def _build_models(self):
         data = {
             SveaSolarFetchType.POLL: {
                 SveaSolarSystemType.BATTERY: self._battery_poll,
@@ -288,41 +745,3 @@ class SveaSolarDataUpdateCoordinator(DataUpdateCoordinator):
             SveaSolarSystemType.BATTERY: batteries,
             SveaSolarSystemType.LOCATION: locations,
         }
-
-
-class SveaSolarTokenManager(TokenManager):
-    def __init__(self, hass: HomeAssistant, entry: SveaSolarConfigEntry):
-        self._hass = hass
-        self._entry = entry
-        refresh_token = entry.data.get(CONF_REFRESH_TOKEN)
-        access_token = entry.data.get(CONF_ACCESS_TOKEN)
-        super().__init__(access_token, refresh_token)
-
-    def update(self, access_token: str, refresh_token: str):
-        super().update(access_token, refresh_token)
-        _LOGGER.debug("Tokens updated")
-        _LOGGER.debug(f"Access token: {self._mask_access_token(access_token)}")
-        _LOGGER.debug(f"Refresh token: {self._mask_access_token(refresh_token)}")
-
-        self._hass.config_entries.async_update_entry(
-            self._entry,
-            data={
-                CONF_REFRESH_TOKEN: refresh_token,
-                CONF_ACCESS_TOKEN: access_token,
-                CONF_USERNAME: self._entry.data.get(CONF_USERNAME),
-                CONF_PASSWORD: self._entry.data.get(CONF_PASSWORD),
-            },
-        )
-
-    @staticmethod
-    def _mask_access_token(token: str):
-        if token is None:
-            return "*"
-        if len(token) == 1:
-            return "*"
-        elif len(token) < 4:
-            return token[:2] + "*" * (len(token) - 2)
-        elif len(token) < 10:
-            return token[:2] + "*****" + token[-2:]
-        else:
-            return token[:5] + "*****" + token[-5:]
@@ -0,0 +1,150 @@
+"""Binary sensor platform for Svea Solar."""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Mapping
+
+from homeassistant.components.binary_sensor import ENTITY_ID_FORMAT, BinarySensorEntity, BinarySensorEntityDescription
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from . import SveaSolarConfigEntry, SveaSolarDataUpdateCoordinator, SveaSolarFetchType, SveaSolarSystemType
+from .const import CONF_CHEAPEST_HOURS, DEFAULT_CHEAPEST_HOURS
+from .entity import SveaSolarEntity, SveaSolarEntityDescription
+from .projection import SveaSolarLocation
+from .spot_price import SveaSolarPriceWindow
+
+TYPE_LOCATION_CHEAPEST_HOURS = "location_cheapest_hours"
+TYPE_LOCATION_CHEAPEST_WINDOW = "location_cheapest_window"
+
+
+@dataclass(frozen=True, kw_only=True)
+class SveaSolarBinarySensorEntityDescription(BinarySensorEntityDescription, SveaSolarEntityDescription):
+    contiguous: bool
+
+
+def _spot_price_time(location: SveaSolarLocation) -> str | None:
+    """Change with every spot price update, which calls the entity back to search the new prices."""
+    return None if location.spotPrice is None else location.spotPrice.time
+
+
+BINARY_SENSOR_DESCRIPTIONS = (
+    SveaSolarBinarySensorEntityDescription(
+        key=TYPE_LOCATION_CHEAPEST_HOURS,
+        name="Cheapest hours",
+        icon="mdi:cash-clock",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        value_fn=_spot_price_time,
+        contiguous=False,
+    ),
+    SveaSolarBinarySensorEntityDescription(
+        key=TYPE_LOCATION_CHEAPEST_WINDOW,
+        name="Cheapest window",
+        icon="mdi:cash-clock",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        value_fn=_spot_price_time,
+        contiguous=True,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: SveaSolarConfigEntry, async_add_entities: AddConfigEntryEntitiesCallback
+) -> None:
+    """Setup binary sensor platform."""
+    coordinator = entry.runtime_data
+
+    async_add_entities(
+        SveaSolarCheapestHoursBinarySensor(coordinator, system_id, system_name, description)
+        for inner_dict in coordinator.system_ids.get(SveaSolarSystemType.LOCATION, [])
+        for system_id, system_name in inner_dict.items()
+        for description in BINARY_SENSOR_DESCRIPTIONS
+    )
+
+
+class SveaSolarCheapestHoursBinarySensor(SveaSolarEntity, BinarySensorEntity):
+    """On during the cheapest hours of today of a location, as many hours as set in the options.
+
+    The search is shared through the spot price cache, so it runs once per price update. The state is written again
+    at the next start or end of the cheapest hours and at midnight.
+    """
+
+    entity_description: SveaSolarBinarySensorEntityDescription
+    _entity_id_format = ENTITY_ID_FORMAT
+
+    def __init__(
+        self,
+        coordinator: SveaSolarDataUpdateCoordinator,
+        system_id: str,
+        system_name: str,
+        description: SveaSolarBinarySensorEntityDescription,
+    ) -> None:
+        super().__init__(
+            coordinator, system_id, system_name, SveaSolarSystemType.LOCATION, description.fetch_type, description
+        )
+        self._hours: int = coordinator.config_entry.options.get(CONF_CHEAPEST_HOURS, DEFAULT_CHEAPEST_HOURS)
+        self._window: SveaSolarPriceWindow | None = None
+        self._unsub_change: CALLBACK_TYPE | None = None
+        self._last_written_state: tuple | None = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_change)
+        self._async_update_window()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._async_update_window()
+        state = (self.available, self.is_on, self._window)
+        if state == self._last_written_state:
+            return
+
+        self._last_written_state = state
+        self.async_write_ha_state()
+
+    @callback
+    def _async_update_window(self) -> None:
+        """Look up the cheapest hours of today and schedule the next time the state changes."""
+        now = dt_util.utcnow()
+        today = dt_util.start_of_local_day()
+        tomorrow = dt_util.start_of_local_day(dt_util.now().date() + timedelta(days=1))
+        search = self._coordinator.cheapest_hours(self._system_id)
+        self._window = (
+            None
+            if search is None
+            else search.cheapest(self._hours, self.entity_description.contiguous, today, tomorrow)
+        )
+
+        next_change = tomorrow
+        if self._window is not None and (change := self._window.next_change(now)) is not None:
+            next_change = min(next_change, change)
+
+        self._async_cancel_change()
+        self._unsub_change = async_track_point_in_utc_time(self.hass, self._async_time_changed, next_change)
+
+    @callback
+    def _async_time_changed(self, _now: datetime) -> None:
+        self._unsub_change = None
+        self._handle_coordinator_update()
+
+    @callback
+    def _async_cancel_change(self) -> None:
+        if self._unsub_change is not None:
+            self._unsub_change()
+            self._unsub_change = None
+
+    @property
+    def is_on(self) -> bool | None:
+        if self._window is None:
+            return None
+        return dt_util.utcnow() in self._window
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        if self._window is None:
+            return {"hours": self._hours}
+        return {"hours": self._hours, **self._window.as_dict()}
@@ -0,0 +1,37 @@
+"""Warm-start cache of the system topology and last known values for Svea Solar."""
+
+from collections.abc import Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+CACHE_VERSION = 1
+CACHE_SAVE_DELAY = 60
+
+
+class SveaSolarCache:
+    """Persist what the coordinator needs to create its entities without waiting for the cloud."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store: Store[dict] = Store(hass, CACHE_VERSION, f"{DOMAIN}.{entry_id}.cache")
+
+    async def async_load(self) -> dict | None:
+        """Return the cached snapshot, or None when there is none that describes any system."""
+        data = await self._store.async_load()
+        if not data or not any(data.get("system_ids", {}).values()):
+            return None
+        return data
+
+    @callback
+    def async_schedule_save(self, data_func: Callable[[], dict]) -> None:
+        """Write the snapshot after a delay, so bursts of updates result in a single write."""
+        self._store.async_delay_save(data_func, CACHE_SAVE_DELAY)
+
+    async def async_save(self, data: dict) -> None:
+        """Write the snapshot right away, for when it must be on disk before the entry reloads."""
+        await self._store.async_save(data)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
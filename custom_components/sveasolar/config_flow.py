@@ -3,13 +3,33 @@ from typing import Any, Mapping
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.config_entries import ConfigEntry, ConfigFlowResult, SOURCE_RECONFIGURE
+from homeassistant.config_entries import ConfigEntry, ConfigFlowResult, OptionsFlow, SOURCE_RECONFIGURE
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD, CONF_ACCESS_TOKEN
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from pysveasolar.api import SveaSolarAPI
 from pysveasolar.token_manager import TokenManager
 
-from .const import DOMAIN, CONF_REFRESH_TOKEN, CONFIG_FLOW_TITLE
+from .const import (
+    DOMAIN,
+    CONF_REFRESH_TOKEN,
+    CONFIG_FLOW_TITLE,
+    CONF_POLL_CONCURRENCY,
+    DEFAULT_POLL_CONCURRENCY,
+    CONF_PRICE_ATTRIBUTES,
+    CONF_CHEAPEST_HOURS,
+    DEFAULT_CHEAPEST_HOURS,
+    DEFAULT_PRICE_ATTRIBUTES,
+    CONF_UPDATE_WINDOW,
+    DEFAULT_UPDATE_WINDOW,
+    CONF_TELEMETRY,
+    DEFAULT_TELEMETRY,
+    CONF_TELEMETRY_INTERVAL,
+    DEFAULT_TELEMETRY_INTERVAL,
+    CONF_TELEMETRY_SYSTEMS,
+    SYSTEM_TYPE_LOCATION,
+)
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -25,6 +45,12 @@ class SveaSolarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ig
         self._errors = {}
         self._token_manager = SveaSolarConfigFlowTokenManager()
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return SveaSolarOptionsFlow()
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Handle a flow initialized by the user."""
         self._errors = {}
@@ -108,6 +134,54 @@ class SveaSolarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ig
         await client.async_login(username, password)
 
 
+class SveaSolarOptionsFlow(OptionsFlow):
+    """Handle options for Svea Solar."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        # The systems are only known while the entry is loaded, a filter saved before is kept either way
+        coordinator = getattr(self.config_entry, "runtime_data", None)
+        systems = {
+            system_id: f"{system_name} ({system_type.value})"
+            for system_type, inner_list in (coordinator.system_ids.items() if coordinator is not None else ())
+            if system_type != SYSTEM_TYPE_LOCATION
+            for inner_dict in inner_list
+            for system_id, system_name in inner_dict.items()
+        }
+        telemetry_systems = options.get(CONF_TELEMETRY_SYSTEMS, [])
+        systems.update({system_id: system_id for system_id in telemetry_systems if system_id not in systems})
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_POLL_CONCURRENCY, default=options.get(CONF_POLL_CONCURRENCY, DEFAULT_POLL_CONCURRENCY)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Required(
+                        CONF_PRICE_ATTRIBUTES, default=options.get(CONF_PRICE_ATTRIBUTES, DEFAULT_PRICE_ATTRIBUTES)
+                    ): bool,
+                    vol.Required(
+                        CONF_CHEAPEST_HOURS, default=options.get(CONF_CHEAPEST_HOURS, DEFAULT_CHEAPEST_HOURS)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=24)),
+                    vol.Required(
+                        CONF_UPDATE_WINDOW, default=options.get(CONF_UPDATE_WINDOW, DEFAULT_UPDATE_WINDOW)
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                    vol.Required(CONF_TELEMETRY, default=options.get(CONF_TELEMETRY, DEFAULT_TELEMETRY)): bool,
+                    vol.Required(
+                        CONF_TELEMETRY_INTERVAL,
+                        default=options.get(CONF_TELEMETRY_INTERVAL, DEFAULT_TELEMETRY_INTERVAL),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+                    vol.Optional(CONF_TELEMETRY_SYSTEMS, default=telemetry_systems): cv.multi_select(systems),
+                }
+            ),
+        )
+
+
 class SveaSolarConfigFlowTokenManager(TokenManager):
     """TokenManager implementation for config flow"""
 
@@ -1,6 +1,21 @@
 DOMAIN = "sveasolar"
 CONFIG_FLOW_TITLE = "Svea Solar"
 CONF_REFRESH_TOKEN = "refresh_token"
+CONF_POLL_CONCURRENCY = "poll_concurrency"
+DEFAULT_POLL_CONCURRENCY = 4
+CONF_PRICE_ATTRIBUTES = "price_attributes"
+DEFAULT_PRICE_ATTRIBUTES = False
+CONF_UPDATE_WINDOW = "update_window"
+DEFAULT_UPDATE_WINDOW = 1.0
+CONF_TELEMETRY = "telemetry"
+DEFAULT_TELEMETRY = False
+CONF_TELEMETRY_INTERVAL = "telemetry_interval"
+DEFAULT_TELEMETRY_INTERVAL = 1.0
+CONF_TELEMETRY_SYSTEMS = "telemetry_systems"
+CONF_CHEAPEST_HOURS = "cheapest_hours"
+DEFAULT_CHEAPEST_HOURS = 3
 SYSTEM_TYPE_BATTERY = "battery"
 SYSTEM_TYPE_LOCATION = "location"
 SYSTEM_TYPE_EV = "ev"
+FLOW_SOURCES = "sources"
+FLOW_DESTINATIONS = "destinations"
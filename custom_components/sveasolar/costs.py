@@ -0,0 +1,99 @@
+"""Running cost and savings accounts of Svea Solar locations.
+
+Every energy interval integrated from the power flows is priced at the spot price of its hour and added to the
+accounts of the day and month it falls in. The accounts are stored, so a restart loses nothing.
+"""
+
+from datetime import date, datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, FLOW_SOURCES, FLOW_DESTINATIONS
+from .energy import SveaSolarEnergyInterval, flow_key
+
+COSTS_VERSION = 1
+COSTS_SAVE_DELAY = 60
+
+PERIOD_DAY = "day"
+PERIOD_MONTH = "month"
+
+COST_GRID_IMPORT = "grid_import_cost"
+COST_GRID_EXPORT = "grid_export_revenue"
+COST_BATTERY_SAVINGS = "battery_savings"
+COST_SOLAR_SAVINGS = "solar_savings"
+
+FROM_GRID = flow_key((FLOW_SOURCES, "Grid"))
+TO_GRID = flow_key((FLOW_DESTINATIONS, "Grid"))
+FROM_BATTERY = flow_key((FLOW_SOURCES, "Battery"))
+FROM_SOLAR = flow_key((FLOW_SOURCES, "Solar"))
+USAGE = flow_key((FLOW_DESTINATIONS, "Usage"))
+
+
+def _period_key(period: str, day: date) -> str:
+    return day.isoformat() if period == PERIOD_DAY else day.strftime("%Y-%m")
+
+
+def period_start(period: str) -> datetime:
+    """Return the local start of the current day or month."""
+    today = dt_util.now().date()
+    return dt_util.start_of_local_day(today if period == PERIOD_DAY else today.replace(day=1))
+
+
+class SveaSolarCostMeter:
+    """Grid import cost, export revenue and self-consumption savings in SEK per location, day and month.
+
+    The usage covered by the battery is valued at the spot price as battery savings, and the usage covered by
+    neither the grid nor the battery as solar savings. The cost of charging the battery is part of the grid import.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store: Store[dict] = Store(hass, COSTS_VERSION, f"{DOMAIN}.{entry_id}.costs")
+        self._accounts: dict[str, dict[str, dict[str, Any]]] = {}
+
+    async def async_load(self) -> None:
+        if (data := await self._store.async_load()) is not None:
+            self._accounts = data.get("accounts", {})
+
+    @callback
+    def async_record(self, location_id: str, interval: SveaSolarEnergyInterval, price: float) -> None:
+        """Add an energy interval at a price in SEK/kWh to the accounts of the day and month of its middle."""
+        energy = interval.energy
+        usage = energy.get(USAGE, 0.0)
+        battery_used = min(energy.get(FROM_BATTERY, 0.0), usage)
+        solar_used = min(max(usage - energy.get(FROM_GRID, 0.0) - battery_used, 0.0), energy.get(FROM_SOLAR, 0.0))
+        amounts = {
+            COST_GRID_IMPORT: energy.get(FROM_GRID, 0.0) * price,
+            COST_GRID_EXPORT: energy.get(TO_GRID, 0.0) * price,
+            COST_BATTERY_SAVINGS: battery_used * price,
+            COST_SOLAR_SAVINGS: solar_used * price,
+        }
+
+        day = dt_util.as_local(dt_util.utc_from_timestamp((interval.start + interval.end) / 2)).date()
+        accounts = self._accounts.setdefault(location_id, {})
+        for period in (PERIOD_DAY, PERIOD_MONTH):
+            account = accounts.setdefault(period, {})
+            if account.get("period") != (key := _period_key(period, day)):
+                account.clear()
+                account["period"] = key
+            for cost, amount in amounts.items():
+                account[cost] = account.get(cost, 0.0) + amount
+
+        self._store.async_delay_save(self._data_to_save, COSTS_SAVE_DELAY)
+
+    def total(self, location_id: str, cost: str, period: str) -> float | None:
+        """Return an account of the current day or month in SEK, or None before the first priced interval."""
+        if (account := self._accounts.get(location_id, {}).get(period)) is None:
+            return None
+        if account["period"] != _period_key(period, dt_util.now().date()):
+            return 0.0
+        return round(account.get(cost, 0.0), 2)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {"accounts": self._accounts}
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
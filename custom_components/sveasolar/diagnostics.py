@@ -0,0 +1,36 @@
+"""Diagnostics support for Svea Solar."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_USERNAME, CONF_PASSWORD, CONF_ACCESS_TOKEN
+from homeassistant.core import HomeAssistant
+
+from . import SveaSolarConfigEntry
+from .const import CONF_REFRESH_TOKEN
+from .hub import SveaSolarTokenManager
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, CONF_ACCESS_TOKEN, CONF_REFRESH_TOKEN}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: SveaSolarConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data
+    hub = coordinator.hub
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "tokens": {
+            "access_token": SveaSolarTokenManager.mask_token(hub.token_manager.access_token),
+            "refresh_token": SveaSolarTokenManager.mask_token(hub.token_manager.refresh_token),
+            "access_token_expires_at": SveaSolarTokenManager.expires_at(hub.token_manager.access_token),
+        },
+        "system_ids": coordinator.system_ids,
+        "poll_schedule": coordinator.scheduler.as_dict(),
+        "websockets": hub.websocket_states,
+        "coordinator_metrics": coordinator.metrics.as_dict(),
+        "account_metrics": hub.metrics.as_dict(),
+    }
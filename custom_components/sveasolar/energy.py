@@ -0,0 +1,112 @@
+"""Energy counters integrated from the power flows of Svea Solar locations.
+
+The API only reports the power flowing right now, so every polled sample of the flows of a location is integrated
+with the trapezoidal rule into a running kWh total per flow. The totals and the last sample are stored, so the
+counters continue across restarts.
+"""
+
+import logging
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+ENERGY_VERSION = 1
+ENERGY_SAVE_DELAY = 60
+ENERGY_MAX_GAP = 900.0
+SECONDS_PER_HOUR = 3600.0
+
+
+def flow_key(flow: tuple[str, str]) -> str:
+    return "/".join(flow)
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarEnergyInterval:
+    """The energy in kWh per flow key between two samples, with their timestamps."""
+
+    start: float
+    end: float
+    energy: dict[str, float]
+
+
+class SveaSolarEnergyMeter:
+    """Running kWh totals of the power flows of every location.
+
+    An interval longer than `ENERGY_MAX_GAP` seconds between two samples, like a long restart or failing polls, is
+    not integrated, because a straight line between its samples says nothing about the power in between. The
+    counters then only pause instead of jumping.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store: Store[dict] = Store(hass, ENERGY_VERSION, f"{DOMAIN}.{entry_id}.energy")
+        self._totals: dict[str, dict[str, float]] = {}
+        self._samples: dict[str, tuple[float, dict[str, float]]] = {}
+
+    async def async_load(self) -> None:
+        if (data := await self._store.async_load()) is None:
+            return
+
+        self._totals = data.get("totals", {})
+        self._samples = {
+            location_id: (sample["time"], sample["power"]) for location_id, sample in data.get("samples", {}).items()
+        }
+
+    @callback
+    def async_record(
+        self, location_id: str, flows: Mapping[tuple[str, str], float], timestamp: float | None = None
+    ) -> SveaSolarEnergyInterval | None:
+        """Add the energy since the previous sample of a location, a flow missing from a sample counts as 0 kW.
+
+        Returns the integrated interval, or None when there was none to integrate.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        power = {flow_key(flow): float(value or 0) for flow, value in flows.items()}
+        totals = self._totals.setdefault(location_id, {})
+        for key in power:
+            totals.setdefault(key, 0.0)
+
+        interval = None
+        if (previous := self._samples.get(location_id)) is not None:
+            previous_time, previous_power = previous
+            elapsed = timestamp - previous_time
+            if 0 < elapsed <= ENERGY_MAX_GAP:
+                hours = elapsed / SECONDS_PER_HOUR
+                energy = {
+                    key: max((previous_power.get(key, 0.0) + power.get(key, 0.0)) / 2, 0.0) * hours
+                    for key in power.keys() | previous_power.keys()
+                }
+                for key, value in energy.items():
+                    totals[key] = totals.get(key, 0.0) + value
+                interval = SveaSolarEnergyInterval(previous_time, timestamp, energy)
+            elif elapsed > ENERGY_MAX_GAP:
+                _LOGGER.debug("Skipping %.0f seconds without samples of location %s", elapsed, location_id)
+
+        self._samples[location_id] = (timestamp, power)
+        self._store.async_delay_save(self._data_to_save, ENERGY_SAVE_DELAY)
+        return interval
+
+    def total(self, location_id: str, flow: tuple[str, str]) -> float | None:
+        """Return the energy of a flow in kWh, or None before the first sample of the location."""
+        if (totals := self._totals.get(location_id)) is None:
+            return None
+        return round(totals.get(flow_key(flow), 0.0), 3)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {
+            "totals": self._totals,
+            "samples": {
+                location_id: {"time": sample_time, "power": power}
+                for location_id, (sample_time, power) in self._samples.items()
+            },
+        }
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
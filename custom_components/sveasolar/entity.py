@@ -1,19 +1,35 @@
 """ Base entity for Svea Solar"""
 
-from operator import attrgetter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable
 
 from homeassistant.components.sensor import ENTITY_ID_FORMAT
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from pysveasolar.models import BatteryDetailsData, VehicleDetailsData, Battery, Location
 
-from custom_components.sveasolar import SveaSolarDataUpdateCoordinator, SveaSolarSystemType, DOMAIN, SveaSolarFetchType
+from . import SveaSolarDataUpdateCoordinator, SveaSolarSystemType, DOMAIN, SveaSolarFetchType
+
+
+@dataclass(frozen=True, kw_only=True)
+class SveaSolarEntityDescription:
+    """Where the value of an entity comes from, resolved into a route by the coordinator."""
+
+    fetch_type: SveaSolarFetchType
+    system_type: list[SveaSolarSystemType]
+    value_fn: Callable[[Any], StateType | datetime] | None = None
+    fallbacks: tuple[tuple[SveaSolarFetchType, Callable[[Any], StateType]], ...] = ()
+    flow: tuple[str, str] | None = None
+    integrated: bool = False
+    cost: tuple[str, str] | None = None
 
 
 class SveaSolarEntity(CoordinatorEntity[SveaSolarDataUpdateCoordinator]):
     _attr_has_entity_name = True
     _attr_should_poll = False
+    _entity_id_format = ENTITY_ID_FORMAT
 
     def __init__(
         self,
@@ -31,36 +47,19 @@ class SveaSolarEntity(CoordinatorEntity[SveaSolarDataUpdateCoordinator]):
         self._coordinator = coordinator
         self._system_name = system_name
         self._attr_unique_id = f"{system_id}_{description.key}"
-        self.entity_id = ENTITY_ID_FORMAT.format(f"{DOMAIN}_{system_name}_{description.key}")
+        self.entity_id = self._entity_id_format.format(f"{DOMAIN}_{system_name}_{description.key}")
         self.entity_description = description
 
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the precomputed value of this entity."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._coordinator.async_add_system_listener(
+                self._system_id, self._system_type, self.entity_description, self._handle_coordinator_update
+            )
+        )
+
     @property
     def device_info(self) -> DeviceInfo | None:
         """Return the device info."""
-        entity = self.get_entity()
-        brand = None
-        location_id = None
-
-        if entity is not None and hasattr(entity, "brand"):
-            brand = attrgetter("brand")(entity)
-
-        if entity is not None and hasattr(entity, "locationId"):
-            location_id = (DOMAIN, attrgetter("locationId")(entity))
-
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._system_id)}, name=self._system_name, manufacturer=brand, via_device=location_id
-        )
-
-    def get_entity(
-        self, alternative_fetch=False
-    ) -> Battery | VehicleDetailsData | BatteryDetailsData | Location | None:
-        if self._system_type not in self._coordinator.data[self._fetch_type]:
-            return None
-
-        if alternative_fetch:
-            fetch_type = (
-                SveaSolarFetchType.POLL if self._fetch_type == SveaSolarFetchType.WEBSOCKET else self._fetch_type
-            )
-            return self._coordinator.data[fetch_type][self._system_type].get(self._system_id, None)
-
-        return self._coordinator.data[self._fetch_type][self._system_type].get(self._system_id, None)
+        return self._coordinator.device_info(self._system_id, self._system_name)
@@ -0,0 +1,466 @@
+"""Shared Svea Solar cloud connection for all config entries of an account."""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from functools import partial
+from typing import Protocol
+
+from aiohttp import ClientResponseError
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_USERNAME, CONF_PASSWORD, CONF_ACCESS_TOKEN, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, Event, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+from pysveasolar.api import SveaSolarAPI
+from pysveasolar.errors import AuthenticationError, WebsocketError
+from pysveasolar.models import BadgesUpdatedMessage, VehicleDetailsUpdatedMessage, VehicleDetailsData, Battery
+from pysveasolar.token_manager import TokenManager
+
+from .const import DOMAIN, CONF_REFRESH_TOKEN
+from .metrics import SveaSolarMetrics
+from .websocket import SveaSolarWebsocketStream, SveaSolarWebsocketSupervisor
+
+_LOGGER = logging.getLogger(__name__)
+
+HOME_STREAM = "home"
+EV_STREAM_PREFIX = "ev_"
+# Both the home and the EV websockets send KeepAlive messages
+KEEP_ALIVE_TIMEOUT = 180.0
+TOKEN_STORE_VERSION = 1
+TOKEN_SAVE_DELAY = 10
+# Renew this long before the access token expires, pysveasolar alone would wait until 10 minutes before
+TOKEN_REFRESH_MARGIN = 900
+TOKEN_REFRESH_MIN_DELAY = 60
+LOGIN_BACKOFF_MIN = 10.0
+LOGIN_BACKOFF_MAX = 600.0
+REJECTED_STATUSES = (400, 401, 403)
+
+
+def is_rejection(err: BaseException | None) -> bool:
+    """Return True when the cloud refused the credentials or tokens behind an error wrapped by pysveasolar.
+
+    pysveasolar raises its own errors from the aiohttp error of the failed request, so the response status is only
+    found by following the causes.
+    """
+    while err is not None:
+        if isinstance(err, ClientResponseError):
+            return err.status in REJECTED_STATUSES
+        err = err.__cause__
+    return False
+
+
+class SveaSolarLoginBackoff(Exception):
+    """Raised instead of logging in while a previous failed login is backing off."""
+
+
+class SveaSolarHubSubscriber(Protocol):
+    def async_handle_battery(self, battery: Battery) -> None: ...
+
+    def async_handle_ev(self, ev: VehicleDetailsData) -> None: ...
+
+    def async_handle_websocket_state(self, ev_id: str | None, connected: bool) -> None: ...
+
+
+class SveaSolarHub:
+    """One API client, token manager and set of websockets per Svea Solar account.
+
+    Config entries of the same account subscribe to the hub instead of logging in and connecting on their own.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+        self._hass = hass
+        self.username: str = entry.data.get(CONF_USERNAME)
+        self._password: str = entry.data.get(CONF_PASSWORD)
+        self.metrics = SveaSolarMetrics()
+        self.token_manager = SveaSolarTokenManager(hass, entry, self.metrics, self._async_renew_token)
+        self.api = SveaSolarAPI(session=async_get_clientsession(hass), token_manager=self.token_manager)
+
+        self._login_lock = asyncio.Lock()
+        self.login_failures = 0
+        self._login_retry_at = 0.0
+        self._subscribers: dict[SveaSolarHubSubscriber, set[str]] = {}
+        self._websockets = SveaSolarWebsocketSupervisor(hass, self._async_websocket_state_changed)
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    @classmethod
+    def async_get(cls, hass: HomeAssistant, entry: ConfigEntry) -> "SveaSolarHub":
+        """Return the hub of the account of the entry, creating it if needed."""
+        hubs: dict[str, SveaSolarHub] = hass.data.setdefault(DOMAIN, {})
+        username = entry.data.get(CONF_USERNAME)
+        if username not in hubs:
+            hubs[username] = cls(hass, entry)
+        return hubs[username]
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    async def async_shutdown(self) -> None:
+        """Stop renewing the tokens once the last entry of the account is unloaded, and write them right away."""
+        self.token_manager.async_cancel_refresh()
+        await self.token_manager.async_save()
+
+    async def async_login(self, failed_access_token: str | None = None) -> None:
+        """Log in, letting concurrent callers that hit the same expired token share one login.
+
+        Polls, websockets and the token renewal all log in here. Consecutive failures back off exponentially, and
+        after a successful login the websockets that are down reconnect right away.
+        """
+        async with self._login_lock:
+            if failed_access_token is not None and self.token_manager.access_token != failed_access_token:
+                _LOGGER.debug("Tokens were already refreshed by another caller")
+                return
+
+            if (retry_in := self._login_retry_at - time.monotonic()) > 0:
+                raise SveaSolarLoginBackoff(
+                    f"Logging in failed {self.login_failures} times, retrying in {retry_in:.0f} seconds"
+                )
+
+            self.metrics.increment("logins")
+            try:
+                await self.api.async_login(self.username, self._password)
+            except Exception:
+                self.login_failures += 1
+                self.metrics.increment("login_failures")
+                backoff = min(LOGIN_BACKOFF_MIN * 2 ** (self.login_failures - 1), LOGIN_BACKOFF_MAX)
+                self._login_retry_at = time.monotonic() + backoff
+                raise
+
+            self.login_failures = 0
+            self._login_retry_at = 0.0
+
+        self._websockets.async_wake()
+
+    async def _async_renew_token(self, failed_access_token: str | None) -> None:
+        """Renew the access token with the refresh token, logging in again when the refresh is refused."""
+        try:
+            await self.api.async_get_access_token()
+        except AuthenticationError as err:
+            _LOGGER.debug("Failed to refresh the access token, logging in again: %s", err)
+            await self.async_login(failed_access_token)
+
+    async def _async_login_after_rejection(self, name: str, failed_access_token: str | None) -> None:
+        """Log in after a websocket was rejected, leaving the reconnect to the supervisor."""
+        try:
+            await self.async_login(failed_access_token)
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.debug("Failed to login after websocket %s was rejected: %s", name, err)
+
+    @callback
+    def async_subscribe(self, subscriber: SveaSolarHubSubscriber, ev_ids: list[str], home: bool = True) -> None:
+        """Start forwarding websocket messages to the subscriber, connecting the streams it needs.
+
+        Subscribing again replaces the streams of the subscriber, see `async_update_subscription`.
+        """
+        streams = {f"{EV_STREAM_PREFIX}{ev_id}" for ev_id in ev_ids}
+        if home:
+            streams.add(HOME_STREAM)
+        self._subscribers[subscriber] = streams
+
+        if home:
+            self._websockets.async_start(
+                HOME_STREAM,
+                self.ws_battery_connect,
+                self.api.async_home_websocket_disconnect,
+                keep_alive_timeout=KEEP_ALIVE_TIMEOUT,
+            )
+
+        for ev_id in ev_ids:
+            self._websockets.async_start(
+                f"{EV_STREAM_PREFIX}{ev_id}",
+                partial(self.ws_ev_connect, ev_id),
+                partial(self.api.async_ev_websocket_disconnect, ev_id),
+                keep_alive_timeout=KEEP_ALIVE_TIMEOUT,
+            )
+
+        if self._unsub_stop is None:
+
+            async def async_websocket_disconnect_listener(_: Event) -> None:
+                self._unsub_stop = None
+                await self.async_websocket_disconnect()
+
+            self._unsub_stop = self._hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, async_websocket_disconnect_listener
+            )
+
+    async def async_update_subscription(
+        self, subscriber: SveaSolarHubSubscriber, ev_ids: list[str], home: bool
+    ) -> None:
+        """Replace the streams of a subscriber, connecting new ones and disconnecting the ones nobody needs."""
+        if subscriber not in self._subscribers:
+            return
+
+        self.async_subscribe(subscriber, ev_ids, home)
+        await self._async_stop_unneeded()
+
+    async def async_unsubscribe(self, subscriber: SveaSolarHubSubscriber) -> None:
+        """Stop forwarding to the subscriber and disconnect the streams nobody needs anymore."""
+        if self._subscribers.pop(subscriber, None) is None:
+            return
+
+        await self._async_stop_unneeded()
+        if not self._subscribers and self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+    async def _async_stop_unneeded(self) -> None:
+        needed = set().union(*self._subscribers.values())
+        await asyncio.gather(
+            *(self._websockets.async_stop(name) for name in self._websockets.states if name not in needed)
+        )
+
+    async def async_websocket_disconnect(self):
+        """Define an event handler to disconnect from the websocket."""
+        await self._websockets.async_stop_all()
+
+    @property
+    def websocket_states(self) -> dict[str, bool | None]:
+        return self._websockets.states
+
+    @callback
+    def _async_websocket_state_changed(self, name: str, connected: bool) -> None:
+        if connected:
+            _LOGGER.debug("Websocket %s connected", name)
+            self.metrics.increment(f"websocket.{name}.connects")
+        else:
+            _LOGGER.debug("Websocket %s is down, falling back to polling", name)
+            self.metrics.increment(f"websocket.{name}.disconnects")
+
+        ev_id = name.removeprefix(EV_STREAM_PREFIX) if name != HOME_STREAM else None
+        for subscriber, streams in list(self._subscribers.items()):
+            if name in streams:
+                subscriber.async_handle_websocket_state(ev_id, connected)
+
+    def _record_message(self, stream: SveaSolarWebsocketStream) -> None:
+        """Count a message and record the time since the previous one on the same stream."""
+        previous = stream.last_seen
+        stream.async_alive()
+        self.metrics.increment(f"websocket.{stream.name}.messages")
+        self.metrics.observe("websocket.message_interval", stream.last_seen - previous)
+
+    async def ws_battery_connect(self, stream: SveaSolarWebsocketStream):
+        def on_keep_alive(msg):
+            _LOGGER.debug("Keep Alive from SveaSolar Home WS")
+            stream.async_alive()
+
+        def on_connected():
+            _LOGGER.debug("Connected to SveaSolar Home WS")
+            stream.async_connected()
+
+        def on_data(msg: BadgesUpdatedMessage):
+            self._record_message(stream)
+            if msg.data.has_battery:
+                battery: Battery = msg.data.battery
+                _LOGGER.debug(
+                    "Battery %s (%s): status %s, SoC %s",
+                    battery.battery_id,
+                    battery.name,
+                    battery.status,
+                    battery.state_of_charge,
+                )
+
+                with self.metrics.timer("websocket.home.callback"):
+                    for subscriber, streams in list(self._subscribers.items()):
+                        if HOME_STREAM in streams:
+                            subscriber.async_handle_battery(battery)
+
+        access_token = self.token_manager.access_token
+        try:
+            await self.api.async_home_websocket(
+                data_callback=on_data, connected_callback=on_connected, keep_alive_callback=on_keep_alive
+            )
+        except WebsocketError as err:
+            if is_rejection(err):
+                await self._async_login_after_rejection(stream.name, access_token)
+            raise
+
+    async def ws_ev_connect(self, ev_id: str, stream: SveaSolarWebsocketStream):
+        def on_keep_alive(msg):
+            _LOGGER.debug("Keep Alive from SveaSolar EV WS")
+            stream.async_alive()
+
+        def on_connected():
+            _LOGGER.debug("Connected to SveaSolar EV WS")
+            stream.async_connected()
+
+        def on_data(msg: VehicleDetailsUpdatedMessage):
+            self._record_message(stream)
+            ev: VehicleDetailsData = msg.data
+            _LOGGER.debug(
+                "EV %s (%s): charging status %s, battery %s",
+                ev.id,
+                ev.name,
+                ev.vehicleStatus.chargingStatus,
+                ev.vehicleStatus.batteryLevel,
+            )
+
+            with self.metrics.timer("websocket.ev.callback"):
+                for subscriber, streams in list(self._subscribers.items()):
+                    if stream.name in streams:
+                        subscriber.async_handle_ev(ev)
+
+        access_token = self.token_manager.access_token
+        try:
+            await self.api.async_ev_websocket(
+                ev_id, data_callback=on_data, connected_callback=on_connected, keep_alive_callback=on_keep_alive
+            )
+        except WebsocketError as err:
+            if is_rejection(err):
+                await self._async_login_after_rejection(stream.name, access_token)
+            raise
+
+
+class SveaSolarTokenManager(TokenManager):
+    """Tokens of an account, persisted in their own store so rotating them never writes or reloads the entry.
+
+    The tokens in the entry data only seed the store. Until the store was loaded, updates are neither saved nor
+    scheduled for renewal, so the tokens of the entry can never replace newer stored ones. The access token is
+    renewed through `refresh` well ahead of its JWT expiry, so the refresh token is used before any request of
+    pysveasolar finds the token expiring.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        metrics: SveaSolarMetrics,
+        refresh: Callable[[str | None], Awaitable[None]],
+    ):
+        self._hass = hass
+        self._metrics = metrics
+        self._refresh = refresh
+        self._store = self._token_store(hass, entry.data.get(CONF_USERNAME))
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._unsub_refresh: CALLBACK_TYPE | None = None
+        refresh_token = entry.data.get(CONF_REFRESH_TOKEN)
+        access_token = entry.data.get(CONF_ACCESS_TOKEN)
+        super().__init__(access_token, refresh_token)
+
+    @staticmethod
+    def _token_store(hass: HomeAssistant, username: str) -> Store[dict]:
+        return Store(hass, TOKEN_STORE_VERSION, f"{DOMAIN}.{slugify(username)}.tokens", private=True)
+
+    @classmethod
+    async def async_remove(cls, hass: HomeAssistant, username: str) -> None:
+        """Delete the stored tokens of an account once no entry uses it anymore."""
+        await cls._token_store(hass, username).async_remove()
+
+    async def async_load(self) -> None:
+        """Load the stored tokens, unless the tokens of the entry data expire later.
+
+        A reauth or reconfigure writes fresh tokens into the entry data, which then replace the stored ones.
+        """
+        async with self._load_lock:
+            if self._loaded:
+                return
+
+            data = await self._store.async_load()
+            self._loaded = True
+            use_stored = False
+            if data is not None:
+                entry_expiry = self.expires_at(self.access_token)
+                stored_expiry = self.expires_at(data[CONF_ACCESS_TOKEN])
+                use_stored = entry_expiry is None or (stored_expiry is not None and stored_expiry >= entry_expiry)
+
+            if use_stored:
+                super().update(data[CONF_ACCESS_TOKEN], data[CONF_REFRESH_TOKEN])
+            elif self.access_token is not None:
+                _LOGGER.debug("Storing the tokens of the entry, they are newer than the stored ones")
+                self._store.async_delay_save(self._data_to_save, TOKEN_SAVE_DELAY)
+            self._async_schedule_refresh()
+
+    def update(self, access_token: str, refresh_token: str):
+        super().update(access_token, refresh_token)
+        if not self._loaded:
+            return
+
+        self._metrics.increment("token_refreshes")
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Tokens updated, access token: %s, refresh token: %s",
+                self.mask_token(access_token),
+                self.mask_token(refresh_token),
+            )
+
+        self._store.async_delay_save(self._data_to_save, TOKEN_SAVE_DELAY)
+        self._async_schedule_refresh()
+
+    async def async_save(self) -> None:
+        """Write the tokens right away instead of after the save delay."""
+        if self._loaded and self.access_token is not None:
+            await self._store.async_save(self._data_to_save())
+
+    def is_token_valid(self) -> bool:
+        """Return False once the access token expires within the refresh margin, so pysveasolar refreshes it."""
+        expires_at = self.expires_at(self.access_token)
+        return expires_at is not None and expires_at - time.time() > TOKEN_REFRESH_MARGIN
+
+    @callback
+    def async_cancel_refresh(self) -> None:
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {CONF_ACCESS_TOKEN: self.access_token, CONF_REFRESH_TOKEN: self.refresh_token}
+
+    @callback
+    def _async_schedule_refresh(self) -> None:
+        self.async_cancel_refresh()
+        if (expires_at := self.expires_at(self.access_token)) is None:
+            return
+
+        delay = max(expires_at - TOKEN_REFRESH_MARGIN - time.time(), TOKEN_REFRESH_MIN_DELAY)
+        _LOGGER.debug("Renewing the access token in %.0f seconds", delay)
+        self._unsub_refresh = async_call_later(self._hass, delay, self._async_refresh_expiring)
+
+    @callback
+    def _async_refresh_expiring(self, _now: datetime) -> None:
+        self._unsub_refresh = None
+        self._hass.async_create_background_task(
+            self._async_refresh_token(self.access_token), f"{DOMAIN} token refresh"
+        )
+
+    async def _async_refresh_token(self, access_token: str | None) -> None:
+        self._metrics.increment("proactive_token_refreshes")
+        try:
+            await self._refresh(access_token)
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Failed to renew the expiring access token, it is renewed when it is rejected: %s", err)
+            return
+
+        if self.access_token == access_token:
+            # Nothing was renewed when the timer fired a moment before the margin was reached
+            self._async_schedule_refresh()
+
+    @staticmethod
+    def expires_at(token: str | None) -> float | None:
+        """Return the exp claim of a JWT as a timestamp, or None when the token has none."""
+        try:
+            payload = token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            return float(claims["exp"])
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def mask_token(token: str):
+        if token is None:
+            return "*"
+        if len(token) == 1:
+            return "*"
+        elif len(token) < 4:
+            return token[:2] + "*" * (len(token) - 2)
+        elif len(token) < 10:
+            return token[:2] + "*****" + token[-2:]
+        else:
+            return token[:5] + "*****" + token[-5:]
@@ -0,0 +1,74 @@
+"""Lightweight timing and counter instrumentation for Svea Solar."""
+
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class SveaSolarHistogram:
+    """Fixed bucket histogram of durations in seconds."""
+
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+            "max_ms": round(self.max * 1000, 3),
+            "buckets_ms": {
+                f"<={bucket * 1000:g}" if index < len(BUCKETS) else "inf": count
+                for index, (bucket, count) in enumerate(zip((*BUCKETS, float("inf")), self.counts))
+                if count
+            },
+        }
+
+
+class SveaSolarMetrics:
+    """Counters and timing histograms, exposed through diagnostics and the diagnostic sensors."""
+
+    def __init__(self):
+        self.counters: defaultdict[str, int] = defaultdict(int)
+        self.histograms: defaultdict[str, SveaSolarHistogram] = defaultdict(SveaSolarHistogram)
+
+    def increment(self, name: str, count: int = 1) -> None:
+        self.counters[name] += count
+
+    def observe(self, name: str, seconds: float) -> None:
+        self.histograms[name].observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histograms[name].observe(time.perf_counter() - start)
+
+    def mean_ms(self, name: str) -> float | None:
+        histogram = self.histograms.get(name)
+        if histogram is None or not histogram.count:
+            return None
+        return round(histogram.total / histogram.count * 1000, 3)
+
+    def as_dict(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "timings": {name: histogram.as_dict() for name, histogram in self.histograms.items()},
+        }
@@ -0,0 +1,110 @@
+"""Slim projections of the pysveasolar models kept by the coordinator.
+
+Only the fields read by the sensors, the statistics import and the device info are kept, under the attribute names
+of the pysveasolar models, so the value functions of the sensors read a projection like the model it came from. The
+full models are dropped as soon as they are projected.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from pysveasolar.models import Battery, BatteryDetailsData, Location, VehicleDetailsData
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarBatteryState:
+    """The battery of a badges message of the home websocket."""
+
+    battery_id: str
+    status: str | None
+    state_of_charge: str | None
+
+    @classmethod
+    def from_model(cls, battery: Battery) -> "SveaSolarBatteryState":
+        return cls(battery.battery_id, battery.status, battery.state_of_charge)
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarBatteryDetails:
+    """The polled details of a battery."""
+
+    id: str
+    brand: str | None
+    locationId: str | None
+    stateOfCharge: int | None
+    dischargedEnergy: float | None
+    chargedEnergy: float | None
+    dischargePower: float | None
+    capacity: float | None
+
+    @classmethod
+    def from_model(cls, battery: BatteryDetailsData) -> "SveaSolarBatteryDetails":
+        return cls(
+            battery.id,
+            battery.brand,
+            battery.locationId,
+            battery.stateOfCharge,
+            battery.dischargedEnergy,
+            battery.chargedEnergy,
+            battery.dischargePower,
+            battery.capacity,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarVehicleStatus:
+    chargingStatus: str | None
+    batteryLevel: int | None
+    range: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarVehicleSummary:
+    energyInKwh: float | None
+    chargingTimeInHours: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarVehicle:
+    """The vehicle details of a message of an EV websocket."""
+
+    id: str
+    vehicleStatus: SveaSolarVehicleStatus
+    summary: SveaSolarVehicleSummary
+
+    @classmethod
+    def from_model(cls, ev: VehicleDetailsData) -> "SveaSolarVehicle":
+        """Project a vehicle, an EV without a charging summary yet gets a summary of unknown values."""
+        status = ev.vehicleStatus
+        summary = ev.summary
+        return cls(
+            ev.id,
+            SveaSolarVehicleStatus(status.chargingStatus, status.batteryLevel, status.range),
+            SveaSolarVehicleSummary(None, None)
+            if summary is None
+            else SveaSolarVehicleSummary(summary.energyInKwh, summary.chargingTimeInHours),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarLocationStatus:
+    status: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarLocation:
+    """A location of the polled my-data, the power flows are kept apart as indexed by the coordinator.
+
+    The spot price is kept as it came, because the spot price cache parses it once per update.
+    """
+
+    id: str
+    spotPrice: Any
+    statusRightNow: SveaSolarLocationStatus | None
+
+    @classmethod
+    def from_model(cls, location: Location) -> "SveaSolarLocation":
+        status = location.statusRightNow
+        return cls(
+            location.id, location.spotPrice, None if status is None else SveaSolarLocationStatus(status.status)
+        )
@@ -0,0 +1,74 @@
+"""Selection of the freshest source of every Svea Solar sensor value."""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.helpers.typing import StateType
+
+ROUTE_MAX_AGE = 300.0
+
+
+class SveaSolarModels(dict):
+    """Models of one source by system id, with the monotonic time each system was last received."""
+
+    __slots__ = ("received",)
+
+    def __init__(self):
+        super().__init__()
+        self.received: dict[str, float] = {}
+
+    def store(self, system_id: str, model: Any) -> None:
+        self[system_id] = model
+        self.received[system_id] = time.monotonic()
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarSource:
+    models: SveaSolarModels
+    value_fn: Callable[[Any], StateType]
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarRoute:
+    """The sources of one sensor value, preferred first, built once when the sensor is added.
+
+    The first source received within `max_age` seconds wins. When every source is older, the most recently received
+    one is used. With more than one source, None and non-numeric strings count as missing, so a source that only
+    sends a placeholder falls back to the next one. A `flow` route reads the power of a location flow instead, or its
+    energy when `integrated`. A `cost` route reads an account of a location by cost and period. `fetch_types` are
+    the ways the data of the sources is fetched, which keeps them polled or connected while the sensor exists.
+    """
+
+    key: str
+    sources: tuple[SveaSolarSource, ...]
+    flow: tuple[str, str] | None = None
+    integrated: bool = False
+    cost: tuple[str, str] | None = None
+    fetch_types: frozenset[str] = frozenset()
+    max_age: float = ROUTE_MAX_AGE
+
+    def reads(self, models: SveaSolarModels) -> bool:
+        """Return True when one of the sources reads from `models`."""
+        return any(source.models is models for source in self.sources)
+
+    def select(self, system_id: str, default: StateType = None) -> StateType:
+        now = time.monotonic()
+        freshest = default
+        freshest_received = float("-inf")
+        for source in self.sources:
+            if (model := source.models.get(system_id)) is None:
+                continue
+
+            value = source.value_fn(model)
+            if len(self.sources) > 1 and (value is None or isinstance(value, str) and not value.isnumeric()):
+                continue
+
+            received = source.models.received.get(system_id, float("-inf"))
+            if now - received <= self.max_age:
+                return value
+            if received > freshest_received:
+                freshest, freshest_received = value, received
+
+        return freshest
@@ -0,0 +1,144 @@
+"""Adaptive poll scheduling for Svea Solar."""
+
+from collections import deque
+from collections.abc import Hashable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+POLL_INTERVAL = timedelta(seconds=90)
+MIN_POLL_INTERVAL = timedelta(seconds=30)
+WEBSOCKET_POLL_INTERVAL = timedelta(minutes=5)
+WEBSOCKET_DOWN_POLL_INTERVAL = timedelta(seconds=45)
+MAX_ERROR_BACKOFF = timedelta(minutes=30)
+WEBSOCKET_FRESHNESS = timedelta(minutes=2)
+SPOT_PRICE_DELAY = timedelta(seconds=20)
+REQUEST_WINDOW = timedelta(hours=1)
+ACTIVE_POWER_CHANGE = 0.5
+
+
+def power_changed(previous: Mapping[Hashable, float | None] | None, current: Mapping[Hashable, float | None]) -> bool:
+    """Return True when any power in kW moved by `ACTIVE_POWER_CHANGE` or more since the previous sample.
+
+    A missing power counts as 0 kW. Without a previous sample nothing is known to change.
+    """
+    if previous is None:
+        return False
+    return any(
+        abs((current.get(key) or 0) - (previous.get(key) or 0)) >= ACTIVE_POWER_CHANGE
+        for key in previous.keys() | current.keys()
+    )
+
+
+@dataclass
+class SveaSolarSystemSchedule:
+    next_due: datetime | None = None
+    errors: int = 0
+    last_poll: datetime | None = None
+    last_websocket: datetime | None = None
+    websocket_down: bool = False
+
+    @property
+    def last_fresh(self) -> datetime | None:
+        return max((time for time in (self.last_poll, self.last_websocket) if time is not None), default=None)
+
+
+class SveaSolarPollScheduler:
+    """Decide per system when the next poll is due.
+
+    Systems with a recent websocket message are polled less often, systems whose power changed since the previous
+    poll and locations around the hourly spot price change are polled more often, and failing systems back off
+    exponentially.
+    """
+
+    def __init__(self):
+        self._systems: dict[str, SveaSolarSystemSchedule] = {}
+        self._requests: deque[datetime] = deque()
+
+    def _schedule(self, system_id: str) -> SveaSolarSystemSchedule:
+        return self._systems.setdefault(system_id, SveaSolarSystemSchedule())
+
+    def is_due(self, system_id: str) -> bool:
+        next_due = self._schedule(system_id).next_due
+        return next_due is None or next_due <= dt_util.utcnow()
+
+    def record_request(self) -> None:
+        self._requests.append(dt_util.utcnow())
+
+    def record_websocket(self, system_id: str) -> None:
+        self._schedule(system_id).last_websocket = dt_util.utcnow()
+
+    def record_websocket_state(self, system_id: str, connected: bool) -> None:
+        """Poll a system right away and more often while its websocket is down."""
+        schedule = self._schedule(system_id)
+        schedule.websocket_down = not connected
+        if not connected:
+            schedule.last_websocket = None
+            schedule.next_due = dt_util.utcnow()
+
+    def record_poll(self, system_id: str, active: bool = False, spot_price: bool = False) -> None:
+        now = dt_util.utcnow()
+        schedule = self._schedule(system_id)
+        schedule.errors = 0
+        schedule.last_poll = now
+
+        if schedule.last_websocket is not None and now - schedule.last_websocket < WEBSOCKET_FRESHNESS:
+            interval = WEBSOCKET_POLL_INTERVAL
+        elif active:
+            interval = MIN_POLL_INTERVAL
+        elif schedule.websocket_down:
+            interval = WEBSOCKET_DOWN_POLL_INTERVAL
+        else:
+            interval = POLL_INTERVAL
+
+        next_due = now + interval
+        if spot_price:
+            next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            next_due = min(next_due, next_hour + SPOT_PRICE_DELAY)
+
+        schedule.next_due = next_due
+
+    def record_skip(self, system_id: str) -> None:
+        """Stop scheduling a system nobody needs the polled data of, it is due as soon as it is needed again."""
+        self._schedule(system_id).next_due = None
+
+    def record_error(self, system_id: str) -> None:
+        schedule = self._schedule(system_id)
+        schedule.errors += 1
+        schedule.next_due = dt_util.utcnow() + min(POLL_INTERVAL * 2 ** (schedule.errors - 1), MAX_ERROR_BACKOFF)
+
+    def next_interval(self) -> timedelta:
+        """Return the time until the first system is due again."""
+        now = dt_util.utcnow()
+        due = [schedule.next_due for schedule in self._systems.values() if schedule.next_due is not None]
+        if not due:
+            return POLL_INTERVAL
+
+        return max(min(due) - now, MIN_POLL_INTERVAL)
+
+    @property
+    def requests_last_hour(self) -> int:
+        cutoff = dt_util.utcnow() - REQUEST_WINDOW
+        while self._requests and self._requests[0] < cutoff:
+            self._requests.popleft()
+        return len(self._requests)
+
+    def as_dict(self) -> dict:
+        now = dt_util.utcnow()
+        data_age = {
+            system_id: None if schedule.last_fresh is None else (now - schedule.last_fresh).total_seconds()
+            for system_id, schedule in self._systems.items()
+        }
+        return {
+            "requests_last_hour": self.requests_last_hour,
+            "max_data_age": max((age for age in data_age.values() if age is not None), default=None),
+            "systems": {
+                system_id: {
+                    "data_age": data_age[system_id],
+                    "next_poll_in": None if schedule.next_due is None else (schedule.next_due - now).total_seconds(),
+                    "errors": schedule.errors,
+                }
+                for system_id, schedule in self._systems.items()
+            },
+        }
@@ -6,24 +6,54 @@ from datetime import datetime
 from operator import attrgetter
 from typing import Callable, Any, Mapping
 
+import voluptuous as vol
 from homeassistant.components.sensor import SensorEntityDescription, SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.const import PERCENTAGE, UnitOfLength, UnitOfEnergy, UnitOfTime, EntityCategory, UnitOfPower
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, entity_platform
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.helpers.typing import StateType
-from pysveasolar.models import Battery, BatteryDetailsData, VehicleDetailsData, Location
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
-from custom_components.sveasolar import (
+from . import (
+    DOMAIN,
     SveaSolarConfigEntry,
     SveaSolarDataUpdateCoordinator,
     SveaSolarSystemType,
     SveaSolarFetchType,
 )
-from custom_components.sveasolar.entity import SveaSolarEntity
+from .const import (
+    CONF_PRICE_ATTRIBUTES,
+    DEFAULT_PRICE_ATTRIBUTES,
+    FLOW_SOURCES,
+    FLOW_DESTINATIONS,
+)
+from .costs import (
+    COST_GRID_IMPORT,
+    COST_GRID_EXPORT,
+    COST_BATTERY_SAVINGS,
+    COST_SOLAR_SAVINGS,
+    PERIOD_DAY,
+    PERIOD_MONTH,
+    period_start,
+)
+from .entity import SveaSolarEntity, SveaSolarEntityDescription
+from .projection import SveaSolarBatteryDetails, SveaSolarBatteryState, SveaSolarLocation, SveaSolarVehicle
+from .snapshot import EMPTY_SNAPSHOT
+from .spot_price import SPOT_PRICE_SERIES_ATTRIBUTES, spot_price_forecast
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+SERVICE_GET_PRICE_FORECAST = "get_price_forecast"
+SERVICE_GET_CHEAPEST_HOURS = "get_cheapest_hours"
+ATTR_HOURS = "hours"
+ATTR_CONTIGUOUS = "contiguous"
+ATTR_START = "start"
+ATTR_END = "end"
+
 TYPE_EV_CHARGING_STATUS = "ev_charging_status"
 TYPE_EV_BATTERY_LEVEL = "ev_battery_level"
 TYPE_EV_RANGE = "ev_range"
@@ -46,13 +76,43 @@ TYPE_LOCATION_FROM_SOLAR_POWER = "location_from_solar_power"
 TYPE_LOCATION_FROM_BATTERY_POWER = "location_from_battery_power"
 TYPE_LOCATION_TO_BATTERY_POWER = "location_to_battery_power"
 TYPE_LOCATION_USAGE_POWER = "location_usage_power"
+TYPE_LOCATION_TO_GRID_ENERGY = "location_to_grid_energy"
+TYPE_LOCATION_FROM_GRID_ENERGY = "location_from_grid_energy"
+TYPE_LOCATION_FROM_SOLAR_ENERGY = "location_from_solar_energy"
+TYPE_LOCATION_FROM_BATTERY_ENERGY = "location_from_battery_energy"
+TYPE_LOCATION_TO_BATTERY_ENERGY = "location_to_battery_energy"
+TYPE_LOCATION_USAGE_ENERGY = "location_usage_energy"
+TYPE_LOCATION_GRID_COST_TODAY = "location_grid_cost_today"
+TYPE_LOCATION_GRID_COST_MONTH = "location_grid_cost_month"
+TYPE_LOCATION_EXPORT_REVENUE_TODAY = "location_export_revenue_today"
+TYPE_LOCATION_EXPORT_REVENUE_MONTH = "location_export_revenue_month"
+TYPE_LOCATION_BATTERY_SAVINGS_TODAY = "location_battery_savings_today"
+TYPE_LOCATION_BATTERY_SAVINGS_MONTH = "location_battery_savings_month"
+TYPE_LOCATION_SOLAR_SAVINGS_TODAY = "location_solar_savings_today"
+TYPE_LOCATION_SOLAR_SAVINGS_MONTH = "location_solar_savings_month"
+
+TYPE_DIAGNOSTIC_API_REQUESTS = "api_requests_per_hour"
+TYPE_DIAGNOSTIC_DATA_AGE = "data_age"
+TYPE_DIAGNOSTIC_POLL_DURATION = "poll_duration"
+TYPE_DIAGNOSTIC_WEBSOCKET_MESSAGES = "websocket_messages"
+TYPE_DIAGNOSTIC_WEBSOCKET_RECONNECTS = "websocket_reconnects"
+TYPE_DIAGNOSTIC_STATE_UPDATES = "state_updates"
 
 
 @dataclass(frozen=True, kw_only=True)
-class SveaSolarSensorEntityDescription(SensorEntityDescription):
-    fetch_type: SveaSolarFetchType
-    system_type: list[SveaSolarSystemType]
-    value_fn: Callable[[VehicleDetailsData | Battery | Location | BatteryDetailsData], StateType | datetime]
+class SveaSolarSensorEntityDescription(SensorEntityDescription, SveaSolarEntityDescription):
+    value_fn: (
+        Callable[
+            [SveaSolarVehicle | SveaSolarBatteryState | SveaSolarLocation | SveaSolarBatteryDetails],
+            StateType | datetime,
+        ]
+        | None
+    ) = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class SveaSolarDiagnosticSensorEntityDescription(SensorEntityDescription):
+    value_fn: Callable[[SveaSolarDataUpdateCoordinator], StateType]
 
 
 SENSOR_DESCRIPTIONS = (
@@ -73,6 +133,7 @@ SENSOR_DESCRIPTIONS = (
         system_type=[SveaSolarSystemType.BATTERY],
         fetch_type=SveaSolarFetchType.WEBSOCKET,
         value_fn=attrgetter("state_of_charge"),
+        fallbacks=((SveaSolarFetchType.POLL, attrgetter("stateOfCharge")),),
     ),
     SveaSolarSensorEntityDescription(
         key=TYPE_BATTERY_DISCHARGED_ENERGY,
@@ -194,9 +255,7 @@ SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         system_type=[SveaSolarSystemType.LOCATION],
         fetch_type=SveaSolarFetchType.POLL,
-        value_fn=lambda location: next(
-            (source.value for source in location.statusRightNow.sources if source.type == "Solar"), 0
-        ),
+        flow=(FLOW_SOURCES, "Solar"),
     ),
     SveaSolarSensorEntityDescription(
         key=TYPE_LOCATION_FROM_BATTERY_POWER,
@@ -205,9 +264,7 @@ SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         system_type=[SveaSolarSystemType.LOCATION],
         fetch_type=SveaSolarFetchType.POLL,
-        value_fn=lambda location: next(
-            (source.value for source in location.statusRightNow.sources if source.type == "Battery"), 0
-        ),
+        flow=(FLOW_SOURCES, "Battery"),
     ),
     SveaSolarSensorEntityDescription(
         key=TYPE_LOCATION_TO_BATTERY_POWER,
@@ -216,9 +273,7 @@ SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         system_type=[SveaSolarSystemType.LOCATION],
         fetch_type=SveaSolarFetchType.POLL,
-        value_fn=lambda location: next(
-            (source.value for source in location.statusRightNow.destinations if source.type == "Battery"), 0
-        ),
+        flow=(FLOW_DESTINATIONS, "Battery"),
     ),
     SveaSolarSensorEntityDescription(
         key=TYPE_LOCATION_USAGE_POWER,
@@ -227,9 +282,7 @@ SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         system_type=[SveaSolarSystemType.LOCATION],
         fetch_type=SveaSolarFetchType.POLL,
-        value_fn=lambda location: next(
-            (source.value for source in location.statusRightNow.destinations if source.type == "Usage"), 0
-        ),
+        flow=(FLOW_DESTINATIONS, "Usage"),
     ),
     SveaSolarSensorEntityDescription(
         key=TYPE_LOCATION_TO_GRID_POWER,
@@ -238,9 +291,7 @@ SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         system_type=[SveaSolarSystemType.LOCATION],
         fetch_type=SveaSolarFetchType.POLL,
-        value_fn=lambda location: next(
-            (source.value for source in location.statusRightNow.destinations if source.type == "Grid"), 0
-        ),
+        flow=(FLOW_DESTINATIONS, "Grid"),
     ),
     SveaSolarSensorEntityDescription(
         key=TYPE_LOCATION_FROM_GRID_POWER,
@@ -249,13 +300,242 @@ SENSOR_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         system_type=[SveaSolarSystemType.LOCATION],
         fetch_type=SveaSolarFetchType.POLL,
-        value_fn=lambda location: next(
-            (source.value for source in location.statusRightNow.sources if source.type == "Grid"), 0
+        flow=(FLOW_SOURCES, "Grid"),
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_FROM_SOLAR_ENERGY,
+        name="From Solar energy",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        flow=(FLOW_SOURCES, "Solar"),
+        integrated=True,
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_FROM_BATTERY_ENERGY,
+        name="From Battery energy",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        flow=(FLOW_SOURCES, "Battery"),
+        integrated=True,
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_TO_BATTERY_ENERGY,
+        name="To Battery energy",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        flow=(FLOW_DESTINATIONS, "Battery"),
+        integrated=True,
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_USAGE_ENERGY,
+        name="Usage energy",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        flow=(FLOW_DESTINATIONS, "Usage"),
+        integrated=True,
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_TO_GRID_ENERGY,
+        name="To Grid energy",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        flow=(FLOW_DESTINATIONS, "Grid"),
+        integrated=True,
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_FROM_GRID_ENERGY,
+        name="From Grid energy",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        flow=(FLOW_SOURCES, "Grid"),
+        integrated=True,
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_GRID_COST_TODAY,
+        name="Grid cost today",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="SEK",
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:transmission-tower-import",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        cost=(COST_GRID_IMPORT, PERIOD_DAY),
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_GRID_COST_MONTH,
+        name="Grid cost this month",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="SEK",
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:transmission-tower-import",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        cost=(COST_GRID_IMPORT, PERIOD_MONTH),
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_EXPORT_REVENUE_TODAY,
+        name="Export revenue today",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="SEK",
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:transmission-tower-export",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        cost=(COST_GRID_EXPORT, PERIOD_DAY),
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_EXPORT_REVENUE_MONTH,
+        name="Export revenue this month",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="SEK",
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:transmission-tower-export",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        cost=(COST_GRID_EXPORT, PERIOD_MONTH),
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_BATTERY_SAVINGS_TODAY,
+        name="Battery savings today",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="SEK",
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:home-battery",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        cost=(COST_BATTERY_SAVINGS, PERIOD_DAY),
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_BATTERY_SAVINGS_MONTH,
+        name="Battery savings this month",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="SEK",
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:home-battery",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        cost=(COST_BATTERY_SAVINGS, PERIOD_MONTH),
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_SOLAR_SAVINGS_TODAY,
+        name="Solar savings today",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="SEK",
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:solar-power",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        cost=(COST_SOLAR_SAVINGS, PERIOD_DAY),
+    ),
+    SveaSolarSensorEntityDescription(
+        key=TYPE_LOCATION_SOLAR_SAVINGS_MONTH,
+        name="Solar savings this month",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="SEK",
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        icon="mdi:solar-power",
+        system_type=[SveaSolarSystemType.LOCATION],
+        fetch_type=SveaSolarFetchType.POLL,
+        cost=(COST_SOLAR_SAVINGS, PERIOD_MONTH),
+    ),
+)
+
+SENSOR_DESCRIPTIONS_BY_SYSTEM_TYPE: dict[SveaSolarSystemType, tuple[SveaSolarSensorEntityDescription, ...]] = {
+    system_type: tuple(description for description in SENSOR_DESCRIPTIONS if system_type in description.system_type)
+    for system_type in SveaSolarSystemType
+}
+
+
+DIAGNOSTIC_SENSOR_DESCRIPTIONS = (
+    SveaSolarDiagnosticSensorEntityDescription(
+        key=TYPE_DIAGNOSTIC_API_REQUESTS,
+        name="API requests per hour",
+        native_unit_of_measurement="requests/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:cloud-download",
+        value_fn=lambda coordinator: coordinator.scheduler.requests_last_hour,
+    ),
+    SveaSolarDiagnosticSensorEntityDescription(
+        key=TYPE_DIAGNOSTIC_DATA_AGE,
+        name="Data age",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.scheduler.as_dict()["max_data_age"],
+    ),
+    SveaSolarDiagnosticSensorEntityDescription(
+        key=TYPE_DIAGNOSTIC_POLL_DURATION,
+        name="Poll duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.metrics.mean_ms("poll.my_data"),
+    ),
+    SveaSolarDiagnosticSensorEntityDescription(
+        key=TYPE_DIAGNOSTIC_WEBSOCKET_MESSAGES,
+        name="Websocket messages",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:message-processing",
+        value_fn=lambda coordinator: coordinator.metrics.counters.get("websocket.messages", 0),
+    ),
+    SveaSolarDiagnosticSensorEntityDescription(
+        key=TYPE_DIAGNOSTIC_WEBSOCKET_RECONNECTS,
+        name="Websocket reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:connection",
+        value_fn=lambda coordinator: sum(
+            count for name, count in coordinator.hub.metrics.counters.items() if name.endswith(".disconnects")
         ),
     ),
+    SveaSolarDiagnosticSensorEntityDescription(
+        key=TYPE_DIAGNOSTIC_STATE_UPDATES,
+        name="State updates",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:database-edit",
+        value_fn=lambda coordinator: coordinator.metrics.counters.get("state_updates", 0),
+    ),
 )
 
 
+def _as_local(moment: datetime | None) -> datetime | None:
+    """Read a service datetime without a time zone as local time."""
+    if moment is None or moment.tzinfo is not None:
+        return moment
+    return moment.replace(tzinfo=dt_util.get_default_time_zone())
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: SveaSolarConfigEntry, async_add_entities: AddConfigEntryEntitiesCallback
 ) -> None:
@@ -267,14 +547,37 @@ async def async_setup_entry(
         for system_type, inner_list in coordinator.system_ids.items()
         for inner_dict in inner_list
         for system_id, system_name in inner_dict.items()
-        for description in SENSOR_DESCRIPTIONS
-        if system_type in description.system_type
+        for description in SENSOR_DESCRIPTIONS_BY_SYSTEM_TYPE[system_type]
+    )
+    async_add_entities(
+        SveaSolarDiagnosticSensor(coordinator, description) for description in DIAGNOSTIC_SENSOR_DESCRIPTIONS
+    )
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_GET_PRICE_FORECAST,
+        None,
+        "async_get_price_forecast",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        SERVICE_GET_CHEAPEST_HOURS,
+        {
+            vol.Required(ATTR_HOURS): vol.All(vol.Coerce(int), vol.Range(min=1, max=48)),
+            vol.Optional(ATTR_CONTIGUOUS, default=True): cv.boolean,
+            vol.Optional(ATTR_START): cv.datetime,
+            vol.Optional(ATTR_END): cv.datetime,
+        },
+        "async_get_cheapest_hours",
+        supports_response=SupportsResponse.ONLY,
     )
 
 
 class SveaSolarSensor(SveaSolarEntity, SensorEntity):
     """Define an Ambient sensor."""
 
+    _unrecorded_attributes = frozenset(SPOT_PRICE_SERIES_ATTRIBUTES)
+
     def __init__(
         self,
         coordinator: SveaSolarDataUpdateCoordinator,
@@ -287,52 +590,93 @@ class SveaSolarSensor(SveaSolarEntity, SensorEntity):
         """Initialize the sensor."""
         super().__init__(coordinator, system_id, system_name, system_type, fetch_type, description)
         self.entity_description = description
+        self._last_written_version: tuple[bool, int] | None = None
+        self._last_written_state: tuple | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the value or attributes changed since the last write.
+
+        The snapshot version of the system is checked first, so entities of unchanged systems return right away.
+        """
+        snapshot = self._coordinator.snapshots.get(self._system_id, EMPTY_SNAPSHOT)
+        version = (self.available, snapshot.version)
+        if version == self._last_written_version:
+            return
+
+        self._last_written_version = version
+        state = (self.available, self.native_value, self.extra_state_attributes)
+        if state == self._last_written_state:
+            return
+
+        self._last_written_state = state
+        self.async_write_ha_state()
 
     @property
     def extra_state_attributes(self) -> Mapping[str, Any] | None:
-        entity = self.get_entity()
-        if self.entity_description.key is TYPE_LOCATION_SPOT_PRICE and isinstance(entity, Location):
-            if entity.spotPrice.tomorrow is not None:
-                tomorrow = ", ".join(str(round(data.value, 2)) for data in entity.spotPrice.tomorrow.data)
-                tomorrow_raw = [
-                    {
-                        "time": dt_util.parse_datetime(data.time).replace(tzinfo=dt_util.get_default_time_zone()),
-                        "price": round(data.value, 2),
-                        "rating": data.rating,
-                    }
-                    for data in entity.spotPrice.tomorrow.data
-                ]
-                tomorrow_valid = True
-            else:
-                tomorrow = None
-                tomorrow_raw = None
-                tomorrow_valid = False
-            return {
-                "last_update": dt_util.parse_datetime(entity.spotPrice.time).isoformat(),
-                "today": ", ".join(str(round(data.value, 2)) for data in entity.spotPrice.today.data),
-                "today_raw": [
-                    {
-                        "time": dt_util.parse_datetime(data.time).replace(tzinfo=dt_util.get_default_time_zone()),
-                        "price": round(data.value, 2),
-                        "rating": data.rating,
-                    }
-                    for data in entity.spotPrice.today.data
-                ],
-                "tomorrow": tomorrow,
-                "tomorrow_raw": tomorrow_raw,
-                "tomorrow_valid": tomorrow_valid,
-            }
+        if self.entity_description.key is TYPE_LOCATION_SPOT_PRICE:
+            attributes = self._coordinator.snapshots.get(self._system_id, EMPTY_SNAPSHOT).attributes
+            if self._coordinator.config_entry.options.get(CONF_PRICE_ATTRIBUTES, DEFAULT_PRICE_ATTRIBUTES):
+                return attributes
+            return {key: value for key, value in attributes.items() if key not in SPOT_PRICE_SERIES_ATTRIBUTES}
 
         return {}
 
+    async def async_get_price_forecast(self) -> ServiceResponse:
+        """Return the spot price series of today and tomorrow."""
+        if self.entity_description.key is not TYPE_LOCATION_SPOT_PRICE:
+            raise ServiceValidationError(f"{self.entity_id} is not a Svea Solar energy price sensor")
+
+        return spot_price_forecast(self._coordinator.snapshots.get(self._system_id, EMPTY_SNAPSHOT).attributes)
+
+    async def async_get_cheapest_hours(
+        self, hours: int, contiguous: bool = True, start: datetime | None = None, end: datetime | None = None
+    ) -> ServiceResponse:
+        """Return the cheapest hours between start, by default now, and end, by default the last known price."""
+        if self.entity_description.key is not TYPE_LOCATION_SPOT_PRICE:
+            raise ServiceValidationError(f"{self.entity_id} is not a Svea Solar energy price sensor")
+        if (search := self._coordinator.cheapest_hours(self._system_id)) is None:
+            raise ServiceValidationError(f"No spot prices of {self.entity_id} are known yet")
+
+        start = dt_util.utcnow() if start is None else _as_local(start)
+        if (window := search.cheapest(hours, contiguous, start, _as_local(end))) is None:
+            raise ServiceValidationError(f"Fewer than {hours} hours of spot prices are known in the requested range")
+        return window.as_dict()
+
+    @property
+    def last_reset(self) -> datetime | None:
+        """Return the start of the day or month of a cost account."""
+        if self.entity_description.cost is None:
+            return None
+        return period_start(self.entity_description.cost[1])
+
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        if self.get_entity() is None:
-            return None
+        return self._coordinator.value(self._system_id, self.entity_description.key)
+
+
+class SveaSolarDiagnosticSensor(CoordinatorEntity[SveaSolarDataUpdateCoordinator], SensorEntity):
+    """Diagnostic sensor exposing the instrumentation of the coordinator, disabled by default."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
 
-        value = self.entity_description.value_fn(self.get_entity())
-        if self.entity_description.key is TYPE_BATTERY_BATTERY_LEVEL and value and value.isnumeric() is False:
-            return attrgetter("stateOfCharge")(self.get_entity(alternative_fetch=True))
+    def __init__(
+        self, coordinator: SveaSolarDataUpdateCoordinator, description: SveaSolarDiagnosticSensorEntityDescription
+    ) -> None:
+        super().__init__(coordinator)
+        entry = coordinator.config_entry
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="Svea Solar",
+            entry_type=DeviceEntryType.SERVICE,
+        )
 
-        return value
+    @property
+    def native_value(self) -> StateType:
+        return self.entity_description.value_fn(self.coordinator)
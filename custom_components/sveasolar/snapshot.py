@@ -0,0 +1,35 @@
+"""Immutable per system state of Svea Solar."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.helpers.typing import StateType
+
+EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarSnapshot:
+    """The values of the sensors of one system and the spot price attributes of a location.
+
+    A new snapshot with a higher version replaces the previous one whenever anything in it changed, so an entity
+    that remembers the version it wrote knows nothing changed while the version is the same.
+    """
+
+    version: int = 0
+    values: Mapping[str, StateType] = field(default=EMPTY)
+    attributes: Mapping[str, Any] = field(default=EMPTY)
+
+    def replace(
+        self, values: Mapping[str, StateType] | None = None, attributes: Mapping[str, Any] | None = None
+    ) -> "SveaSolarSnapshot":
+        return SveaSolarSnapshot(
+            self.version + 1,
+            self.values if values is None else MappingProxyType(values),
+            self.attributes if attributes is None else attributes,
+        )
+
+
+EMPTY_SNAPSHOT = SveaSolarSnapshot()
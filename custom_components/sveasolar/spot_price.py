@@ -0,0 +1,191 @@
+"""Spot price helpers for Svea Solar."""
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .projection import SveaSolarLocation
+
+SPOT_PRICE_CACHE_SIZE = 16
+SPOT_PRICE_SERIES_ATTRIBUTES = ("today", "today_raw", "tomorrow", "tomorrow_raw")
+NO_SPOT_PRICE: Mapping[str, Any] = MappingProxyType({})
+PRICE_STEP = timedelta(hours=1)
+
+
+def _price_points(data) -> list[dict[str, Any]]:
+    time_zone = dt_util.get_default_time_zone()
+    return [
+        {
+            "time": dt_util.parse_datetime(point.time).replace(tzinfo=time_zone),
+            "price": round(point.value, 2),
+            "rating": point.rating,
+        }
+        for point in data
+    ]
+
+
+def spot_price_attributes(location: SveaSolarLocation) -> dict[str, Any]:
+    """Build the Energy Price attributes from the spot price of a location."""
+    spot_price = location.spotPrice
+    today_raw = _price_points(spot_price.today.data)
+
+    if spot_price.tomorrow is not None:
+        tomorrow_raw = _price_points(spot_price.tomorrow.data)
+        tomorrow = ", ".join(str(point["price"]) for point in tomorrow_raw)
+        tomorrow_valid = True
+    else:
+        tomorrow = None
+        tomorrow_raw = None
+        tomorrow_valid = False
+
+    return {
+        "last_update": dt_util.parse_datetime(spot_price.time).isoformat(),
+        "today": ", ".join(str(point["price"]) for point in today_raw),
+        "today_raw": today_raw,
+        "tomorrow": tomorrow,
+        "tomorrow_raw": tomorrow_raw,
+        "tomorrow_valid": tomorrow_valid,
+    }
+
+
+def spot_price_forecast(attributes: dict[str, Any]) -> dict[str, Any]:
+    """Return the price series of today and tomorrow from the Energy Price attributes."""
+    return {
+        "last_update": attributes.get("last_update"),
+        "today": [{**point, "time": point["time"].isoformat()} for point in attributes.get("today_raw") or []],
+        "tomorrow": [{**point, "time": point["time"].isoformat()} for point in attributes.get("tomorrow_raw") or []],
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class SveaSolarPriceWindow:
+    """The cheapest price points of a search, as merged intervals of consecutive points."""
+
+    intervals: tuple[tuple[datetime, datetime], ...]
+    average: float
+
+    @property
+    def start(self) -> datetime:
+        return self.intervals[0][0]
+
+    @property
+    def end(self) -> datetime:
+        return self.intervals[-1][1]
+
+    def __contains__(self, moment: datetime) -> bool:
+        return any(start <= moment < end for start, end in self.intervals)
+
+    def next_change(self, moment: datetime) -> datetime | None:
+        """Return the first start or end of an interval after the moment."""
+        return next((edge for interval in self.intervals for edge in interval if edge > moment), None)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "average": round(self.average, 2),
+            "intervals": [{"start": start.isoformat(), "end": end.isoformat()} for start, end in self.intervals],
+        }
+
+
+class SveaSolarCheapestHours:
+    """Search the cheapest hours in the known spot prices of a location, prepared once per spot price update.
+
+    Contiguous windows are found by sliding the window over prefix sums of the prices, and the cheapest separate
+    points are taken from an order sorted once. Every result is kept, so entities and service calls asking for the
+    same window share it until the next price update.
+    """
+
+    def __init__(self, points: list[dict[str, Any]]):
+        points = sorted(points, key=itemgetter("time"))
+        self._times: list[datetime] = [point["time"] for point in points]
+        self._prices: list[float] = [point["price"] for point in points]
+        self._step = self._times[1] - self._times[0] if len(self._times) > 1 else PRICE_STEP
+        self._sums = list(accumulate(self._prices, initial=0.0))
+        self._order = sorted(range(len(self._prices)), key=self._prices.__getitem__)
+        self._results: dict[tuple[int, bool, int, int], SveaSolarPriceWindow | None] = {}
+
+    def price_at(self, moment: datetime) -> float | None:
+        """Return the price of the point that contains the moment, or None when it is not known."""
+        index = bisect_right(self._times, moment) - 1
+        if index < 0 or moment >= self._times[index] + self._step:
+            return None
+        return self._prices[index]
+
+    def cheapest(
+        self, hours: float, contiguous: bool, start: datetime | None = None, end: datetime | None = None
+    ) -> SveaSolarPriceWindow | None:
+        """Return the cheapest points covering `hours` whose intervals overlap start to end.
+
+        Returns None when the range has fewer known prices than needed.
+        """
+        count = max(round(timedelta(hours=hours) / self._step), 1)
+        first = 0 if start is None else bisect_right(self._times, start - self._step)
+        last = len(self._times) if end is None else bisect_left(self._times, end)
+        key = (count, contiguous, first, last)
+        if key not in self._results:
+            self._results[key] = self._search(count, contiguous, first, last)
+        return self._results[key]
+
+    def _search(self, count: int, contiguous: bool, first: int, last: int) -> SveaSolarPriceWindow | None:
+        if last - first < count:
+            return None
+
+        if contiguous:
+            sums = self._sums
+            best = min(range(first, last - count + 1), key=lambda index: sums[index + count] - sums[index])
+            indices = range(best, best + count)
+        else:
+            indices = sorted(islice((index for index in self._order if first <= index < last), count))
+
+        intervals: list[tuple[datetime, datetime]] = []
+        for index in indices:
+            start = self._times[index]
+            if intervals and intervals[-1][1] == start:
+                intervals[-1] = (intervals[-1][0], start + self._step)
+            else:
+                intervals.append((start, start + self._step))
+        average = sum(self._prices[index] for index in indices) / count
+        return SveaSolarPriceWindow(tuple(intervals), average)
+
+
+class SveaSolarSpotPriceCache:
+    """Parsed spot price attributes and cheapest hours search, built once per location and spot price update.
+
+    The least recently used entries are evicted, which drops previous days as new prices arrive.
+    """
+
+    def __init__(self, max_size: int = SPOT_PRICE_CACHE_SIZE):
+        self._max_size = max_size
+        self._cache: OrderedDict[tuple[str, str, bool], tuple[dict[str, Any], SveaSolarCheapestHours]] = OrderedDict()
+
+    def get(self, location: SveaSolarLocation) -> Mapping[str, Any]:
+        if location.spotPrice is None:
+            return NO_SPOT_PRICE
+        return self._entry(location)[0]
+
+    def cheapest_hours(self, location: SveaSolarLocation) -> SveaSolarCheapestHours | None:
+        if location.spotPrice is None:
+            return None
+        return self._entry(location)[1]
+
+    def _entry(self, location: SveaSolarLocation) -> tuple[dict[str, Any], SveaSolarCheapestHours]:
+        key = (location.id, location.spotPrice.time, location.spotPrice.tomorrow is not None)
+        if (entry := self._cache.get(key)) is not None:
+            self._cache.move_to_end(key)
+            return entry
+
+        attributes = spot_price_attributes(location)
+        points = attributes["today_raw"] + (attributes["tomorrow_raw"] or [])
+        entry = self._cache[key] = (attributes, SveaSolarCheapestHours(points))
+        while len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
+        return entry
@@ -0,0 +1,177 @@
+"""Long-term statistics import for Svea Solar.
+
+The only history pysveasolar exposes is `async_get_details`, the daily totals of a location for the current week as
+unmodelled JSON. Long-term statistics are hourly, and a daily total cannot be split into hours without making up the
+profile of the day, so the statistics are built from the data that already covers past hours instead: the hourly spot
+prices of today and the daily energy counters of the batteries, which keep counting while Home Assistant is down.
+Progress is stored per statistic, so every import continues from the last imported hour.
+"""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from itertools import batched
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+from homeassistant.util.unit_conversion import EnergyConverter
+
+from .const import DOMAIN
+from .projection import SveaSolarBatteryDetails
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+
+_LOGGER = logging.getLogger(__name__)
+
+STATISTICS_VERSION = 1
+STATISTICS_SAVE_DELAY = 30
+STATISTICS_CHUNK_HOURS = 168
+HOUR = timedelta(hours=1)
+
+
+def _hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _metadata(statistic_id: str, name: str, unit: str, unit_class: str | None, *, mean: bool) -> "StatisticMetaData":
+    """Return the metadata of a statistic with a mean or a sum, in the fields the recorder of the running core knows.
+
+    Recent cores replaced has_mean with mean_type and added unit_class, older ones reject fields they do not know.
+    """
+    # The recorder pulls in SQLAlchemy, so it is only imported once there is something to import
+    from homeassistant.components.recorder import models
+
+    metadata = {
+        "has_mean": mean,
+        "has_sum": not mean,
+        "name": name,
+        "source": DOMAIN,
+        "statistic_id": statistic_id,
+        "unit_class": unit_class,
+        "unit_of_measurement": unit,
+    }
+    if hasattr(models, "StatisticMeanType"):
+        metadata["mean_type"] = models.StatisticMeanType.ARITHMETIC if mean else models.StatisticMeanType.NONE
+    return {key: value for key, value in metadata.items() if key in models.StatisticMetaData.__annotations__}
+
+
+class SveaSolarStatisticsImporter:
+    """Import spot prices and battery energy as external statistics, continuing from the stored progress."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._hass = hass
+        self._store: Store[dict] = Store(hass, STATISTICS_VERSION, f"{DOMAIN}.{entry_id}.statistics")
+        self._progress: dict[str, dict[str, Any]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_import(
+        self,
+        spot_prices: dict[str, tuple[str, list[dict[str, Any]]]],
+        batteries: dict[str, tuple[str, SveaSolarBatteryDetails]],
+    ) -> None:
+        """Import the hours since the last import.
+
+        `spot_prices` maps a location id to its name and the parsed price points of today, `batteries` maps a
+        battery id to its name and its last polled details.
+        """
+        if "recorder" not in self._hass.config.components:
+            return
+
+        async with self._lock:
+            if self._progress is None:
+                self._progress = await self._store.async_load() or {}
+
+            now = dt_util.utcnow()
+            for location_id, (name, points) in spot_prices.items():
+                self._import_spot_prices(location_id, name, points, now)
+            for battery_id, (name, battery) in batteries.items():
+                self._import_energy(
+                    f"{battery_id}_charged_energy", f"{name} charged energy", battery.chargedEnergy, now
+                )
+                self._import_energy(
+                    f"{battery_id}_discharged_energy", f"{name} discharged energy", battery.dischargedEnergy, now
+                )
+
+            self._store.async_delay_save(self._data_to_save, STATISTICS_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        return self._progress or {}
+
+    def _import_spot_prices(self, location_id: str, name: str, points: list[dict[str, Any]], now: datetime) -> None:
+        """Import the mean, min and max price in SEK/kWh of every hour that has ended and was not imported yet.
+
+        The prices of hours that have not ended are kept with the progress, because the last hour of a day only ends
+        after the spot prices moved on to the next day.
+        """
+        statistic_id = f"{DOMAIN}:{slugify(f'{location_id}_spot_price')}"
+        progress = self._progress.setdefault(statistic_id, {})
+        last_hour = progress.get("last_hour", 0.0)
+
+        hours = {float(start): prices for start, prices in progress.get("upcoming", {}).items()}
+        current: dict[float, list[float]] = {}
+        for point in points:
+            start = _hour_start(dt_util.as_utc(point["time"])).timestamp()
+            current.setdefault(start, []).append(point["price"] / 100)
+        hours.update(current)
+
+        ended = now.timestamp() - HOUR.total_seconds()
+        progress["upcoming"] = {str(start): prices for start, prices in hours.items() if start > ended}
+        statistics: list["StatisticData"] = [
+            {
+                "start": dt_util.utc_from_timestamp(start),
+                "mean": sum(prices) / len(prices),
+                "min": min(prices),
+                "max": max(prices),
+            }
+            for start, prices in sorted(hours.items())
+            if last_hour < start <= ended
+        ]
+        if self._add(_metadata(statistic_id, f"{name} spot price", "SEK/kWh", None, mean=True), statistics):
+            progress["last_hour"] = statistics[-1]["start"].timestamp()
+
+    def _import_energy(self, object_id: str, name: str, value: float | None, now: datetime) -> None:
+        """Add the growth of a daily energy counter to a running sum, once per hour.
+
+        The first value seen in an hour closes the previous hour. A value lower than the previous one means the
+        counter was reset at midnight, so all of it was counted since the reset.
+        """
+        if value is None:
+            return
+
+        statistic_id = f"{DOMAIN}:{slugify(object_id)}"
+        progress = self._progress.setdefault(statistic_id, {})
+        previous_hour = _hour_start(now) - HOUR
+        if "state" not in progress:
+            progress.update(last_hour=previous_hour.timestamp(), state=value, sum=0.0)
+            return
+        if previous_hour.timestamp() <= progress["last_hour"]:
+            return
+
+        growth = value - progress["state"] if value >= progress["state"] else value
+        statistics: list["StatisticData"] = [{"start": previous_hour, "state": value, "sum": progress["sum"] + growth}]
+        metadata = _metadata(
+            statistic_id, name, UnitOfEnergy.KILO_WATT_HOUR, EnergyConverter.UNIT_CLASS, mean=False
+        )
+        if self._add(metadata, statistics):
+            progress.update(last_hour=previous_hour.timestamp(), state=value, sum=statistics[-1]["sum"])
+
+    def _add(self, metadata: "StatisticMetaData", statistics: Iterable["StatisticData"]) -> bool:
+        """Queue the statistics with the recorder in chunks, returning False when there was nothing to add."""
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        added = False
+        for chunk in batched(statistics, STATISTICS_CHUNK_HOURS):
+            async_add_external_statistics(self._hass, metadata, list(chunk))
+            added = True
+        if added:
+            _LOGGER.debug("Imported statistics of %s", metadata["statistic_id"])
+        return added
@@ -0,0 +1,70 @@
+"""Telemetry events of Svea Solar websocket samples."""
+
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from pysveasolar.models import Battery, VehicleDetailsData
+
+from .const import DOMAIN
+from .metrics import SveaSolarMetrics
+
+EVENT_TELEMETRY = f"{DOMAIN}_telemetry"
+
+
+class SveaSolarTelemetry:
+    """Publish every websocket sample on the event bus, at most one per system per interval.
+
+    Samples are published before they are coalesced and deduplicated for the sensors. An empty `system_ids`
+    publishes the samples of every system.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        metrics: SveaSolarMetrics,
+        interval: float,
+        system_ids: list[str],
+    ):
+        self._hass = hass
+        self._entry_id = entry_id
+        self._metrics = metrics
+        self._interval = interval
+        self._system_ids = frozenset(system_ids)
+        self._last_published: dict[str, float] = {}
+
+    @callback
+    def async_publish_battery(self, battery: Battery) -> None:
+        self._async_publish(
+            battery.battery_id, "battery", {"status": battery.status, "state_of_charge": battery.state_of_charge}
+        )
+
+    @callback
+    def async_publish_ev(self, ev: VehicleDetailsData) -> None:
+        self._async_publish(
+            ev.id,
+            "ev",
+            {
+                "charging_status": ev.vehicleStatus.chargingStatus,
+                "battery_level": ev.vehicleStatus.batteryLevel,
+                "range": ev.vehicleStatus.range,
+            },
+        )
+
+    @callback
+    def _async_publish(self, system_id: str, system_type: str, sample: dict[str, Any]) -> None:
+        if self._system_ids and system_id not in self._system_ids:
+            return
+
+        now = time.monotonic()
+        if now - self._last_published.get(system_id, float("-inf")) < self._interval:
+            self._metrics.increment("telemetry.dropped")
+            return
+
+        self._last_published[system_id] = now
+        self._metrics.increment("telemetry.events")
+        self._hass.bus.async_fire(
+            EVENT_TELEMETRY,
+            {"entry_id": self._entry_id, "system_id": system_id, "system_type": system_type, **sample},
+        )
@@ -0,0 +1,237 @@
+"""Websocket supervision for Svea Solar."""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from homeassistant.core import HomeAssistant, callback
+from pysveasolar.errors import WebsocketError
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKOFF_MIN = 2.0
+BACKOFF_MAX = 300.0
+STABLE_CONNECTION = 60.0
+MAX_RECONNECTS = 10
+RECONNECT_WINDOW = 600.0
+CONNECT_BUDGET = 2
+CONNECT_TIMEOUT = 30.0
+CONNECT_STAGGER = 0.5
+
+
+class SveaSolarKeepAliveTimeout(Exception):
+    """Raised when a stream received neither a message nor a keep-alive within its keep-alive timeout."""
+
+
+@dataclass
+class SveaSolarWebsocketStream:
+    """A single websocket stream and its reconnect bookkeeping."""
+
+    name: str
+    connect: Callable[["SveaSolarWebsocketStream"], Awaitable[None]]
+    disconnect: Callable[[], Awaitable[None]]
+    keep_alive_timeout: float | None = None
+    connected: bool | None = None
+    connected_at: float = 0.0
+    last_seen: float = 0.0
+    failures: int = 0
+    reconnects: deque[float] = field(default_factory=deque)
+    task: asyncio.Task | None = None
+    on_state: Callable[[str, bool], None] | None = None
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+    handshake: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @callback
+    def async_alive(self) -> None:
+        """Record a keep-alive or message, feeding the watchdog."""
+        self.last_seen = time.monotonic()
+
+    @callback
+    def async_connected(self) -> None:
+        self.connected_at = self.last_seen = time.monotonic()
+        self.handshake.set()
+        self.async_set_connected(True)
+
+    @callback
+    def async_set_connected(self, connected: bool) -> None:
+        if self.connected is connected:
+            return
+
+        self.connected = connected
+        if self.on_state is not None:
+            self.on_state(self.name, connected)
+
+
+class SveaSolarWebsocketSupervisor:
+    """Keep websocket streams connected.
+
+    Streams are reconnected with exponential backoff and jitter, a stream that misses its keep-alive is torn down
+    and reconnected, and a stream that keeps dropping is limited to a number of reconnects per window.
+
+    Streams started together connect one after the other, CONNECT_STAGGER seconds apart, and at most CONNECT_BUDGET
+    streams are connecting at the same time, so a burst of reconnects is spread out instead of hitting the cloud at
+    once.
+    """
+
+    def __init__(self, hass: HomeAssistant, on_state: Callable[[str, bool], None]):
+        self._hass = hass
+        self._on_state = on_state
+        self._streams: dict[str, SveaSolarWebsocketStream] = {}
+        self._connect_budget = asyncio.Semaphore(CONNECT_BUDGET)
+        self._next_start = 0.0
+
+    @property
+    def states(self) -> dict[str, bool | None]:
+        return {name: stream.connected for name, stream in self._streams.items()}
+
+    @callback
+    def async_start(
+        self,
+        name: str,
+        connect: Callable[[SveaSolarWebsocketStream], Awaitable[None]],
+        disconnect: Callable[[], Awaitable[None]],
+        keep_alive_timeout: float | None = None,
+    ) -> None:
+        if name in self._streams:
+            return
+
+        stream = SveaSolarWebsocketStream(
+            name, connect, disconnect, keep_alive_timeout=keep_alive_timeout, on_state=self._on_state
+        )
+        now = time.monotonic()
+        delay = max(self._next_start - now, 0.0)
+        self._next_start = now + delay + CONNECT_STAGGER
+        stream.task = self._hass.async_create_background_task(
+            self._async_run(stream, delay), f"sveasolar websocket {name}"
+        )
+        self._streams[name] = stream
+
+    async def async_stop(self, name: str) -> None:
+        if (stream := self._streams.pop(name, None)) is None:
+            return
+
+        stream.task.cancel()
+        try:
+            await stream.task
+        except asyncio.CancelledError:
+            _LOGGER.debug("Websocket %s successfully canceled", name)
+
+        await self._async_disconnect(stream)
+
+    @callback
+    def async_wake(self) -> None:
+        """Reconnect the streams that are down right away instead of after their backoff."""
+        for stream in self._streams.values():
+            if not stream.connected:
+                stream.wake.set()
+
+    async def async_stop_all(self) -> None:
+        await asyncio.gather(*(self.async_stop(name) for name in list(self._streams)))
+
+    async def _async_run(self, stream: SveaSolarWebsocketStream, delay: float = 0.0) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+
+        while True:
+            error: str | None = None
+            try:
+                await self._async_connect_once(stream)
+                _LOGGER.debug("Websocket %s closed", stream.name)
+            except asyncio.CancelledError:
+                _LOGGER.debug("Request to cancel websocket %s received", stream.name)
+                raise
+            except SveaSolarKeepAliveTimeout:
+                error = "missed its keep-alive"
+                await self._async_disconnect(stream)
+            except WebsocketError as err:
+                error = f"failed to connect: {err}"
+            except Exception as err:  # noqa: BLE001
+                error = f"unknown exception while connecting: {err}"
+
+            if stream.connected and time.monotonic() - stream.connected_at >= STABLE_CONNECTION:
+                stream.failures = 0
+            if error is not None:
+                # Only the first failure of an outage is logged as an error to keep the log readable
+                level = logging.ERROR if stream.failures == 0 else logging.DEBUG
+                _LOGGER.log(level, "Websocket %s %s", stream.name, error)
+            stream.failures += 1
+            stream.async_set_connected(False)
+
+            delay = self._reconnect_delay(stream)
+            _LOGGER.debug("Reconnecting to websocket %s in %.1f seconds", stream.name, delay)
+            try:
+                async with asyncio.timeout(delay):
+                    await stream.wake.wait()
+                _LOGGER.debug("Woken up to reconnect websocket %s", stream.name)
+            except TimeoutError:
+                pass
+
+    async def _async_connect_once(self, stream: SveaSolarWebsocketStream) -> None:
+        """Run one connection until it closes, raising SveaSolarKeepAliveTimeout when the keep-alive is missed."""
+        stream.wake.clear()
+        stream.handshake.clear()
+        async with self._connect_budget:
+            stream.async_alive()
+            connection = asyncio.ensure_future(stream.connect(stream))
+            # The slot of the budget is held until the stream connected, the connection failed or it timed out
+            handshake = asyncio.ensure_future(stream.handshake.wait())
+            try:
+                await asyncio.wait(
+                    (connection, handshake), timeout=CONNECT_TIMEOUT, return_when=asyncio.FIRST_COMPLETED
+                )
+            except asyncio.CancelledError:
+                connection.cancel()
+                raise
+            finally:
+                handshake.cancel()
+
+        tasks = [connection]
+        if stream.keep_alive_timeout is not None:
+            tasks.append(asyncio.ensure_future(self._async_watchdog(stream)))
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if connection not in done:
+            raise SveaSolarKeepAliveTimeout
+        connection.result()
+
+    @staticmethod
+    async def _async_watchdog(stream: SveaSolarWebsocketStream) -> None:
+        while (remaining := stream.last_seen + stream.keep_alive_timeout - time.monotonic()) > 0:
+            await asyncio.sleep(remaining)
+
+    @staticmethod
+    async def _async_disconnect(stream: SveaSolarWebsocketStream) -> None:
+        try:
+            await stream.disconnect()
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.debug("Failed to disconnect websocket %s: %s", stream.name, err)
+
+    @staticmethod
+    def _reconnect_delay(stream: SveaSolarWebsocketStream) -> float:
+        now = time.monotonic()
+        while stream.reconnects and stream.reconnects[0] < now - RECONNECT_WINDOW:
+            stream.reconnects.popleft()
+
+        delay = min(BACKOFF_MIN * 2 ** (stream.failures - 1), BACKOFF_MAX)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if len(stream.reconnects) >= MAX_RECONNECTS:
+            _LOGGER.warning(
+                "Websocket %s reconnected %s times in %s seconds, waiting for the window to pass",
+                stream.name,
+                len(stream.reconnects),
+                int(RECONNECT_WINDOW),
+            )
+            delay = max(delay, stream.reconnects[0] + RECONNECT_WINDOW - now)
+
+        stream.reconnects.append(now + delay)
+        return delay
@@ -0,0 +1 @@
+"""Tests for the Svea Solar integration."""
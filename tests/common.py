@@ -0,0 +1,51 @@
+"""Helpers shared by the Svea Solar tests."""
+
+import base64
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from aiohttp import ClientResponseError
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_PASSWORD, CONF_USERNAME
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.sveasolar.const import CONF_REFRESH_TOKEN, DOMAIN
+
+USERNAME = "user@example.com"
+TOKEN_STORE_KEY = "sveasolar.user_example_com.tokens"
+
+
+def _encode(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def token(expires_in: float) -> str:
+    """Return a JWT that expires in `expires_in` seconds, with a signature nobody verifies."""
+    return f"{_encode({'alg': 'HS256', 'typ': 'JWT'})}.{_encode({'exp': int(time.time() + expires_in)})}.signature"
+
+
+def mock_entry(
+    access_token: str | None,
+    refresh_token: str | None = "entry-refresh",
+    options: dict | None = None,
+    username: str = USERNAME,
+) -> MockConfigEntry:
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_USERNAME: username,
+            CONF_PASSWORD: "secret",
+            CONF_ACCESS_TOKEN: access_token,
+            CONF_REFRESH_TOKEN: refresh_token,
+        },
+        options=options or {},
+    )
+
+
+def mock_response(data: dict | list | None = None, status: int = 200) -> MagicMock:
+    """Return a response of `Auth.request`, raising a ClientResponseError from raise_for_status for errors."""
+    response = MagicMock(status=status)
+    response.json = AsyncMock(return_value=data)
+    if status >= 400:
+        response.raise_for_status.side_effect = ClientResponseError(MagicMock(), (), status=status)
+    return response
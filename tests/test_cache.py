@@ -0,0 +1,90 @@
+"""Tests for the warm start from the cache."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from custom_components.sveasolar import SveaSolarDataUpdateCoordinator, SveaSolarSystemType
+from custom_components.sveasolar.cache import SveaSolarCache
+from custom_components.sveasolar.const import DOMAIN
+from custom_components.sveasolar.hub import SveaSolarHub
+from custom_components.sveasolar.sensor import SENSOR_DESCRIPTIONS, TYPE_BATTERY_BATTERY_LEVEL
+
+from .common import mock_entry, token
+
+BATTERY_ID = "battery"
+SYSTEM_IDS = {"battery": [{BATTERY_ID: "Battery"}], "ev": [], "location": []}
+
+
+def _coordinator(hass: HomeAssistant) -> SveaSolarDataUpdateCoordinator:
+    entry = mock_entry(token(3600))
+    entry.add_to_hass(hass)
+    hub = SveaSolarHub(hass, entry)
+    hub.api.async_get_my_system = AsyncMock()
+    return SveaSolarDataUpdateCoordinator(hass, entry, hub)
+
+
+def _cache(hass_storage: dict, coordinator: SveaSolarDataUpdateCoordinator, data: dict) -> None:
+    key = f"{DOMAIN}.{coordinator.config_entry.entry_id}.cache"
+    hass_storage[key] = {"version": 1, "minor_version": 1, "key": key, "data": data}
+
+
+async def test_without_systems(hass: HomeAssistant, hass_storage: dict) -> None:
+    coordinator = _coordinator(hass)
+    _cache(hass_storage, coordinator, {"system_ids": {"battery": [], "ev": [], "location": []}})
+
+    assert await SveaSolarCache(hass, coordinator.config_entry.entry_id).async_load() is None
+    assert not await coordinator.async_restore()
+
+
+async def test_restore(hass: HomeAssistant, hass_storage: dict) -> None:
+    coordinator = _coordinator(hass)
+    _cache(
+        hass_storage,
+        coordinator,
+        {
+            "system_ids": SYSTEM_IDS,
+            "devices": {BATTERY_ID: {"manufacturer": "Emaldo", "via_device": "location"}},
+            "values": {BATTERY_ID: {TYPE_BATTERY_BATTERY_LEVEL: 80}},
+        },
+    )
+
+    assert await coordinator.async_restore()
+
+    assert coordinator.system_ids == {SveaSolarSystemType(key): ids for key, ids in SYSTEM_IDS.items()}
+    assert coordinator.device_info(BATTERY_ID, "Battery") == DeviceInfo(
+        identifiers={(DOMAIN, BATTERY_ID)},
+        name="Battery",
+        manufacturer="Emaldo",
+        via_device=(DOMAIN, "location"),
+    )
+    description = next(entity for entity in SENSOR_DESCRIPTIONS if entity.key == TYPE_BATTERY_BATTERY_LEVEL)
+    remove = coordinator.async_add_system_listener(BATTERY_ID, SveaSolarSystemType.BATTERY, description, MagicMock())
+    # The cached value is shown until any source has data
+    assert coordinator.value(BATTERY_ID, TYPE_BATTERY_BATTERY_LEVEL) == 80
+    # Saving before the first refresh keeps the cached values
+    assert coordinator._cache_data()["values"] == {BATTERY_ID: {TYPE_BATTERY_BATTERY_LEVEL: 80}}
+    remove()
+
+
+async def test_changed_systems_reload(hass: HomeAssistant, hass_storage: dict) -> None:
+    coordinator = _coordinator(hass)
+    _cache(hass_storage, coordinator, {"system_ids": SYSTEM_IDS})
+    await coordinator.async_restore()
+    coordinator.hub.api.async_get_my_system.return_value = {
+        "locations": [{"id": "location", "name": "Home", "battery": {"id": "other", "name": "Other"}}],
+        "electricVehicles": [],
+    }
+
+    with patch.object(hass.config_entries, "async_schedule_reload") as async_schedule_reload:
+        await coordinator.async_warm_start()
+
+    async_schedule_reload.assert_called_once_with(coordinator.config_entry.entry_id)
+    # The reloaded entry restores the new systems from the cache
+    cache = await SveaSolarCache(hass, coordinator.config_entry.entry_id).async_load()
+    assert cache["system_ids"] == {
+        "battery": [{"other": "Other"}],
+        "ev": [],
+        "location": [{"location": "Home"}],
+    }
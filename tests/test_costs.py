@@ -0,0 +1,160 @@
+"""Tests for the cost and savings accounts."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.sveasolar.costs import (
+    COST_BATTERY_SAVINGS,
+    COST_GRID_EXPORT,
+    COST_GRID_IMPORT,
+    COST_SOLAR_SAVINGS,
+    FROM_BATTERY,
+    FROM_GRID,
+    FROM_SOLAR,
+    PERIOD_DAY,
+    PERIOD_MONTH,
+    TO_GRID,
+    USAGE,
+    SveaSolarCostMeter,
+    period_start,
+)
+from custom_components.sveasolar.energy import SveaSolarEnergyInterval
+
+LOCATION_ID = "location"
+
+
+def _local(*args: int) -> datetime:
+    return datetime(*args, tzinfo=dt_util.get_default_time_zone())
+
+
+def _interval(end: datetime, energy: dict[str, float], minutes: int = 10) -> SveaSolarEnergyInterval:
+    return SveaSolarEnergyInterval((end - timedelta(minutes=minutes)).timestamp(), end.timestamp(), energy)
+
+
+async def test_no_interval(hass: HomeAssistant) -> None:
+    meter = SveaSolarCostMeter(hass, "entry")
+
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_DAY) is None
+
+
+async def test_costs_and_savings(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    moment = _local(2025, 3, 14, 12)
+    freezer.move_to(moment)
+    meter = SveaSolarCostMeter(hass, "entry")
+
+    meter.async_record(
+        LOCATION_ID,
+        _interval(moment, {USAGE: 3.0, FROM_GRID: 1.0, FROM_BATTERY: 1.5, FROM_SOLAR: 2.0, TO_GRID: 0.5}),
+        2.0,
+    )
+
+    for period in (PERIOD_DAY, PERIOD_MONTH):
+        assert meter.total(LOCATION_ID, COST_GRID_IMPORT, period) == 2.0
+        assert meter.total(LOCATION_ID, COST_GRID_EXPORT, period) == 1.0
+        assert meter.total(LOCATION_ID, COST_BATTERY_SAVINGS, period) == 3.0
+        assert meter.total(LOCATION_ID, COST_SOLAR_SAVINGS, period) == 1.0
+
+
+@pytest.mark.parametrize(
+    ("energy", "battery_savings", "solar_savings"),
+    [
+        # The battery can not save more than the usage
+        ({USAGE: 1.0, FROM_BATTERY: 2.0, FROM_SOLAR: 1.0}, 1.0, 0.0),
+        # The solar savings are limited by the solar production
+        ({USAGE: 3.0, FROM_SOLAR: 1.0}, 0.0, 1.0),
+        # Charging the battery from the grid saves nothing
+        ({USAGE: 1.0, FROM_GRID: 3.0}, 0.0, 0.0),
+    ],
+)
+async def test_savings_are_limited(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    energy: dict[str, float],
+    battery_savings: float,
+    solar_savings: float,
+) -> None:
+    moment = _local(2025, 3, 14, 12)
+    freezer.move_to(moment)
+    meter = SveaSolarCostMeter(hass, "entry")
+
+    meter.async_record(LOCATION_ID, _interval(moment, energy), 1.0)
+
+    assert meter.total(LOCATION_ID, COST_BATTERY_SAVINGS, PERIOD_DAY) == battery_savings
+    assert meter.total(LOCATION_ID, COST_SOLAR_SAVINGS, PERIOD_DAY) == solar_savings
+
+
+async def test_day_rollover(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    meter = SveaSolarCostMeter(hass, "entry")
+    moment = _local(2025, 3, 14, 23, 50)
+    freezer.move_to(moment)
+    meter.async_record(LOCATION_ID, _interval(moment, {FROM_GRID: 1.0}), 1.0)
+
+    # Without an interval of the new day the account of the previous day is not shown
+    moment = _local(2025, 3, 15, 0, 5)
+    freezer.move_to(moment)
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_DAY) == 0.0
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_MONTH) == 1.0
+
+    # An interval is booked on the day of its middle
+    meter.async_record(LOCATION_ID, _interval(moment, {FROM_GRID: 2.0}, minutes=20), 1.0)
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_DAY) == 0.0
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_MONTH) == 3.0
+
+    moment = _local(2025, 3, 15, 0, 15)
+    freezer.move_to(moment)
+    meter.async_record(LOCATION_ID, _interval(moment, {FROM_GRID: 4.0}), 1.0)
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_DAY) == 4.0
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_MONTH) == 7.0
+
+
+async def test_month_rollover(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    meter = SveaSolarCostMeter(hass, "entry")
+    moment = _local(2025, 3, 31, 23, 50)
+    freezer.move_to(moment)
+    meter.async_record(LOCATION_ID, _interval(moment, {FROM_GRID: 1.0, TO_GRID: 1.0}), 1.0)
+
+    moment = _local(2025, 4, 1, 0, 10)
+    freezer.move_to(moment)
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_MONTH) == 0.0
+
+    meter.async_record(LOCATION_ID, _interval(moment, {FROM_GRID: 2.0}), 1.0)
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_DAY) == 2.0
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_MONTH) == 2.0
+    # A new period starts from an empty account
+    assert meter.total(LOCATION_ID, COST_GRID_EXPORT, PERIOD_MONTH) == 0.0
+
+
+async def test_period_start(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    freezer.move_to(_local(2025, 3, 14, 12))
+
+    assert period_start(PERIOD_DAY) == _local(2025, 3, 14)
+    assert period_start(PERIOD_MONTH) == _local(2025, 3, 1)
+
+
+async def test_continues_after_restart(hass: HomeAssistant, hass_storage: dict, freezer: FrozenDateTimeFactory) -> None:
+    moment = _local(2025, 3, 14, 12)
+    freezer.move_to(moment)
+    hass_storage["sveasolar.entry.costs"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "sveasolar.entry.costs",
+        "data": {
+            "accounts": {
+                LOCATION_ID: {
+                    PERIOD_DAY: {"period": "2025-03-14", COST_GRID_IMPORT: 5.0},
+                    PERIOD_MONTH: {"period": "2025-03", COST_GRID_IMPORT: 50.0},
+                }
+            }
+        },
+    }
+    meter = SveaSolarCostMeter(hass, "entry")
+    await meter.async_load()
+
+    meter.async_record(LOCATION_ID, _interval(moment, {FROM_GRID: 1.0}), 1.0)
+
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_DAY) == 6.0
+    assert meter.total(LOCATION_ID, COST_GRID_IMPORT, PERIOD_MONTH) == 51.0
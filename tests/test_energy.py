@@ -0,0 +1,109 @@
+"""Tests for the energy counters integrated from the power flows."""
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.sveasolar.const import FLOW_DESTINATIONS, FLOW_SOURCES
+from custom_components.sveasolar.energy import ENERGY_MAX_GAP, SveaSolarEnergyMeter, flow_key
+
+SOLAR = (FLOW_SOURCES, "Solar")
+USAGE = (FLOW_DESTINATIONS, "Usage")
+LOCATION_ID = "location"
+
+
+async def test_first_sample(hass: HomeAssistant) -> None:
+    meter = SveaSolarEnergyMeter(hass, "entry")
+
+    assert meter.total(LOCATION_ID, SOLAR) is None
+    assert meter.async_record(LOCATION_ID, {SOLAR: 2.0}, 0.0) is None
+    assert meter.total(LOCATION_ID, SOLAR) == 0.0
+    assert meter.total(LOCATION_ID, USAGE) == 0.0
+
+
+async def test_trapezoid(hass: HomeAssistant) -> None:
+    meter = SveaSolarEnergyMeter(hass, "entry")
+    meter.async_record(LOCATION_ID, {SOLAR: 2.0, USAGE: 1.0}, 0.0)
+
+    interval = meter.async_record(LOCATION_ID, {SOLAR: 4.0, USAGE: 1.0}, 600.0)
+
+    assert interval.start == 0.0
+    assert interval.end == 600.0
+    assert interval.energy == {flow_key(SOLAR): pytest.approx(0.5), flow_key(USAGE): pytest.approx(1 / 6)}
+    assert meter.total(LOCATION_ID, SOLAR) == 0.5
+    assert meter.total(LOCATION_ID, USAGE) == 0.167
+
+
+async def test_missing_flow_counts_as_zero(hass: HomeAssistant) -> None:
+    meter = SveaSolarEnergyMeter(hass, "entry")
+    meter.async_record(LOCATION_ID, {SOLAR: 3.0}, 0.0)
+
+    interval = meter.async_record(LOCATION_ID, {USAGE: None}, 600.0)
+
+    assert interval.energy == {flow_key(SOLAR): pytest.approx(0.25), flow_key(USAGE): 0.0}
+    assert meter.total(LOCATION_ID, SOLAR) == 0.25
+
+
+async def test_negative_power_is_not_counted(hass: HomeAssistant) -> None:
+    meter = SveaSolarEnergyMeter(hass, "entry")
+    meter.async_record(LOCATION_ID, {SOLAR: -3.0}, 0.0)
+    meter.async_record(LOCATION_ID, {SOLAR: -1.0}, 600.0)
+
+    assert meter.total(LOCATION_ID, SOLAR) == 0.0
+
+
+async def test_gap_is_skipped(hass: HomeAssistant) -> None:
+    meter = SveaSolarEnergyMeter(hass, "entry")
+    meter.async_record(LOCATION_ID, {SOLAR: 6.0}, 0.0)
+
+    assert meter.async_record(LOCATION_ID, {SOLAR: 6.0}, ENERGY_MAX_GAP + 1) is None
+    assert meter.total(LOCATION_ID, SOLAR) == 0.0
+
+    # The counter continues from the sample after the gap
+    interval = meter.async_record(LOCATION_ID, {SOLAR: 6.0}, 2 * ENERGY_MAX_GAP + 1)
+    assert interval.start == ENERGY_MAX_GAP + 1
+    assert meter.total(LOCATION_ID, SOLAR) == 1.5
+
+
+async def test_longest_interval_is_integrated(hass: HomeAssistant) -> None:
+    meter = SveaSolarEnergyMeter(hass, "entry")
+    meter.async_record(LOCATION_ID, {SOLAR: 4.0}, 0.0)
+
+    assert meter.async_record(LOCATION_ID, {SOLAR: 4.0}, ENERGY_MAX_GAP) is not None
+    assert meter.total(LOCATION_ID, SOLAR) == 1.0
+
+
+async def test_samples_out_of_order(hass: HomeAssistant) -> None:
+    meter = SveaSolarEnergyMeter(hass, "entry")
+    meter.async_record(LOCATION_ID, {SOLAR: 4.0}, 600.0)
+
+    assert meter.async_record(LOCATION_ID, {SOLAR: 4.0}, 600.0) is None
+    assert meter.async_record(LOCATION_ID, {SOLAR: 4.0}, 0.0) is None
+    assert meter.total(LOCATION_ID, SOLAR) == 0.0
+
+
+async def test_locations_are_counted_apart(hass: HomeAssistant) -> None:
+    meter = SveaSolarEnergyMeter(hass, "entry")
+    meter.async_record(LOCATION_ID, {SOLAR: 6.0}, 0.0)
+    meter.async_record("other", {SOLAR: 6.0}, 300.0)
+    meter.async_record(LOCATION_ID, {SOLAR: 6.0}, 600.0)
+
+    assert meter.total(LOCATION_ID, SOLAR) == 1.0
+    assert meter.total("other", SOLAR) == 0.0
+
+
+async def test_continues_after_restart(hass: HomeAssistant, hass_storage: dict) -> None:
+    hass_storage["sveasolar.entry.energy"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "sveasolar.entry.energy",
+        "data": {
+            "totals": {LOCATION_ID: {flow_key(SOLAR): 10.0}},
+            "samples": {LOCATION_ID: {"time": 0.0, "power": {flow_key(SOLAR): 6.0}}},
+        },
+    }
+    meter = SveaSolarEnergyMeter(hass, "entry")
+    await meter.async_load()
+
+    meter.async_record(LOCATION_ID, {SOLAR: 6.0}, 600.0)
+
+    assert meter.total(LOCATION_ID, SOLAR) == 11.0
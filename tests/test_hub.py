@@ -0,0 +1,133 @@
+"""Tests for the shared connection of an account."""
+
+from unittest.mock import ANY, AsyncMock, MagicMock
+
+import pytest
+from aiohttp import ClientConnectionError, ClientError, ClientResponseError, WSServerHandshakeError
+from homeassistant.core import HomeAssistant
+from pysveasolar.errors import AuthenticationError, CannotConnectError, ConnectionFailedError
+
+from custom_components.sveasolar.hub import HOME_STREAM, KEEP_ALIVE_TIMEOUT, SveaSolarHub, is_rejection
+from custom_components.sveasolar.websocket import SveaSolarWebsocketStream
+
+from .common import mock_entry, token
+
+
+def _chain(*errors: Exception) -> Exception:
+    """Raise each error from the next one, the way pysveasolar wraps the aiohttp errors."""
+    for error, cause in zip(errors, errors[1:]):
+        error.__cause__ = cause
+    return errors[0]
+
+
+def _response_error(status: int) -> ClientResponseError:
+    return ClientResponseError(MagicMock(), (), status=status)
+
+
+def _handshake_error(status: int) -> WSServerHandshakeError:
+    return WSServerHandshakeError(MagicMock(), (), status=status)
+
+
+@pytest.mark.parametrize(
+    ("error", "rejected"),
+    [
+        (_chain(ClientError(), _response_error(401)), True),
+        (_chain(ClientError(), _response_error(400)), True),
+        (_chain(ClientError(), _response_error(503)), False),
+        (_chain(ClientError(), ClientConnectionError()), False),
+        (_chain(CannotConnectError(), _handshake_error(403)), True),
+        (_chain(ConnectionFailedError(), AuthenticationError(), _response_error(401)), True),
+        (_chain(ConnectionFailedError(), AuthenticationError(), ClientConnectionError()), False),
+        (_chain(ConnectionFailedError(), ConnectionResetError()), False),
+        (ClientError(), False),
+    ],
+)
+def test_is_rejection(error: Exception, rejected: bool) -> None:
+    assert is_rejection(error) is rejected
+
+
+def _hub(hass: HomeAssistant) -> SveaSolarHub:
+    hub = SveaSolarHub(hass, mock_entry(token(3600)))
+    hub.async_login = AsyncMock()
+    return hub
+
+
+def _stream(name: str) -> SveaSolarWebsocketStream:
+    return SveaSolarWebsocketStream(name, AsyncMock(), AsyncMock())
+
+
+async def test_rejected_websocket_logs_in(hass: HomeAssistant) -> None:
+    hub = _hub(hass)
+    access_token = hub.token_manager.access_token
+    rejection = _chain(CannotConnectError(), _handshake_error(401))
+    hub.api.async_home_websocket = AsyncMock(side_effect=rejection)
+
+    with pytest.raises(CannotConnectError):
+        await hub.ws_battery_connect(_stream("home"))
+
+    hub.async_login.assert_awaited_once_with(access_token)
+
+
+async def test_dropped_websocket_does_not_log_in(hass: HomeAssistant) -> None:
+    hub = _hub(hass)
+    hub.api.async_ev_websocket = AsyncMock(side_effect=_chain(ConnectionFailedError(), ConnectionResetError()))
+
+    with pytest.raises(ConnectionFailedError):
+        await hub.ws_ev_connect("ev", _stream("ev_ev"))
+
+    hub.async_login.assert_not_awaited()
+
+
+async def test_ev_streams_are_kept_alive(hass: HomeAssistant) -> None:
+    hub = _hub(hass)
+    hub._websockets.async_start = MagicMock()
+    subscriber = MagicMock()
+
+    hub.async_subscribe(subscriber, ["ev"], home=False)
+
+    hub._websockets.async_start.assert_called_once_with("ev_ev", ANY, ANY, keep_alive_timeout=KEEP_ALIVE_TIMEOUT)
+    await hub.async_unsubscribe(subscriber)
+
+
+async def test_ev_keep_alive_feeds_the_watchdog(hass: HomeAssistant) -> None:
+    hub = _hub(hass)
+    stream = _stream("ev_ev")
+
+    async def async_ev_websocket(ev_id, data_callback, connected_callback, keep_alive_callback) -> None:
+        keep_alive_callback(MagicMock())
+
+    hub.api.async_ev_websocket = async_ev_websocket
+    await hub.ws_ev_connect("ev", stream)
+
+    assert stream.last_seen > 0
+
+
+async def test_entries_of_an_account_share_the_hub(hass: HomeAssistant) -> None:
+    hub = SveaSolarHub.async_get(hass, mock_entry(token(3600)))
+
+    assert SveaSolarHub.async_get(hass, mock_entry(token(3600))) is hub
+    assert SveaSolarHub.async_get(hass, mock_entry(token(3600), username="other@example.com")) is not hub
+
+
+async def test_shared_stream_stays_until_the_last_subscriber_leaves(hass: HomeAssistant) -> None:
+    hub = _hub(hass)
+    hub._websockets = MagicMock(states={HOME_STREAM: True}, async_stop=AsyncMock())
+    first, second = MagicMock(), MagicMock()
+    hub.async_subscribe(first, [])
+    hub.async_subscribe(second, [])
+    stream = _stream(HOME_STREAM)
+
+    async def async_home_websocket(data_callback, connected_callback, keep_alive_callback) -> None:
+        data_callback(MagicMock())
+
+    hub.api.async_home_websocket = async_home_websocket
+    await hub.ws_battery_connect(stream)
+    # One connection feeds the entries of both
+    first.async_handle_battery.assert_called_once()
+    second.async_handle_battery.assert_called_once()
+
+    await hub.async_unsubscribe(first)
+    hub._websockets.async_stop.assert_not_awaited()
+    await hub.async_unsubscribe(second)
+    hub._websockets.async_stop.assert_awaited_once_with(HOME_STREAM)
+    assert not hub.has_subscribers
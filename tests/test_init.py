@@ -0,0 +1,164 @@
+"""Tests for the data update coordinator."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from pysveasolar.models import Battery, BatteryDetailsData
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.sveasolar import SveaSolarDataUpdateCoordinator, SveaSolarSystemType
+from custom_components.sveasolar.const import CONF_UPDATE_WINDOW, DOMAIN
+from custom_components.sveasolar.hub import SveaSolarHub
+from custom_components.sveasolar.sensor import (
+    SENSOR_DESCRIPTIONS,
+    TYPE_BATTERY_BATTERY_LEVEL,
+    TYPE_BATTERY_CHARGED_ENERGY,
+    TYPE_BATTERY_STATUS,
+)
+
+from .common import mock_entry, mock_response
+
+
+def _coordinator(hass: HomeAssistant, options: dict | None = None) -> SveaSolarDataUpdateCoordinator:
+    entry = mock_entry(None, None, options)
+    entry.add_to_hass(hass)
+    hub = SveaSolarHub(hass, entry)
+    hub.api.auth.request = AsyncMock()
+    return SveaSolarDataUpdateCoordinator(hass, entry, hub)
+
+
+@pytest.mark.parametrize("status", [400, 401, 403])
+async def test_rejected_login_starts_reauth(hass: HomeAssistant, status: int) -> None:
+    coordinator = _coordinator(hass)
+    coordinator.hub.api.auth.request.return_value = mock_response(status=status)
+
+    with pytest.raises(ConfigEntryAuthFailed):
+        await coordinator._async_login()
+
+
+async def test_failed_login_backs_off(hass: HomeAssistant) -> None:
+    coordinator = _coordinator(hass)
+    coordinator.hub.api.auth.request.return_value = mock_response(status=503)
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_login()
+    # The next attempt waits for the backoff instead of logging in again
+    with pytest.raises(UpdateFailed, match="retrying in"):
+        await coordinator._async_login()
+
+    coordinator.hub.api.auth.request.assert_awaited_once()
+
+
+def _battery_details(battery_id: str = "battery") -> BatteryDetailsData:
+    return BatteryDetailsData(
+        id=battery_id,
+        dischargePower=1500,
+        status="Discharging",
+        stateOfCharge=80,
+        chargedEnergy=10.0,
+        dischargedEnergy=8.0,
+        locationName="Home",
+        locationId="location",
+        brand="Emaldo",
+        name="Battery",
+        imageUrl="https://example.com/battery.png",
+        capacity="10",
+        chemistry="LFP",
+        typeOfBattery="Home",
+    )
+
+
+async def test_battery_device_info(hass: HomeAssistant) -> None:
+    coordinator = _coordinator(hass)
+    coordinator.hub.api.async_get_battery = AsyncMock(return_value=_battery_details())
+
+    await coordinator._async_poll_battery(asyncio.Semaphore(1), "battery")
+
+    assert coordinator.device_info("battery", "Battery") == DeviceInfo(
+        identifiers={(DOMAIN, "battery")},
+        name="Battery",
+        manufacturer="Emaldo",
+        via_device=(DOMAIN, "location"),
+    )
+    assert coordinator.devices == {"battery": {"manufacturer": "Emaldo", "via_device": "location"}}
+
+
+def _battery(status: str = "Charging", state_of_charge: str = "50") -> Battery:
+    return Battery(battery_id="battery", name="Battery", status=status, state_of_charge=state_of_charge, image_url=None)
+
+
+def _listen(coordinator: SveaSolarDataUpdateCoordinator, *keys: str) -> dict[str, MagicMock]:
+    """Add a listener per sensor key of the battery, returning their callbacks."""
+    callbacks = {}
+    for description in SENSOR_DESCRIPTIONS:
+        if description.key in keys:
+            callbacks[description.key] = MagicMock()
+            coordinator.async_add_system_listener(
+                "battery", SveaSolarSystemType.BATTERY, description, callbacks[description.key]
+            )
+    return callbacks
+
+
+async def test_only_changed_values_call_back(hass: HomeAssistant) -> None:
+    coordinator = _coordinator(hass, {CONF_UPDATE_WINDOW: 0})
+    callbacks = _listen(coordinator, TYPE_BATTERY_STATUS, TYPE_BATTERY_BATTERY_LEVEL)
+
+    coordinator.async_handle_battery(_battery())
+    assert all(update_callback.call_count == 1 for update_callback in callbacks.values())
+
+    coordinator.async_handle_battery(_battery(state_of_charge="51"))
+    assert callbacks[TYPE_BATTERY_BATTERY_LEVEL].call_count == 2
+    assert callbacks[TYPE_BATTERY_STATUS].call_count == 1
+
+    # A repeated message changes nothing
+    coordinator.async_handle_battery(_battery(state_of_charge="51"))
+    assert callbacks[TYPE_BATTERY_BATTERY_LEVEL].call_count == 2
+    assert coordinator.value("battery", TYPE_BATTERY_BATTERY_LEVEL) == "51"
+
+
+async def test_bursts_are_coalesced(hass: HomeAssistant) -> None:
+    coordinator = _coordinator(hass, {CONF_UPDATE_WINDOW: 1.0})
+    callbacks = _listen(coordinator, TYPE_BATTERY_STATUS, TYPE_BATTERY_BATTERY_LEVEL)
+    coordinator.async_handle_battery(_battery())
+
+    for state_of_charge in ("51", "52", "53"):
+        coordinator.async_handle_battery(_battery(state_of_charge=state_of_charge))
+    # The burst waits for the update window
+    assert callbacks[TYPE_BATTERY_BATTERY_LEVEL].call_count == 1
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+    await hass.async_block_till_done()
+    assert callbacks[TYPE_BATTERY_BATTERY_LEVEL].call_count == 2
+    assert coordinator.value("battery", TYPE_BATTERY_BATTERY_LEVEL) == "53"
+
+    # A status change is not held back
+    coordinator.async_handle_battery(_battery(status="Discharging", state_of_charge="53"))
+    assert callbacks[TYPE_BATTERY_STATUS].call_count == 2
+
+
+async def test_systems_without_entities_are_skipped(hass: HomeAssistant) -> None:
+    coordinator = _coordinator(hass)
+    coordinator.system_ids = {
+        SveaSolarSystemType.BATTERY: [{"battery": "Battery"}, {"idle": "Idle"}],
+        SveaSolarSystemType.EV: [{"ev": "EV"}],
+        SveaSolarSystemType.LOCATION: [{"location": "Home"}],
+    }
+    coordinator.hub.async_subscribe = MagicMock()
+    coordinator.hub.api.async_get_battery = AsyncMock(return_value=_battery_details())
+    coordinator.hub.api.async_get_my_data = AsyncMock(return_value=[])
+    # Only the polled charged energy of one battery is enabled
+    _listen(coordinator, TYPE_BATTERY_CHARGED_ENERGY)
+
+    coordinator.async_websockets_connect()
+    await coordinator._async_poll_due()
+
+    coordinator.hub.async_subscribe.assert_called_once_with(coordinator, [], False)
+    coordinator.hub.api.async_get_battery.assert_awaited_once_with("battery")
+    coordinator.hub.api.async_get_my_data.assert_not_awaited()
@@ -0,0 +1,33 @@
+"""Tests for the projections of the pysveasolar models."""
+
+from pysveasolar.models import Summary, VehicleDetailsData, VehicleStatus
+
+from custom_components.sveasolar.projection import SveaSolarVehicle, SveaSolarVehicleSummary
+
+
+def _vehicle(summary: Summary | None) -> VehicleDetailsData:
+    return VehicleDetailsData(
+        name="EV",
+        id="ev",
+        image="https://example.com/ev.png",
+        vehicleStatus=VehicleStatus(
+            maxBatteryLevel=100, batteryLevel=60, range=250, chargeLimit=80, chargingStatus="Charging"
+        ),
+        sessions=[],
+        vehicleFeatures=None,
+        currentSession=None,
+        summary=summary,
+        smartChargingStatus=None,
+        reliabilityLevel="High",
+    )
+
+
+def test_vehicle() -> None:
+    vehicle = SveaSolarVehicle.from_model(_vehicle(Summary(energyInKwh=12.5, chargingTimeInHours=3.0, savings=10.0)))
+
+    assert vehicle.vehicleStatus.batteryLevel == 60
+    assert vehicle.summary == SveaSolarVehicleSummary(12.5, 3.0)
+
+
+def test_vehicle_without_summary() -> None:
+    assert SveaSolarVehicle.from_model(_vehicle(None)).summary == SveaSolarVehicleSummary(None, None)
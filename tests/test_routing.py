@@ -0,0 +1,58 @@
+"""Tests for the selection of the freshest source of a sensor value."""
+
+import time
+from operator import attrgetter
+from types import SimpleNamespace
+
+from custom_components.sveasolar.routing import ROUTE_MAX_AGE, SveaSolarModels, SveaSolarRoute, SveaSolarSource
+
+SYSTEM_ID = "system"
+
+
+def _models(value, age: float = 0.0) -> SveaSolarModels:
+    models = SveaSolarModels()
+    models.store(SYSTEM_ID, SimpleNamespace(value=value))
+    models.received[SYSTEM_ID] = time.monotonic() - age
+    return models
+
+
+def _route(*models: SveaSolarModels) -> SveaSolarRoute:
+    return SveaSolarRoute("key", tuple(SveaSolarSource(source, attrgetter("value")) for source in models))
+
+
+def test_preferred_source() -> None:
+    assert _route(_models("50"), _models("60")).select(SYSTEM_ID) == "50"
+
+
+def test_stale_source_falls_back() -> None:
+    assert _route(_models("50", ROUTE_MAX_AGE + 1), _models("60")).select(SYSTEM_ID) == "60"
+
+
+def test_freshest_of_stale_sources() -> None:
+    route = _route(_models("50", ROUTE_MAX_AGE + 10), _models("60", ROUTE_MAX_AGE + 1))
+
+    assert route.select(SYSTEM_ID) == "60"
+
+
+def test_placeholder_falls_back() -> None:
+    assert _route(_models(None), _models("60")).select(SYSTEM_ID) == "60"
+    assert _route(_models("N/A"), _models("60")).select(SYSTEM_ID) == "60"
+
+
+def test_single_source_keeps_placeholders() -> None:
+    assert _route(_models("N/A")).select(SYSTEM_ID) == "N/A"
+
+
+def test_default_without_data() -> None:
+    route = _route(SveaSolarModels(), _models("60"))
+
+    assert route.select("other", 42) == 42
+    assert route.select(SYSTEM_ID, 42) == "60"
+
+
+def test_reads() -> None:
+    models = _models("50")
+    route = _route(models)
+
+    assert route.reads(models)
+    assert not route.reads(_models("50"))
@@ -0,0 +1,160 @@
+"""Tests for the adaptive poll scheduling."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+
+from custom_components.sveasolar.scheduler import (
+    MAX_ERROR_BACKOFF,
+    MIN_POLL_INTERVAL,
+    POLL_INTERVAL,
+    SPOT_PRICE_DELAY,
+    WEBSOCKET_DOWN_POLL_INTERVAL,
+    WEBSOCKET_FRESHNESS,
+    WEBSOCKET_POLL_INTERVAL,
+    SveaSolarPollScheduler,
+    power_changed,
+)
+
+NOW = datetime(2025, 3, 14, 12, 10, tzinfo=UTC)
+SYSTEM_ID = "system"
+
+
+@pytest.fixture
+def scheduler(freezer: FrozenDateTimeFactory) -> SveaSolarPollScheduler:
+    freezer.move_to(NOW)
+    return SveaSolarPollScheduler()
+
+
+def _next_poll_in(scheduler: SveaSolarPollScheduler) -> timedelta | None:
+    next_poll_in = scheduler.as_dict()["systems"][SYSTEM_ID]["next_poll_in"]
+    return None if next_poll_in is None else timedelta(seconds=next_poll_in)
+
+
+def test_new_system_is_due(scheduler: SveaSolarPollScheduler) -> None:
+    assert scheduler.is_due(SYSTEM_ID)
+    assert scheduler.next_interval() == POLL_INTERVAL
+
+
+def test_poll_interval(scheduler: SveaSolarPollScheduler, freezer: FrozenDateTimeFactory) -> None:
+    scheduler.record_poll(SYSTEM_ID)
+
+    assert _next_poll_in(scheduler) == POLL_INTERVAL
+    assert not scheduler.is_due(SYSTEM_ID)
+    freezer.tick(POLL_INTERVAL)
+    assert scheduler.is_due(SYSTEM_ID)
+
+
+def test_active_system_is_polled_faster(scheduler: SveaSolarPollScheduler) -> None:
+    scheduler.record_poll(SYSTEM_ID, active=True)
+
+    assert _next_poll_in(scheduler) == MIN_POLL_INTERVAL
+
+
+def test_fresh_websocket_wins_over_activity(scheduler: SveaSolarPollScheduler) -> None:
+    scheduler.record_websocket(SYSTEM_ID)
+    scheduler.record_poll(SYSTEM_ID, active=True)
+
+    assert _next_poll_in(scheduler) == WEBSOCKET_POLL_INTERVAL
+
+
+def test_stale_websocket(scheduler: SveaSolarPollScheduler, freezer: FrozenDateTimeFactory) -> None:
+    scheduler.record_websocket(SYSTEM_ID)
+    freezer.tick(WEBSOCKET_FRESHNESS)
+    scheduler.record_poll(SYSTEM_ID)
+
+    assert _next_poll_in(scheduler) == POLL_INTERVAL
+
+
+def test_websocket_down(scheduler: SveaSolarPollScheduler) -> None:
+    scheduler.record_websocket(SYSTEM_ID)
+    scheduler.record_poll(SYSTEM_ID)
+
+    scheduler.record_websocket_state(SYSTEM_ID, False)
+    assert scheduler.is_due(SYSTEM_ID)
+    scheduler.record_poll(SYSTEM_ID)
+    assert _next_poll_in(scheduler) == WEBSOCKET_DOWN_POLL_INTERVAL
+
+    scheduler.record_poll(SYSTEM_ID, active=True)
+    assert _next_poll_in(scheduler) == MIN_POLL_INTERVAL
+
+    scheduler.record_websocket_state(SYSTEM_ID, True)
+    scheduler.record_poll(SYSTEM_ID)
+    assert _next_poll_in(scheduler) == POLL_INTERVAL
+
+
+def test_spot_price_change(scheduler: SveaSolarPollScheduler, freezer: FrozenDateTimeFactory) -> None:
+    scheduler.record_poll(SYSTEM_ID, spot_price=True)
+    assert _next_poll_in(scheduler) == POLL_INTERVAL
+
+    freezer.move_to(NOW.replace(minute=59))
+    scheduler.record_poll(SYSTEM_ID, spot_price=True)
+    assert _next_poll_in(scheduler) == timedelta(minutes=1) + SPOT_PRICE_DELAY
+
+
+def test_error_backoff(scheduler: SveaSolarPollScheduler) -> None:
+    for interval in (POLL_INTERVAL, POLL_INTERVAL * 2, POLL_INTERVAL * 4):
+        scheduler.record_error(SYSTEM_ID)
+        assert _next_poll_in(scheduler) == interval
+
+    for _ in range(10):
+        scheduler.record_error(SYSTEM_ID)
+    assert _next_poll_in(scheduler) == MAX_ERROR_BACKOFF
+
+    scheduler.record_poll(SYSTEM_ID)
+    assert _next_poll_in(scheduler) == POLL_INTERVAL
+    scheduler.record_error(SYSTEM_ID)
+    assert _next_poll_in(scheduler) == POLL_INTERVAL
+
+
+def test_skipped_system(scheduler: SveaSolarPollScheduler) -> None:
+    scheduler.record_poll(SYSTEM_ID)
+    scheduler.record_skip(SYSTEM_ID)
+
+    assert scheduler.is_due(SYSTEM_ID)
+    assert _next_poll_in(scheduler) is None
+    assert scheduler.next_interval() == POLL_INTERVAL
+
+
+def test_next_interval(scheduler: SveaSolarPollScheduler, freezer: FrozenDateTimeFactory) -> None:
+    scheduler.record_websocket("websocket")
+    scheduler.record_poll("websocket")
+    scheduler.record_poll(SYSTEM_ID)
+    assert scheduler.next_interval() == POLL_INTERVAL
+
+    freezer.tick(timedelta(seconds=50))
+    assert scheduler.next_interval() == POLL_INTERVAL - timedelta(seconds=50)
+
+    # A system that is due sooner than the shortest interval, or overdue, waits for the shortest interval
+    freezer.tick(timedelta(seconds=15))
+    assert scheduler.next_interval() == MIN_POLL_INTERVAL
+    freezer.tick(POLL_INTERVAL)
+    assert scheduler.next_interval() == MIN_POLL_INTERVAL
+
+
+def test_requests_last_hour(scheduler: SveaSolarPollScheduler, freezer: FrozenDateTimeFactory) -> None:
+    scheduler.record_request()
+    freezer.tick(timedelta(minutes=30))
+    scheduler.record_request()
+    assert scheduler.requests_last_hour == 2
+
+    freezer.tick(timedelta(minutes=31))
+    assert scheduler.requests_last_hour == 1
+
+
+@pytest.mark.parametrize(
+    ("previous", "current", "changed"),
+    [
+        (None, {"grid": 5.0}, False),
+        ({"grid": 1.0}, {"grid": 1.4}, False),
+        ({"grid": 1.0}, {"grid": 1.5}, True),
+        ({"grid": 1.0}, {"grid": 0.5}, True),
+        ({"grid": 1.0}, {}, True),
+        ({}, {"grid": 0.4}, False),
+        ({"grid": None}, {"grid": 0.5}, True),
+        ({"grid": 1.0, "solar": 2.0}, {"grid": 1.0, "solar": 2.0}, False),
+    ],
+)
+def test_power_changed(previous: dict | None, current: dict, changed: bool) -> None:
+    assert power_changed(previous, current) is changed
@@ -0,0 +1,140 @@
+"""Tests for the cheapest hours search."""
+
+from datetime import UTC, datetime, timedelta
+
+from custom_components.sveasolar.spot_price import SveaSolarCheapestHours, SveaSolarPriceWindow
+
+START = datetime(2025, 3, 14, tzinfo=UTC)
+HOUR = timedelta(hours=1)
+PRICES = [50.0, 40.0, 10.0, 30.0, 20.0, 60.0, 5.0, 70.0]
+
+
+def _points(prices: list[float]) -> list[dict]:
+    return [{"time": START + HOUR * index, "price": price, "rating": "Normal"} for index, price in enumerate(prices)]
+
+
+def _interval(first: int, last: int) -> tuple[datetime, datetime]:
+    return START + HOUR * first, START + HOUR * last
+
+
+def test_contiguous_window() -> None:
+    window = SveaSolarCheapestHours(_points(PRICES)).cheapest(2, True)
+
+    assert window.intervals == (_interval(2, 4),)
+    assert window.average == 20.0
+
+
+def test_contiguous_window_at_the_edges() -> None:
+    search = SveaSolarCheapestHours(_points(PRICES))
+
+    assert search.cheapest(1, True).intervals == (_interval(6, 7),)
+    assert search.cheapest(len(PRICES), True).intervals == (_interval(0, len(PRICES)),)
+    assert search.cheapest(len(PRICES) + 1, True) is None
+
+
+def test_contiguous_window_prefers_the_first_of_equal_windows() -> None:
+    window = SveaSolarCheapestHours(_points([10.0, 10.0, 10.0])).cheapest(1, True)
+
+    assert window.intervals == (_interval(0, 1),)
+
+
+def test_separate_hours() -> None:
+    window = SveaSolarCheapestHours(_points(PRICES)).cheapest(3, False)
+
+    assert window.intervals == (_interval(2, 3), _interval(4, 5), _interval(6, 7))
+    assert window.average == 35 / 3
+
+
+def test_separate_hours_merge_consecutive_points() -> None:
+    window = SveaSolarCheapestHours(_points(PRICES)).cheapest(4, False)
+
+    assert window.intervals == (_interval(2, 5), _interval(6, 7))
+    assert window.start == START + HOUR * 2
+    assert window.end == START + HOUR * 7
+
+
+def test_separate_hours_need_enough_points() -> None:
+    search = SveaSolarCheapestHours(_points(PRICES))
+
+    assert search.cheapest(len(PRICES), False).intervals == (_interval(0, len(PRICES)),)
+    assert search.cheapest(len(PRICES) + 1, False) is None
+
+
+def test_range_includes_the_point_overlapping_the_start() -> None:
+    search = SveaSolarCheapestHours(_points(PRICES))
+
+    window = search.cheapest(1, True, START + HOUR * 2.5, START + HOUR * 6)
+    assert window.intervals == (_interval(2, 3),)
+
+    window = search.cheapest(1, False, START + HOUR * 3, START + HOUR * 6)
+    assert window.intervals == (_interval(4, 5),)
+
+
+def test_range_with_too_few_points() -> None:
+    search = SveaSolarCheapestHours(_points(PRICES))
+
+    assert search.cheapest(3, True, START + HOUR * 6, START + HOUR * 8) is None
+    assert search.cheapest(3, False, START + HOUR * 6, START + HOUR * 8) is None
+
+
+def test_no_points() -> None:
+    search = SveaSolarCheapestHours([])
+
+    assert search.cheapest(1, True) is None
+    assert search.cheapest(1, False) is None
+    assert search.price_at(START) is None
+
+
+def test_results_are_shared() -> None:
+    search = SveaSolarCheapestHours(_points(PRICES))
+
+    assert search.cheapest(2, True) is search.cheapest(2, True)
+    assert search.cheapest(2, True) is not search.cheapest(2, False)
+
+
+def test_unsorted_points() -> None:
+    search = SveaSolarCheapestHours(list(reversed(_points(PRICES))))
+
+    assert search.cheapest(2, True).intervals == (_interval(2, 4),)
+    assert search.price_at(START) == PRICES[0]
+
+
+def test_price_at() -> None:
+    search = SveaSolarCheapestHours(_points(PRICES))
+
+    assert search.price_at(START) == 50.0
+    assert search.price_at(START + HOUR * 2.5) == 10.0
+    assert search.price_at(START + HOUR * 7) == 70.0
+    assert search.price_at(START - timedelta(seconds=1)) is None
+    assert search.price_at(START + HOUR * len(PRICES)) is None
+
+
+def test_price_at_of_a_single_point() -> None:
+    search = SveaSolarCheapestHours(_points([5.0]))
+
+    assert search.price_at(START + HOUR / 2) == 5.0
+    assert search.price_at(START + HOUR) is None
+
+
+def test_window() -> None:
+    window = SveaSolarPriceWindow((_interval(2, 5), _interval(6, 7)), 16.25)
+
+    assert START + HOUR * 2 in window
+    assert START + HOUR * 5 not in window
+    assert START + HOUR * 6 in window
+    assert START + HOUR * 7 not in window
+
+    assert window.next_change(START) == START + HOUR * 2
+    assert window.next_change(START + HOUR * 3) == START + HOUR * 5
+    assert window.next_change(START + HOUR * 5) == START + HOUR * 6
+    assert window.next_change(START + HOUR * 7) is None
+
+    assert window.as_dict() == {
+        "start": (START + HOUR * 2).isoformat(),
+        "end": (START + HOUR * 7).isoformat(),
+        "average": 16.25,
+        "intervals": [
+            {"start": (START + HOUR * 2).isoformat(), "end": (START + HOUR * 5).isoformat()},
+            {"start": (START + HOUR * 6).isoformat(), "end": (START + HOUR * 7).isoformat()},
+        ],
+    }
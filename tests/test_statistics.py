@@ -0,0 +1,55 @@
+"""Tests for the long-term statistics import."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+from homeassistant.components.recorder import models
+from homeassistant.core import HomeAssistant
+
+from custom_components.sveasolar.projection import SveaSolarBatteryDetails
+from custom_components.sveasolar.statistics import SveaSolarStatisticsImporter, _metadata
+
+ADD_STATISTICS = "homeassistant.components.recorder.statistics.async_add_external_statistics"
+
+
+def _battery(charged_energy: float) -> SveaSolarBatteryDetails:
+    return SveaSolarBatteryDetails(
+        id="battery",
+        brand="Emaldo",
+        locationId="location",
+        stateOfCharge=50,
+        dischargedEnergy=None,
+        chargedEnergy=charged_energy,
+        dischargePower=0.0,
+        capacity=10.0,
+    )
+
+
+def test_metadata_fields() -> None:
+    metadata = _metadata("sveasolar:battery_charged_energy", "Battery charged energy", "kWh", "energy", mean=False)
+
+    fields = models.StatisticMetaData.__annotations__
+    assert set(metadata) <= set(fields)
+    assert metadata["has_sum"]
+    if "mean_type" in fields:
+        assert metadata["mean_type"] == models.StatisticMeanType.NONE
+    if "unit_class" in fields:
+        assert metadata["unit_class"] == "energy"
+
+
+async def test_energy_counter_sum(hass: HomeAssistant, freezer) -> None:
+    hass.config.components.add("recorder")
+    importer = SveaSolarStatisticsImporter(hass, "entry")
+    freezer.move_to("2025-03-14T22:30:00+00:00")
+
+    with patch(ADD_STATISTICS) as add_statistics:
+        # The daily counter is reset at midnight
+        for charged_energy in (1.0, 3.0, 0.5):
+            await importer.async_import({}, {"battery": ("Battery", _battery(charged_energy))})
+            freezer.tick(timedelta(hours=1))
+
+    statistics = [call.args[2][0] for call in add_statistics.call_args_list]
+    assert statistics == [
+        {"start": datetime(2025, 3, 14, 22, tzinfo=UTC), "state": 3.0, "sum": 2.0},
+        {"start": datetime(2025, 3, 14, 23, tzinfo=UTC), "state": 0.5, "sum": 2.5},
+    ]
@@ -0,0 +1,189 @@
+"""Tests for the token lifecycle of an account."""
+
+import time
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import CONF_ACCESS_TOKEN
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.sveasolar.const import CONF_REFRESH_TOKEN
+from custom_components.sveasolar.hub import (
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_SAVE_DELAY,
+    SveaSolarHub,
+    SveaSolarTokenManager,
+)
+from custom_components.sveasolar.metrics import SveaSolarMetrics
+
+from .common import TOKEN_STORE_KEY, mock_entry, mock_response, token
+
+
+def _store(hass_storage: dict, access_token: str, refresh_token: str = "stored-refresh") -> None:
+    hass_storage[TOKEN_STORE_KEY] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": TOKEN_STORE_KEY,
+        "data": {CONF_ACCESS_TOKEN: access_token, CONF_REFRESH_TOKEN: refresh_token},
+    }
+
+
+def _stored(hass_storage: dict) -> dict:
+    return hass_storage[TOKEN_STORE_KEY]["data"]
+
+
+async def _async_hub(hass: HomeAssistant, access_token: str) -> SveaSolarHub:
+    hub = SveaSolarHub(hass, mock_entry(access_token))
+    hub.api.auth.request = AsyncMock()
+    await hub.token_manager.async_load()
+    return hub
+
+
+async def _async_flush_saves(hass: HomeAssistant) -> None:
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=TOKEN_SAVE_DELAY + 1))
+    await hass.async_block_till_done()
+
+
+async def test_stored_tokens_are_reused(hass: HomeAssistant, hass_storage: dict) -> None:
+    stored = token(7200)
+    _store(hass_storage, stored)
+    manager = SveaSolarTokenManager(hass, mock_entry(token(3600)), SveaSolarMetrics(), AsyncMock())
+
+    await manager.async_load()
+    await _async_flush_saves(hass)
+
+    assert manager.access_token == stored
+    assert manager.refresh_token == "stored-refresh"
+    # The tokens of the entry were never queued, so they do not overwrite the rotated tokens on disk
+    assert _stored(hass_storage) == {CONF_ACCESS_TOKEN: stored, CONF_REFRESH_TOKEN: "stored-refresh"}
+    manager.async_cancel_refresh()
+
+
+async def test_newer_entry_tokens_replace_the_stored_ones(hass: HomeAssistant, hass_storage: dict) -> None:
+    _store(hass_storage, token(3600))
+    entry_token = token(7200)
+    manager = SveaSolarTokenManager(hass, mock_entry(entry_token), SveaSolarMetrics(), AsyncMock())
+
+    await manager.async_load()
+    await _async_flush_saves(hass)
+
+    assert manager.access_token == entry_token
+    assert _stored(hass_storage) == {CONF_ACCESS_TOKEN: entry_token, CONF_REFRESH_TOKEN: "entry-refresh"}
+    manager.async_cancel_refresh()
+
+
+async def test_stored_tokens_without_entry_tokens(hass: HomeAssistant, hass_storage: dict) -> None:
+    stored = token(3600)
+    _store(hass_storage, stored)
+    manager = SveaSolarTokenManager(hass, mock_entry(None, None), SveaSolarMetrics(), AsyncMock())
+
+    await manager.async_load()
+
+    assert manager.access_token == stored
+    manager.async_cancel_refresh()
+
+
+async def test_updates_are_saved_once_loaded(hass: HomeAssistant, hass_storage: dict) -> None:
+    metrics = SveaSolarMetrics()
+    manager = SveaSolarTokenManager(hass, mock_entry(None, None), metrics, AsyncMock())
+
+    await manager.async_load()
+    await _async_flush_saves(hass)
+    assert TOKEN_STORE_KEY not in hass_storage
+
+    access_token = token(3600)
+    manager.update(access_token, "login-refresh")
+    await _async_flush_saves(hass)
+
+    assert _stored(hass_storage) == {CONF_ACCESS_TOKEN: access_token, CONF_REFRESH_TOKEN: "login-refresh"}
+    assert metrics.counters["token_refreshes"] == 1
+    manager.async_cancel_refresh()
+
+
+async def test_load_once(hass: HomeAssistant, hass_storage: dict) -> None:
+    stored = token(7200)
+    _store(hass_storage, stored)
+    manager = SveaSolarTokenManager(hass, mock_entry(None, None), SveaSolarMetrics(), AsyncMock())
+    await manager.async_load()
+
+    login_token = token(3600)
+    manager.update(login_token, "login-refresh")
+    await manager.async_load()
+
+    assert manager.access_token == login_token
+    manager.async_cancel_refresh()
+
+
+async def test_renewal_uses_the_refresh_token(
+    hass: HomeAssistant, hass_storage: dict, freezer: FrozenDateTimeFactory
+) -> None:
+    hub = await _async_hub(hass, token(TOKEN_REFRESH_MARGIN + 120))
+    renewed = token(3600)
+    hub.api.auth.request.return_value = mock_response({"accessToken": renewed})
+
+    freezer.tick(timedelta(seconds=121))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    hub.api.auth.request.assert_awaited_once_with(
+        "post", "v1/auth/refresh-access-token", json={"refreshToken": "entry-refresh"}, skip_auth_headers=True
+    )
+    assert hub.token_manager.access_token == renewed
+    assert hub.token_manager.refresh_token == "entry-refresh"
+    await hub.async_shutdown()
+
+
+async def test_renewal_logs_in_when_the_refresh_is_refused(
+    hass: HomeAssistant, hass_storage: dict, freezer: FrozenDateTimeFactory
+) -> None:
+    hub = await _async_hub(hass, token(TOKEN_REFRESH_MARGIN + 120))
+    logged_in = token(3600)
+    hub.api.auth.request.side_effect = [
+        mock_response(status=401),
+        mock_response({"accessToken": logged_in, "refreshToken": "login-refresh"}),
+    ]
+
+    freezer.tick(timedelta(seconds=121))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert hub.api.auth.request.await_args.args[1] == "v1/auth/login-with-email"
+    assert hub.token_manager.access_token == logged_in
+    assert hub.token_manager.refresh_token == "login-refresh"
+    await hub.async_shutdown()
+
+
+async def test_shutdown_writes_the_tokens(hass: HomeAssistant, hass_storage: dict) -> None:
+    hub = await _async_hub(hass, token(3600))
+    renewed = token(7200)
+    hub.token_manager.update(renewed, "renewed-refresh")
+
+    await hub.async_shutdown()
+
+    assert _stored(hass_storage) == {CONF_ACCESS_TOKEN: renewed, CONF_REFRESH_TOKEN: "renewed-refresh"}
+
+
+@pytest.mark.parametrize(
+    ("expires_in", "valid"),
+    [(TOKEN_REFRESH_MARGIN + 60, True), (TOKEN_REFRESH_MARGIN - 60, False)],
+)
+async def test_token_validity(hass: HomeAssistant, expires_in: int, valid: bool) -> None:
+    manager = SveaSolarTokenManager(hass, mock_entry(token(expires_in)), SveaSolarMetrics(), AsyncMock())
+
+    assert manager.is_token_valid() is valid
+
+
+async def test_missing_token_is_invalid(hass: HomeAssistant) -> None:
+    manager = SveaSolarTokenManager(hass, mock_entry(None, None), SveaSolarMetrics(), AsyncMock())
+
+    assert not manager.is_token_valid()
+
+
+def test_expires_at() -> None:
+    assert time.time() < SveaSolarTokenManager.expires_at(token(60)) <= time.time() + 60
+    assert SveaSolarTokenManager.expires_at(None) is None
+    assert SveaSolarTokenManager.expires_at("not-a-jwt") is None
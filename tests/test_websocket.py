@@ -0,0 +1,134 @@
+"""Tests for the websocket supervision."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from unittest.mock import AsyncMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pysveasolar.errors import ConnectionFailedError
+
+from custom_components.sveasolar import websocket
+from custom_components.sveasolar.websocket import (
+    BACKOFF_MAX,
+    BACKOFF_MIN,
+    MAX_RECONNECTS,
+    RECONNECT_WINDOW,
+    SveaSolarWebsocketStream,
+    SveaSolarWebsocketSupervisor,
+)
+
+NAME = "home"
+
+
+@pytest.fixture
+def fast_reconnects(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(websocket, "BACKOFF_MIN", 0.01)
+    monkeypatch.setattr(websocket, "CONNECT_STAGGER", 0.0)
+
+
+@pytest.fixture
+def no_jitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(websocket.random, "uniform", lambda low, high: high)
+
+
+async def _wait_for(predicate: Callable[[], bool]) -> None:
+    async with asyncio.timeout(2):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+async def _connected_forever(stream: SveaSolarWebsocketStream) -> None:
+    stream.async_connected()
+    await asyncio.Event().wait()
+
+
+def test_backoff(no_jitter: None) -> None:
+    stream = SveaSolarWebsocketStream(NAME, AsyncMock(), AsyncMock())
+
+    delays = []
+    for failures in range(1, 10):
+        stream.failures = failures
+        stream.reconnects.clear()
+        delays.append(SveaSolarWebsocketSupervisor._reconnect_delay(stream))
+
+    assert delays[:3] == [BACKOFF_MIN, BACKOFF_MIN * 2, BACKOFF_MIN * 4]
+    assert delays[-1] == BACKOFF_MAX
+
+
+def test_reconnects_are_limited_per_window(no_jitter: None) -> None:
+    stream = SveaSolarWebsocketStream(NAME, AsyncMock(), AsyncMock(), failures=1)
+
+    delays = [SveaSolarWebsocketSupervisor._reconnect_delay(stream) for _ in range(MAX_RECONNECTS + 1)]
+
+    assert delays[:MAX_RECONNECTS] == [BACKOFF_MIN] * MAX_RECONNECTS
+    # The reconnect after the limit waits until the first reconnect of the window has left it
+    assert delays[-1] == pytest.approx(BACKOFF_MIN + RECONNECT_WINDOW, abs=0.1)
+
+
+def _failing_once(error: Exception) -> Callable[[SveaSolarWebsocketStream], Awaitable[None]]:
+    """Return a connect that fails with the error once, and then stays connected."""
+    attempts = []
+
+    async def async_connect(stream: SveaSolarWebsocketStream) -> None:
+        attempts.append(stream)
+        if len(attempts) == 1:
+            raise error
+        await _connected_forever(stream)
+
+    return async_connect
+
+
+async def test_reconnects_after_a_failure(hass: HomeAssistant, fast_reconnects: None) -> None:
+    states = []
+    supervisor = SveaSolarWebsocketSupervisor(hass, lambda name, connected: states.append(connected))
+
+    supervisor.async_start(NAME, _failing_once(ConnectionFailedError("dropped")), AsyncMock())
+    await _wait_for(lambda: supervisor.states[NAME])
+
+    assert states == [False, True]
+    await supervisor.async_stop_all()
+    assert supervisor.states == {}
+
+
+async def test_missed_keep_alive_reconnects(hass: HomeAssistant, fast_reconnects: None) -> None:
+    supervisor = SveaSolarWebsocketSupervisor(hass, lambda name, connected: None)
+    connect = AsyncMock(side_effect=_connected_forever)
+    disconnect = AsyncMock()
+
+    supervisor.async_start(NAME, connect, disconnect, keep_alive_timeout=0.05)
+    await _wait_for(lambda: connect.await_count >= 2)
+
+    disconnect.assert_awaited()
+    await supervisor.async_stop_all()
+
+
+async def test_keep_alive_keeps_the_stream(hass: HomeAssistant, fast_reconnects: None) -> None:
+    supervisor = SveaSolarWebsocketSupervisor(hass, lambda name, connected: None)
+    disconnect = AsyncMock()
+
+    async def async_connect(stream: SveaSolarWebsocketStream) -> None:
+        stream.async_connected()
+        while True:
+            await asyncio.sleep(0.01)
+            stream.async_alive()
+
+    supervisor.async_start(NAME, async_connect, disconnect, keep_alive_timeout=0.05)
+    await asyncio.sleep(0.2)
+
+    assert supervisor.states[NAME]
+    disconnect.assert_not_awaited()
+    await supervisor.async_stop_all()
+
+
+async def test_wake_reconnects_right_away(hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(websocket, "BACKOFF_MIN", 60.0)
+    supervisor = SveaSolarWebsocketSupervisor(hass, lambda name, connected: None)
+
+    supervisor.async_start(NAME, _failing_once(ConnectionFailedError("rejected")), AsyncMock())
+    await _wait_for(lambda: supervisor.states[NAME] is False)
+    # Without the wake up the stream would wait at least 30 seconds for its backoff
+    supervisor.async_wake()
+    await _wait_for(lambda: supervisor.states[NAME])
+
+    await supervisor.async_stop_all()